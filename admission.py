@@ -0,0 +1,164 @@
+"""
+Admission control
+Bounded per-stage queues and per-client caps so overload is rejected early
+"""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+
+class Overloaded(Exception):
+    """Request rejected by admission control"""
+
+    def __init__(self, stage: str, reason: str, retry_after: float, status_code: int = 503):
+        super().__init__(f"{stage} overloaded ({reason})")
+        self.stage = stage
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.status_code = status_code
+
+
+class Stage:
+    """
+    One pipeline stage (LLM, TTS) with limited concurrency
+
+    Requests queue for a slot up to max_queue deep. Each stage tracks its
+    service time (EWMA) and rejects a request up front when the expected
+    queue wait plus service time would not fit in the deadline, instead of
+    letting it wait and time out. While the stage is busy and its service
+    time alone exceeds the deadline, every new request fails fast; once it
+    drains, the next request is admitted as a probe to re-measure.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        max_queue: int,
+        deadline: float,
+        metrics=None
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.metrics = metrics
+
+        self.waiting = 0
+        self.active = 0
+        self.service_time: Optional[float] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def expected_wait(self) -> float:
+        """Estimated queue time of a request arriving now"""
+        if self.service_time is None or self.active < self.concurrency:
+            return 0.0
+        return (self.waiting // self.concurrency + 1) * self.service_time
+
+    def _observe(self, seconds: float):
+        if self.service_time is None:
+            self.service_time = seconds
+        else:
+            self.service_time = 0.8 * self.service_time + 0.2 * seconds
+
+    def _reject(self, reason: str, retry_after: float):
+        if self.metrics:
+            self.metrics.observe_rejection(self.name, reason)
+        raise Overloaded(self.name, reason, retry_after)
+
+    def _report(self):
+        if self.metrics:
+            self.metrics.set_stage_load(self.name, self.waiting, self.active, self.service_time or 0)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the stage's slots, or raise Overloaded"""
+        service_time = self.service_time or 0.0
+
+        if self.active:
+            if service_time > self.deadline:
+                self._reject("slow", service_time)
+            if self.expected_wait() + service_time > self.deadline:
+                self._reject("deadline", self.expected_wait())
+
+        if not self._semaphore.locked():
+            # A slot is free: take it now, without counting against the queue
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.max_queue:
+                self._reject("queue_full", self.expected_wait() or service_time)
+
+            self.waiting += 1
+            self._report()
+            try:
+                await asyncio.wait_for(
+                    self._semaphore.acquire(),
+                    timeout=max(self.deadline - service_time, 0.1)
+                )
+            except asyncio.TimeoutError:
+                self._reject("queue_timeout", service_time)
+            finally:
+                self.waiting -= 1
+
+        self.active += 1
+        self._report()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            # Failures (timeouts included) still tell us how slow the stage is
+            self._observe(time.monotonic() - start)
+            raise
+        else:
+            self._observe(time.monotonic() - start)
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            self._report()
+
+
+class AdmissionController:
+    """Stage limiters plus a cap on concurrent requests per client"""
+
+    def __init__(self, stages: Dict[str, Stage], per_client: int = 2, metrics=None):
+        self.stages = stages
+        self.per_client = per_client
+        self.metrics = metrics
+        self._clients: Dict[str, int] = {}
+
+    def stage(self, name: str):
+        """Context manager holding a slot of a stage"""
+        return self.stages[name].slot()
+
+    @asynccontextmanager
+    async def client(self, client_id: str):
+        """Count a request against its client's concurrency cap"""
+        if self._clients.get(client_id, 0) >= self.per_client:
+            if self.metrics:
+                self.metrics.observe_rejection("client", "too_many_requests")
+            llm = self.stages.get("llm")
+            raise Overloaded("client", "too_many_requests",
+                             (llm.service_time or 1.0) if llm else 1.0, status_code=429)
+
+        self._clients[client_id] = self._clients.get(client_id, 0) + 1
+        try:
+            yield
+        finally:
+            self._clients[client_id] -= 1
+            if not self._clients[client_id]:
+                del self._clients[client_id]
+
+    def status(self) -> Dict:
+        return {
+            name: {
+                "active": stage.active,
+                "waiting": stage.waiting,
+                "concurrency": stage.concurrency,
+                "max_queue": stage.max_queue,
+                "service_time": stage.service_time,
+                "deadline": stage.deadline
+            }
+            for name, stage in self.stages.items()
+        }
@@ -0,0 +1,156 @@
+"""
+Conversation sessions
+Server-side multi-turn state that keeps Ollama's prompt prefix stable
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+def estimate_tokens(messages: List[Dict]) -> int:
+    """Rough token count (~4 characters per token plus per-message overhead)"""
+    return sum(len(m.get("content", "")) // 4 + 4 for m in messages)
+
+
+class ConversationSession:
+    """
+    One conversation's history
+
+    Ollama keeps the KV cache of the last prompt it processed and only
+    prefills the part of a new prompt that differs. Turns are therefore
+    append-only: each request is the previous prompt plus the new user
+    message, so only new tokens are processed. When the history outgrows
+    its budget the oldest turns are folded into a summary message in one
+    step, which changes the prefix once and leaves it stable again for
+    many turns after.
+    """
+
+    def __init__(self, session_id: str, history: Optional[List[Dict]] = None):
+        self.id = session_id
+        self.summary: Optional[str] = None
+        self.turns: List[Dict] = [
+            {"role": m["role"], "content": m["content"]}
+            for m in (history or [])
+            if m.get("role") in ("user", "assistant") and m.get("content")
+        ]
+        self.last_active = time.time()
+        self.lock = asyncio.Lock()      # Serializes turns
+        self.compacting = False
+
+    @property
+    def history(self) -> List[Dict]:
+        return list(self.turns)
+
+    def messages(self, user_text: Optional[str] = None) -> List[Dict]:
+        """Prompt for the next turn"""
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the conversation so far: {self.summary}"
+            })
+        messages.extend(self.turns)
+        if user_text is not None:
+            messages.append({"role": "user", "content": user_text})
+        return messages
+
+    def commit(self, user_text: str, assistant_text: str):
+        """Record a completed turn"""
+        self.turns.append({"role": "user", "content": user_text})
+        self.turns.append({"role": "assistant", "content": assistant_text})
+        self.last_active = time.time()
+
+    def reset(self):
+        self.summary = None
+        self.turns = []
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.messages())
+
+    async def compact(
+        self,
+        budget: int,
+        summarize: Callable[[Optional[str], List[Dict]], Awaitable[str]]
+    ) -> bool:
+        """
+        Fold the oldest turns into the summary once history exceeds budget
+
+        Turns are removed in user/assistant pairs until the rest fits in
+        half the budget, so compaction happens rarely. New turns may be
+        committed while the summary is generated; they are kept.
+
+        Args:
+            budget: Token budget for the prompt history
+            summarize: Coroutine (previous summary, turns) -> new summary
+
+        Returns:
+            True if the history was compacted
+        """
+        if self.compacting or self.tokens() <= budget:
+            return False
+
+        keep = list(self.turns)
+        folded = []
+        while len(keep) > 2 and estimate_tokens(keep) > budget // 2:
+            folded.extend(keep[:2])
+            keep = keep[2:]
+        if not folded:
+            return False
+
+        self.compacting = True
+        try:
+            summary = await summarize(self.summary, folded)
+        finally:
+            self.compacting = False
+
+        if self.turns[:len(folded)] != folded:
+            return False  # Reset meanwhile
+        self.turns = self.turns[len(folded):]
+        self.summary = summary.strip() or self.summary
+        return True
+
+
+class SessionStore:
+    """In-memory sessions, expired after idle_ttl and bounded LRU"""
+
+    def __init__(self, max_sessions: int = 1000, idle_ttl: float = 1800.0):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+
+    def get(self, session_id: Optional[str], history: Optional[List[Dict]] = None) -> ConversationSession:
+        """
+        Look up a session, creating it (seeded with history) if unknown
+
+        Clients that still send their full history get a fresh session
+        seeded from it, as do clients whose session expired.
+        """
+        self._expire()
+
+        session = self._sessions.get(session_id) if session_id else None
+        if session is None:
+            session = ConversationSession(session_id or uuid.uuid4().hex, history)
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session.id)
+
+        session.last_active = time.time()
+        return session
+
+    def drop(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def _expire(self):
+        cutoff = time.time() - self.idle_ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_active >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -2,14 +2,15 @@
 Ollama Voice API Backend
 Handles requests from the web UI
 """
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from fastapi import UploadFile, File, Form
 import asyncio
+import contextlib
 import sys
 import os
 from pathlib import Path
@@ -17,6 +18,8 @@ import time
 
 # Add engines to path
 sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts-engines"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "voice-ai-agent"))
 
 try:
     from tts_engines.engine_manager import get_engine_manager
@@ -26,6 +29,31 @@ except ImportError:
     from simple_tts import get_simple_tts
     get_engine_manager = get_simple_tts
 
+try:
+    from stt_service import STTService, TranscriptionConfig
+    from batched_stt import BatchedTranscriber, TieredTranscriber
+except ImportError:
+    print("Warning: faster-whisper not available, speech-to-text falls back to Google")
+    STTService = None
+
+from artifact_store import get_artifact_store
+from singleflight import content_key
+from ollama_client import ClientDisconnected, cancel_on_disconnect, get_ollama_client
+from ollama_warm_pool import OllamaWarmPool
+from conversation_state import SessionStore
+from response_cache import ResponseCache
+from admission import AdmissionController, Overloaded, Stage
+from server_metrics import get_server_metrics
+from speech_pipeline import (
+    SentenceSplitter, join_audio_segments, pipeline_speech, stream_events, wav_stream_header
+)
+import io
+import json
+import wave
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import httpx
+
 app = FastAPI(title="Ollama Voice API")
 
 # CORS
@@ -43,7 +71,80 @@ app.mount("/voice_samples", StaticFiles(directory="voice_samples"), name="voice_
 
 # Global state
 tts_manager = None
+stt_service = None
+stt_batcher = None
+clone_engine = None
+stt_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("STT_WORKERS", "2")),
+    thread_name_prefix="stt"
+)
+artifacts = get_artifact_store()
 ollama_host = "http://localhost:11434"
+ollama = get_ollama_client(ollama_host)
+metrics = get_server_metrics()
+warm_pool = OllamaWarmPool(
+    ollama,
+    pinned=[m.strip() for m in os.getenv("OLLAMA_WARM_MODELS", "llama3.2:1b").split(",") if m.strip()],
+    ram_budget=int(os.getenv("OLLAMA_RAM_BUDGET", str(8 * 1024 ** 3))),
+    keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+    metrics=metrics
+)
+
+# Generation settings tuned for low-latency voice replies
+# (num_ctx must stay constant: changing it makes Ollama reload the model)
+OLLAMA_CHAT_OPTIONS = {
+    "temperature": 0.3,     # Lower for faster, more focused responses
+    "top_p": 0.8,
+    "num_predict": int(os.getenv("OLLAMA_NUM_PREDICT", "150")),
+    "num_ctx": int(os.getenv("OLLAMA_NUM_CTX", "2048")),  # Only new tokens are prefilled per turn
+    "num_thread": -1,     # Use all available CPU threads
+    "repeat_penalty": 1.1,
+    "seed": -1
+}
+
+# Conversation state per session; history beyond the budget is summarized
+sessions = SessionStore(
+    max_sessions=int(os.getenv("CHAT_MAX_SESSIONS", "1000")),
+    idle_ttl=float(os.getenv("CHAT_SESSION_TTL", "1800"))
+)
+HISTORY_TOKEN_BUDGET = OLLAMA_CHAT_OPTIONS["num_ctx"] - OLLAMA_CHAT_OPTIONS["num_predict"] - 256
+
+# Replies to common opening questions, with their audio
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_EMBED_MODEL = os.getenv("RESPONSE_CACHE_EMBED_MODEL", "")  # e.g. nomic-embed-text
+
+async def embed_query(text: str) -> List[float]:
+    return await ollama.embeddings(RESPONSE_CACHE_EMBED_MODEL, text, keep_alive=warm_pool.keep_alive)
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "2000")),
+    ttl=RESPONSE_CACHE_TTL,
+    embed=embed_query if RESPONSE_CACHE_EMBED_MODEL else None,
+    threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92")),
+    metrics=metrics
+)
+
+# Reject early instead of letting requests time out behind a saturated stage
+admission = AdmissionController(
+    stages={
+        "llm": Stage(
+            "llm",
+            concurrency=int(os.getenv("ADMISSION_LLM_CONCURRENCY", "4")),  # Match OLLAMA_NUM_PARALLEL
+            max_queue=int(os.getenv("ADMISSION_LLM_QUEUE", "16")),
+            deadline=float(os.getenv("ADMISSION_LLM_DEADLINE", "60")),
+            metrics=metrics
+        ),
+        "tts": Stage(
+            "tts",
+            concurrency=int(os.getenv("ADMISSION_TTS_CONCURRENCY", "4")),
+            max_queue=int(os.getenv("ADMISSION_TTS_QUEUE", "32")),
+            deadline=float(os.getenv("ADMISSION_TTS_DEADLINE", "30")),
+            metrics=metrics
+        )
+    },
+    per_client=int(os.getenv("ADMISSION_PER_CLIENT", "2")),
+    metrics=metrics
+)
 
 
 class ChatRequest(BaseModel):
@@ -51,7 +152,15 @@ class ChatRequest(BaseModel):
     model: str = "llama3.2:1b"  # Much faster 1B model
     engine: str = "gtts"   # Use working engine by default
     voice_id: str = "gtts-en"
-    history: List[Dict] = []
+    history: List[Dict] = []  # Only used to seed a new session
+    session_id: Optional[str] = None
+    pipelined: bool = False  # Synthesize sentence by sentence while the model generates (NDJSON reply)
+
+
+class SpeechRequest(BaseModel):
+    text: str
+    engine: str = "gtts"
+    voice_id: str = "gtts-en"
 
 
 class ChatResponse(BaseModel):
@@ -60,35 +169,68 @@ class ChatResponse(BaseModel):
     audio_url: str
     duration: float
     history: List[Dict]
+    session_id: Optional[str] = None
+    audio_segments: List[str] = []  # Ordered per-sentence audio (pipelined mode)
     error: Optional[str] = None
 
 
 @app.on_event("startup")
 async def startup():
     """Initialize TTS engines and pre-warm Ollama model"""
-    global tts_manager
+    global tts_manager, stt_service, stt_batcher
     tts_manager = get_engine_manager()
     
     # Initialize engines
     await tts_manager.initialize_engines()
     
-    # Pre-warm the default model to keep it loaded
-    try:
-        import requests
-        print("Pre-warming llama3.2:1b model...")
-        requests.post(
-            f"{ollama_host}/api/generate",
-            json={
-                "model": "llama3.2:1b",
-                "prompt": "Hi",
-                "stream": False,
-                "options": {"num_predict": 1}
-            },
-            timeout=30
-        )
-        print("Model pre-warmed and ready")
-    except Exception as e:
-        print(f"Warning: Model pre-warm failed: {e}")
+    # Load the Whisper model once, shared by every request
+    if STTService is not None:
+        try:
+            config = TranscriptionConfig(
+                model_size=os.getenv("STT_MODEL_SIZE", "base"),
+                language=os.getenv("STT_LANGUAGE") or None,
+                device=os.getenv("STT_DEVICE", "cpu"),
+                compute_type=os.getenv("STT_COMPUTE_TYPE", "int8")
+            )
+            stt_service = await asyncio.get_event_loop().run_in_executor(
+                stt_executor, STTService, config
+            )
+            # Concurrent requests share batched Whisper passes
+            max_batch = int(os.getenv("STT_MAX_BATCH", "16"))
+            max_wait = float(os.getenv("STT_BATCH_WAIT_MS", "30")) / 1000
+            stt_batcher = BatchedTranscriber(stt_service, max_batch=max_batch, max_wait=max_wait)
+            
+            # Smaller model taking over while the primary's queue is backed up
+            fallback_size = os.getenv("STT_FALLBACK_MODEL_SIZE", "tiny")
+            if fallback_size and fallback_size != config.model_size:
+                fallback = await asyncio.get_event_loop().run_in_executor(
+                    stt_executor, STTService, config.model_copy(update={"model_size": fallback_size})
+                )
+                stt_batcher = TieredTranscriber(
+                    [
+                        (config.model_size, stt_batcher),
+                        (fallback_size, BatchedTranscriber(fallback, max_batch=max_batch, max_wait=max_wait))
+                    ],
+                    degrade_wait=float(os.getenv("STT_DEGRADE_WAIT_MS", "500")) / 1000,
+                    recover_wait=float(os.getenv("STT_RECOVER_WAIT_MS", "100")) / 1000,
+                    metrics=metrics
+                )
+        except Exception as e:
+            print(f"Warning: Whisper model failed to load: {e}")
+    
+    # Keep ./output within its byte budget
+    asyncio.create_task(artifacts.gc_loop())
+    
+    # Warm the configured models in the background so startup isn't blocked
+    asyncio.create_task(warm_pool.run())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled Ollama connections"""
+    await ollama.close()
+    if stt_batcher is not None:
+        await stt_batcher.close()
 
 
 @app.get("/")
@@ -102,10 +244,9 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Check Ollama
-        import requests
-        response = requests.get(f"{ollama_host}/api/tags", timeout=2)
-        ollama_status = response.status_code == 200
-    except:
+        await ollama.tags(timeout=2)
+        ollama_status = True
+    except Exception:
         ollama_status = False
     
     return {
@@ -115,113 +256,325 @@ async def health_check():
     }
 
 
+def chat_error(e: Exception) -> HTTPException:
+    """HTTP error for a failed chat turn"""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, Overloaded):
+        return overloaded_error(e)
+    if isinstance(e, httpx.TimeoutException):
+        return HTTPException(status_code=504, detail="Ollama request timeout (60 seconds) - model may be loading or system overloaded")
+    if isinstance(e, ClientDisconnected):
+        print("🔌 Client disconnected, Ollama request cancelled")
+        return HTTPException(status_code=499, detail="Client closed request")
+    print(f"❌ Error: {e}")
+    return HTTPException(status_code=500, detail=str(e))
+
+
+async def run_chat_turn(request: ChatRequest, http_request: Request, on_segment=None) -> ChatResponse:
+    """Chat turn under the client's admission cap and the session lock"""
+    async with admission.client(client_id(http_request)):
+        session = sessions.get(request.session_id, request.history)
+        async with session.lock:
+            response = await chat_turn(request, http_request, session, on_segment)
+    schedule_compaction(session, request.model)
+    return response
+
+
 @app.post("/api/ollama/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """
     Handle chat request:
     1. Send message to Ollama
     2. Convert response to speech
     3. Return audio URL
+    
+    Pipelined requests get a streamed reply instead (see chat_stream).
     """
+    if request.pipelined:
+        return await chat_stream(request, http_request)
+    
     try:
-        import requests
-        
-        # Prepare conversation history
-        history = request.history.copy()
-        history.append({
-            "role": "user",
-            "content": request.message
-        })
-        
-        print(f"\n💬 User: {request.message}")
-        print(f"🤖 Model: {request.model}")
-        print(f"⏳ Sending to Ollama... (this may take a few minutes)")
+        return await run_chat_turn(request, http_request)
+    except Exception as e:
+        raise chat_error(e)
+
+
+async def chat_stream(request: ChatRequest, http_request: Request) -> StreamingResponse:
+    """
+    Pipelined chat as newline-delimited JSON
+    
+    A {"type": "segment"} line (index, text, audio_url, duration) is sent
+    for each sentence as soon as its audio exists, in order, so playback
+    can start on the first sentence while the model is still generating.
+    The last line is {"type": "done"} with the ChatResponse fields, or
+    {"type": "error"}. Cached replies arrive as a single "done" line.
+    """
+    async def turn(emit):
+        async def on_segment(index: int, segment: Dict):
+            await emit({
+                "type": "segment",
+                "index": index,
+                "text": segment["text"],
+                "audio_url": segment["url"],
+                "duration": segment["duration"]
+            })
         
-        # Call Ollama with optimized settings for speed
-        start_time = time.time()
-        ollama_response = requests.post(
-            f"{ollama_host}/api/chat",
-            json={
-                "model": request.model,
-                "messages": history,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,     # Lower for faster, more focused responses
-                    "top_p": 0.8,
-                    "num_predict": 30,     # Even shorter responses
-                    "num_ctx": 512,       # Minimal context for speed
-                    "num_thread": -1,     # Use all available CPU threads
-                    "repeat_penalty": 1.1,
-                    "seed": -1
-                }
-            },
-            timeout=60  # Increased to 60 seconds for 1b model
+        response = await run_chat_turn(request, http_request, on_segment)
+        return response.model_dump()
+    
+    # Wait for the first event so rejections still get a proper status code
+    events = stream_events(turn)
+    try:
+        first = await events.__anext__()
+    except Exception as e:
+        raise chat_error(e)
+    
+    async def lines():
+        try:
+            yield json.dumps(first) + "\n"
+            async for event in events:
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": chat_error(e).detail}) + "\n"
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def overloaded_error(e: Overloaded) -> HTTPException:
+    """429/503 with Retry-After for a request rejected by admission control"""
+    print(f"🚦 Rejected: {e}")
+    return HTTPException(
+        status_code=e.status_code,
+        detail=f"Server busy ({e.stage}: {e.reason}), retry in {e.retry_after}s",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def client_id(http_request: Request) -> str:
+    """Caller identity for per-client limits (X-Client-ID header, else address)"""
+    return http_request.headers.get("x-client-id") or (
+        http_request.client.host if http_request.client else "unknown"
+    )
+
+
+async def chat_turn(request: ChatRequest, http_request: Request, session, on_segment=None) -> ChatResponse:
+    """
+    One chat turn against the session's history
+    
+    on_segment(index, segment) receives each sentence's audio as soon as
+    it is ready in pipelined mode.
+    """
+    # Previous prompt + new message, so Ollama reuses its cached prefix
+    history = session.messages(request.message)
+    
+    print(f"\n💬 User: {request.message}")
+    print(f"🤖 Model: {request.model}")
+    print(f"⏳ Sending to Ollama... (this may take a few minutes)")
+    
+    # Call Ollama with optimized settings for speed
+    start_time = time.time()
+    
+    # Opening questions don't depend on earlier turns, so their replies are cacheable
+    cacheable = not session.turns and not session.summary
+    query_embedding = None
+    if cacheable:
+        cached, query_embedding = await response_cache.lookup(request.model, request.message)
+        if cached is not None:
+            return await cached_chat_response(request, session, cached, start_time)
+    
+    await warm_pool.touch(request.model)
+    
+    if request.pipelined:
+        return await cancel_on_disconnect(
+            http_request,
+            pipelined_chat(request, session, history, start_time, cacheable, query_embedding, on_segment)
         )
-        
-        if ollama_response.status_code != 200:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Ollama error: {ollama_response.status_code}"
+    
+    try:
+        async with admission.stage("llm"):
+            result = await cancel_on_disconnect(
+                http_request,
+                ollama.chat(
+                    request.model,
+                    history,
+                    options=OLLAMA_CHAT_OPTIONS,
+                    timeout=60,  # Increased to 60 seconds for 1b model
+                    **warm_pool.request_options(request.model)
+                )
             )
-        
-        result = ollama_response.json()
-        assistant_message = result['message']['content']
-        
-        ollama_time = time.time() - start_time
-        print(f"✅ Ollama response in {ollama_time:.1f}s")
-        print(f"🗣️  Response: {assistant_message[:100]}...")
-        
-        # Check if response is too long for TTS
-        if len(assistant_message) > 1000:
-            print(f"⚠️  Long response ({len(assistant_message)} chars) - TTS may take longer")
-        
-        # Add to history
-        history.append({
-            "role": "assistant",
-            "content": assistant_message
-        })
-        
-        # Convert to speech
-        # Smart engine and voice selection
-        available_engines = list(tts_manager.engines.keys())
-        voice_id = request.voice_id
-        
-        # Determine engine based on voice ID
-        if voice_id.startswith("gtts-"):
-            selected_engine = "gtts"
-        elif voice_id == "system":
-            selected_engine = "system"
-        elif voice_id.endswith("Neural"):
-            selected_engine = "edge"
-        else:
-            # Fallback to requested engine or first available
-            selected_engine = request.engine if request.engine in available_engines else available_engines[0]
-            # Adjust voice for fallback engine
-            if selected_engine == "gtts":
-                voice_id = "gtts-en"
-            elif selected_engine == "system":
-                voice_id = "system"
-            elif selected_engine == "edge":
-                voice_id = "en-US-AriaNeural"
-        
-        print(f"🎙️  Generating speech with {selected_engine} ({voice_id})...")
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ollama error: {e.response.status_code}"
+        )
+    
+    assistant_message = result['message']['content']
+    
+    ollama_time = time.time() - start_time
+    print(f"✅ Ollama response in {ollama_time:.1f}s")
+    print(f"🗣️  Response: {assistant_message[:100]}...")
+    
+    # Check if response is too long for TTS
+    if len(assistant_message) > 1000:
+        print(f"⚠️  Long response ({len(assistant_message)} chars) - TTS may take longer")
+    
+    # Convert to speech
+    tts_start = time.time()
+    timestamp = int(time.time() * 1000)
+    output_path, tts_result = await synthesize_speech(
+        assistant_message, request.voice_id, request.engine, f"chat_{timestamp}.wav"
+    )
+    
+    tts_time = time.time() - tts_start
+    print(f"✅ TTS generated in {tts_time:.1f}s")
+    
+    # Add to history only once the turn was answered (a TTS 503 leaves no trace)
+    session.commit(request.message, assistant_message)
+    
+    if cacheable:
+        entry = await response_cache.store(request.model, request.message, assistant_message, query_embedding)
+        entry.add_audio(request.voice_id, request.engine, output_path, tts_result['audio_duration'])
+        artifacts.pin(output_path, RESPONSE_CACHE_TTL)
+    
+    total_time = time.time() - start_time
+    print(f"⚡ Total time: {total_time:.1f}s\n")
+    
+    return ChatResponse(
+        success=True,
+        response=assistant_message,
+        audio_url=artifacts.url_for(output_path),
+        duration=tts_result['audio_duration'],
+        history=session.history,
+        session_id=session.id
+    )
+
+
+async def cached_chat_response(request: ChatRequest, session, cached, start_time: float) -> ChatResponse:
+    """Answer from the response cache, synthesizing only if this voice has no audio yet"""
+    audio = cached.get_audio(request.voice_id, request.engine)
+    if audio is None:
         timestamp = int(time.time() * 1000)
-        output_filename = f"chat_{timestamp}.wav"
-        output_path = f"./output/{output_filename}"
-        
-        tts_start = time.time()
-        
-        # Try engines in order of reliability: gtts (most reliable), system (offline), edge (can fail)
-        engines_to_try = []
-        if selected_engine in available_engines:
-            engines_to_try.append(selected_engine)
-        
-        # Add fallback engines in priority order
-        for fallback in ["gtts", "system", "edge"]:
-            if fallback in available_engines and fallback not in engines_to_try:
-                engines_to_try.append(fallback)
-        
-        tts_result = None
+        output_path, tts_result = await synthesize_speech(
+            cached.response, request.voice_id, request.engine, f"chat_{timestamp}.wav"
+        )
+        cached.add_audio(request.voice_id, request.engine, output_path, tts_result['audio_duration'])
+        artifacts.pin(output_path, RESPONSE_CACHE_TTL)
+        audio = cached.get_audio(request.voice_id, request.engine)
+    
+    session.commit(request.message, cached.response)
+    print(f"⚡ Cached response in {time.time() - start_time:.2f}s\n")
+    
+    audio_url = artifacts.url_for(audio["path"])
+    return ChatResponse(
+        success=True,
+        response=cached.response,
+        audio_url=audio_url,
+        duration=audio["duration"],
+        history=session.history,
+        session_id=session.id,
+        audio_segments=[audio_url] if request.pipelined else []
+    )
+
+
+def schedule_compaction(session, model: str):
+    """Summarize old turns in the background once a session outgrows its budget"""
+    if session.tokens() <= HISTORY_TOKEN_BUDGET:
+        return
+    
+    async def _compact():
+        try:
+            # Not under the session lock: the next turn needn't wait for the summary
+            if await session.compact(HISTORY_TOKEN_BUDGET, lambda previous, turns: summarize_turns(model, previous, turns)):
+                print(f"🗜️  Session {session.id[:8]} history summarized ({session.tokens()} tokens)")
+        except Exception as e:
+            print(f"Warning: History summary failed: {e}")
+    
+    asyncio.create_task(_compact())
+
+
+async def summarize_turns(model: str, previous: Optional[str], turns: List[Dict]) -> str:
+    """Condense earlier turns into a short summary with the chat model"""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+    prompt = (
+        "Summarize this conversation in a few sentences, keeping names, numbers "
+        "and anything the user asked for.\n\n"
+        + (f"Earlier summary: {previous}\n\n" if previous else "")
+        + transcript
+    )
+    result = await ollama.generate(
+        model,
+        prompt,
+        # Same num_ctx as chat so the model isn't reloaded
+        options={**OLLAMA_CHAT_OPTIONS, "num_predict": 200},
+        timeout=60,
+        **warm_pool.request_options(model)
+    )
+    return result.get("response", "")
+
+
+def select_tts_voice(voice_id: str, requested_engine: str):
+    """Pick the TTS engine for a voice, adjusting the voice for fallback engines"""
+    available_engines = list(tts_manager.engines.keys())
+    
+    # Determine engine based on voice ID
+    if voice_id.startswith("gtts-"):
+        selected_engine = "gtts"
+    elif voice_id == "system":
+        selected_engine = "system"
+    elif voice_id.endswith("Neural"):
+        selected_engine = "edge"
+    else:
+        # Fallback to requested engine or first available
+        selected_engine = requested_engine if requested_engine in available_engines else available_engines[0]
+        # Adjust voice for fallback engine
+        if selected_engine == "gtts":
+            voice_id = "gtts-en"
+        elif selected_engine == "system":
+            voice_id = "system"
+        elif selected_engine == "edge":
+            voice_id = "en-US-AriaNeural"
+    
+    return selected_engine, voice_id
+
+
+async def synthesize_speech(text: str, voice_id: str, requested_engine: str, filename: str):
+    """
+    Convert text to speech with engine fallback
+    
+    Returns:
+        (output_path, tts_result)
+    """
+    available_engines = list(tts_manager.engines.keys())
+    selected_engine, voice_id = select_tts_voice(voice_id, requested_engine)
+    
+    print(f"🎙️  Generating speech with {selected_engine} ({voice_id})...")
+    output_path = str(artifacts.path_for(filename))
+    
+    # Identical replies reuse audio already in the artifact store
+    tts_key = content_key(text, voice_id, selected_engine, 24000, ".wav")
+    tts_result = artifacts.materialize(tts_key, ".wav", output_path)
+    if tts_result is not None:
+        print("♻️  Reusing cached speech")
+        return output_path, tts_result
+    
+    # Try engines in order of reliability: gtts (most reliable), system (offline), edge (can fail)
+    engines_to_try = []
+    if selected_engine in available_engines:
+        engines_to_try.append(selected_engine)
+    
+    # Add fallback engines in priority order
+    for fallback in ["gtts", "system", "edge"]:
+        if fallback in available_engines and fallback not in engines_to_try:
+            engines_to_try.append(fallback)
+    
+    async with admission.stage("tts"):
         for engine in engines_to_try:
             try:
                 # Adjust voice ID for engine if needed
@@ -234,66 +587,474 @@ async def chat(request: ChatRequest):
                 
                 print(f"🎙️  Trying {engine} engine...")
                 tts_result = await tts_manager.synthesize(
-                    text=assistant_message,
+                    text=text,
                     voice_id=voice_id,
                     output_path=output_path,
                     engine=engine,
                     sample_rate=24000
                 )
                 print(f"✅ {engine} TTS succeeded")
-                break
+                # Keyed by what produced the audio: a fallback's output must
+                # not answer later requests for the selected engine
+                artifacts.publish(
+                    content_key(text, voice_id, engine, 24000, ".wav"), output_path, tts_result
+                )
+                return output_path, tts_result
             except Exception as e:
                 print(f"⚠️  {engine} TTS failed: {e}")
                 continue
+    
+    raise Exception("All TTS engines failed")
+
+
+async def pipelined_chat(
+    request: ChatRequest,
+    session,
+    history: List[Dict],
+    start_time: float,
+    cacheable: bool = False,
+    query_embedding=None,
+    on_segment=None
+) -> ChatResponse:
+    """
+    Stream the Ollama reply and synthesize each sentence as soon as it is complete
+    
+    Perceived latency is first-sentence LLM time plus first-sentence TTS
+    time instead of full generation plus full synthesis. Cacheable replies
+    are stored with their sentences' audio joined into one file, so a
+    cache hit needs no synthesis.
+    """
+    timestamp = int(time.time() * 1000)
+    first_audio = {}
+    
+    async def tokens():
+        async with admission.stage("llm"):
+            async for chunk in ollama.stream_chat(
+                request.model,
+                history,
+                options=OLLAMA_CHAT_OPTIONS,
+                timeout=60,
+                **warm_pool.request_options(request.model)
+            ):
+                content = chunk.get("message", {}).get("content", "")
+                if content:
+                    yield content
+    
+    async def synthesize_sentence(sentence: str, index: int):
+        output_path, tts_result = await synthesize_speech(
+            sentence, request.voice_id, request.engine, f"chat_{timestamp}_{index:03d}.wav"
+        )
+        if index == 0:
+            first_audio["latency"] = time.time() - start_time
+            print(f"⚡ First sentence audio ready in {first_audio['latency']:.1f}s")
+        return {
+            "text": sentence,
+            "path": output_path,
+            "url": artifacts.url_for(output_path),
+            "duration": tts_result.get("audio_duration", 0)
+        }
+    
+    try:
+        assistant_message, segments = await pipeline_speech(
+            tokens(), synthesize_sentence, on_segment=on_segment
+        )
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ollama error: {e.response.status_code}"
+        )
+    
+    if not segments:
+        raise Exception("Ollama returned an empty response")
+    
+    assistant_message = assistant_message.strip()
+    session.commit(request.message, assistant_message)
+    
+    if cacheable:
+        entry = await response_cache.store(request.model, request.message, assistant_message, query_embedding)
+        output_path = str(artifacts.path_for(f"chat_{timestamp}.wav"))
+        joined = await asyncio.get_event_loop().run_in_executor(
+            None, join_audio_segments, [segment["path"] for segment in segments], output_path
+        )
+        if joined:
+            entry.add_audio(
+                request.voice_id, request.engine, output_path,
+                sum(segment["duration"] for segment in segments)
+            )
+            artifacts.pin(output_path, RESPONSE_CACHE_TTL)
+    
+    print(f"🗣️  Response: {assistant_message[:100]}...")
+    print(f"⚡ Total time: {time.time() - start_time:.1f}s ({len(segments)} segments)\n")
+    
+    return ChatResponse(
+        success=True,
+        response=assistant_message,
+        audio_url=segments[0]["url"],
+        duration=sum(segment["duration"] for segment in segments),
+        history=session.history,
+        session_id=session.id,
+        audio_segments=[segment["url"] for segment in segments]
+    )
+
+
+async def sentence_audio_stream(text: str, voice_id: str, requested_engine: str):
+    """
+    Fallback streaming for engines without native streaming
+    
+    Synthesizes sentence by sentence (next sentence in the background) and
+    yields (media_type, bytes). WAV segments are re-framed behind a single
+    streaming header; MP3 segments are concatenated frame streams.
+    """
+    splitter = SentenceSplitter()
+    sentences = splitter.feed(text + " ") + splitter.flush()
+    timestamp = int(time.time() * 1000)
+    loop = asyncio.get_event_loop()
+    
+    tasks = [
+        asyncio.create_task(synthesize_speech(
+            sentence, voice_id, requested_engine, f"stream_{timestamp}_{index:03d}.wav"
+        ))
+        for index, sentence in enumerate(sentences[:2])
+    ]
+    header_sent = False
+    
+    try:
+        for index in range(len(sentences)):
+            output_path, _ = await tasks[index]
+            if index + 2 < len(sentences):
+                tasks.append(asyncio.create_task(synthesize_speech(
+                    sentences[index + 2], voice_id, requested_engine,
+                    f"stream_{timestamp}_{index + 2:03d}.wav"
+                )))
+            
+            data = await loop.run_in_executor(None, Path(output_path).read_bytes)
+            if data[:4] != b"RIFF":
+                yield "audio/mpeg", data
+                continue
+            
+            with wave.open(io.BytesIO(data)) as segment:
+                if not header_sent:
+                    yield "audio/wav", wav_stream_header(
+                        segment.getframerate(), segment.getnchannels(), segment.getsampwidth()
+                    )
+                    header_sent = True
+                yield "audio/wav", segment.readframes(segment.getnframes())
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def stream_speech_response(text: str, voice_id: str, requested_engine: str) -> StreamingResponse:
+    """Chunked audio response that starts playing before synthesis ends"""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+    
+    engine_name, voice_id = select_tts_voice(voice_id, requested_engine)
+    engine = tts_manager.engines.get(engine_name)
+    
+    async def _prepend(first: bytes, rest):
+        yield first
+        async for chunk in rest:
+            yield chunk
+    
+    async def _holding(slot: contextlib.AsyncExitStack, rest):
+        # The TTS slot stays taken until the last chunk is sent
+        try:
+            async for chunk in rest:
+                yield chunk
+        finally:
+            await slot.aclose()
+    
+    chunks = None
+    if engine is not None and hasattr(engine, "stream"):
+        slot = contextlib.AsyncExitStack()
+        try:
+            await slot.enter_async_context(admission.stage("tts"))
+        except Overloaded as e:
+            raise overloaded_error(e)
         
-        if not tts_result:
-            raise Exception("All TTS engines failed")
+        print(f"🔊 Streaming speech with {engine_name} ({voice_id})...")
+        native = engine.stream(text, voice_id)
         
-        tts_time = time.time() - tts_start
-        print(f"✅ TTS generated in {tts_time:.1f}s")
+        # Pull the first chunk before answering so failures can still fall back
+        try:
+            first = await native.__anext__()
+            media_type = engine.stream_media_type
+            chunks = _holding(slot, _prepend(first, native))
+        except (StopAsyncIteration, Exception) as e:
+            print(f"⚠️  {engine_name} streaming failed: {e}")
+            # The fallback takes its own slot per sentence
+            await slot.aclose()
+    
+    if chunks is None:
+        print(f"🔊 Streaming speech sentence by sentence ({engine_name})...")
+        segments = sentence_audio_stream(text, voice_id, requested_engine)
         
-        total_time = time.time() - start_time
-        print(f"⚡ Total time: {total_time:.1f}s\n")
+        # Media type is known once the first segment exists
+        try:
+            media_type, first = await segments.__anext__()
+        except StopAsyncIteration:
+            raise HTTPException(status_code=500, detail="All TTS engines failed")
+        except Overloaded as e:
+            raise overloaded_error(e)
         
-        return ChatResponse(
-            success=True,
-            response=assistant_message,
-            audio_url=f"/output/{output_filename}",
-            duration=tts_result['audio_duration'],
-            history=history
-        )
+        chunks = _prepend(first, (chunk async for _, chunk in segments))
+    
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/tts/stream")
+async def stream_tts(request: SpeechRequest):
+    """Synthesize speech as a chunked streaming response"""
+    return await stream_speech_response(request.text, request.voice_id, request.engine)
+
+
+@app.get("/api/tts/stream")
+async def stream_tts_get(text: str, voice_id: str = "gtts-en", engine: str = "gtts"):
+    """Streaming speech usable directly as an <audio> source"""
+    return await stream_speech_response(text, voice_id, engine)
+
+
+def pcm16_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap raw 16-bit mono PCM in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+@app.websocket("/ws/voice-chat")
+async def voice_chat_socket(websocket: WebSocket):
+    """
+    Full-duplex voice chat over one WebSocket
+    
+    Client -> server:
+        {"type": "start", "model", "engine", "voice_id", "format": "webm"|"pcm16", "sample_rate"}
+        binary frames                      microphone audio of the current utterance
+        {"type": "end_utterance"}          transcribe buffered audio and answer
+        {"type": "text", "text": "..."}    answer typed text (no STT)
+        (a new utterance or text replaces the answer in progress; transcription
+        and answers run in the background, so cancel is read at any time)
+        {"type": "cancel"}                 barge-in: stop the current answer
+        {"type": "reset"}                  clear conversation history
+    
+    Server -> client:
+        {"type": "transcript", "text"}
+        {"type": "token", "text"}          streamed LLM output
+        {"type": "audio_start", "index", "media_type", "text"}, binary audio, {"type": "audio_end", "index"}
+        {"type": "done", "response", "duration"}
+        {"type": "error", "error"}
+    """
+    await websocket.accept()
+    
+    settings = {
+        "model": "llama3.2:1b",
+        "engine": "gtts",
+        "voice_id": "gtts-en",
+        "format": "webm",
+        "sample_rate": 16000
+    }
+    session = sessions.get(None)
+    audio_buffer = bytearray()
+    responder: Optional[asyncio.Task] = None
+    send_lock = asyncio.Lock()
+    
+    async def send_json(payload: Dict):
+        async with send_lock:
+            await websocket.send_json(payload)
+    
+    async def respond(user_text: str):
+        """Stream tokens and per-sentence audio for one user turn"""
+        start_time = time.time()
+        timestamp = int(time.time() * 1000)
+        await warm_pool.touch(settings["model"])
         
-    except requests.exceptions.Timeout:
-        raise HTTPException(status_code=504, detail="Ollama request timeout (60 seconds) - model may be loading or system overloaded")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        async def tokens():
+            async with admission.stage("llm"):
+                async for chunk in ollama.stream_chat(
+                    settings["model"],
+                    session.messages(user_text),
+                    options=OLLAMA_CHAT_OPTIONS,
+                    timeout=60,
+                    **warm_pool.request_options(settings["model"])
+                ):
+                    content = chunk.get("message", {}).get("content", "")
+                    if content:
+                        await send_json({"type": "token", "text": content})
+                        yield content
+        
+        async def synthesize_sentence(sentence: str, index: int):
+            output_path, tts_result = await synthesize_speech(
+                sentence, settings["voice_id"], settings["engine"], f"ws_{timestamp}_{index:03d}.wav"
+            )
+            data = await asyncio.get_event_loop().run_in_executor(None, Path(output_path).read_bytes)
+            return {"text": sentence, "audio": data, "duration": tts_result.get("audio_duration", 0)}
+        
+        async def send_segment(index: int, segment: Dict):
+            media_type = "audio/wav" if segment["audio"][:4] == b"RIFF" else "audio/mpeg"
+            async with send_lock:
+                await websocket.send_json({
+                    "type": "audio_start", "index": index,
+                    "media_type": media_type, "text": segment["text"]
+                })
+                await websocket.send_bytes(segment["audio"])
+                await websocket.send_json({"type": "audio_end", "index": index})
+        
+        # Barge-in cancels before commit, so unanswered turns never enter history
+        try:
+            async with session.lock:
+                assistant_message, segments = await pipeline_speech(
+                    tokens(), synthesize_sentence, on_segment=send_segment
+                )
+                assistant_message = assistant_message.strip()
+                session.commit(user_text, assistant_message)
+            schedule_compaction(session, settings["model"])
+            
+            print(f"⚡ Voice turn done in {time.time() - start_time:.1f}s ({len(segments)} segments)")
+            await send_json({
+                "type": "done",
+                "response": assistant_message,
+                "duration": sum(segment["duration"] for segment in segments)
+            })
+        except Exception as e:
+            print(f"❌ Voice chat error: {e}")
+            await send_json({"type": "error", "error": str(e)})
+    
+    async def respond_to_audio(clip: bytes, ext: str):
+        """Transcribe an utterance, then answer it"""
+        result = await recognize_speech(clip, ext)
+        if not result["success"] or not result["text"].strip():
+            await send_json({"type": "error", "error": result["error"] or "No speech recognized"})
+            return
+        
+        await send_json({"type": "transcript", "text": result["text"]})
+        await respond(result["text"])
+    
+    def start_turn(turn):
+        """Run a turn in the background so cancel/barge-in messages are still read"""
+        nonlocal responder
+        if responder is not None and not responder.done():
+            responder.cancel()
+        responder = asyncio.create_task(turn)
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes") is not None:
+                audio_buffer.extend(message["bytes"])
+                continue
+            
+            data = json.loads(message.get("text") or "{}")
+            kind = data.get("type")
+            
+            if kind == "start":
+                settings.update({k: v for k, v in data.items() if k in settings})
+                warm_in_background(settings["model"], reason="selected")
+            
+            elif kind == "end_utterance":
+                if not audio_buffer:
+                    continue
+                if settings["format"] == "pcm16":
+                    clip, ext = pcm16_to_wav(bytes(audio_buffer), int(settings["sample_rate"])), ".wav"
+                else:
+                    clip, ext = bytes(audio_buffer), f".{settings['format']}"
+                audio_buffer.clear()
+                start_turn(respond_to_audio(clip, ext))
+            
+            elif kind == "text":
+                if data.get("text", "").strip():
+                    start_turn(respond(data["text"]))
+            
+            elif kind == "cancel":
+                if responder is not None and not responder.done():
+                    responder.cancel()
+                audio_buffer.clear()
+            
+            elif kind == "reset":
+                session.reset()
+    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if responder is not None and not responder.done():
+            responder.cancel()
+        sessions.drop(session.id)
+        print("🔌 Voice chat socket closed")
 
 
 @app.get("/api/models")
 async def get_models():
     """Get available Ollama models"""
     try:
-        import requests
-        response = requests.get(f"{ollama_host}/api/tags", timeout=10)
-        
-        if response.status_code == 200:
-            models = response.json().get('models', [])
-            return {
-                "models": [
-                    {
-                        "name": m['name'],
-                        "size": m.get('size', 0)
-                    }
-                    for m in models
-                ]
-            }
-        else:
-            return {"models": []}
-    except:
+        models = await ollama.tags(timeout=10)
+        return {
+            "models": [
+                {
+                    "name": m['name'],
+                    "size": m.get('size', 0)
+                }
+                for m in models
+            ]
+        }
+    except Exception:
         return {"models": []}
 
 
+class WarmRequest(BaseModel):
+    model: str
+
+
+@app.post("/api/models/warm")
+async def warm_model(request: WarmRequest):
+    """Load a model ahead of its first chat (e.g. when the user selects it)"""
+    if warm_pool.is_resident(request.model):
+        return {"model": request.model, "status": "resident"}
+    
+    warm_in_background(request.model, reason="selected")
+    return {"model": request.model, "status": "loading"}
+
+
+def warm_in_background(model: str, reason: str):
+    """Start loading a model without waiting for it"""
+    async def _warm():
+        try:
+            await warm_pool.ensure_warm(model, reason=reason)
+        except Exception as e:
+            print(f"Warning: Warming {model} failed: {e}")
+    
+    if not warm_pool.is_resident(model):
+        asyncio.create_task(_warm())
+
+
+@app.get("/api/models/loaded")
+async def loaded_models():
+    """Warm pool state: resident models, pinned models and memory budget"""
+    return warm_pool.status()
+
+
+@app.get("/api/admission")
+async def admission_status():
+    """Stage load, queue depths and measured service times"""
+    return admission.status()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/api/voices")
 async def get_voices():
     """Get available TTS voices"""
@@ -307,117 +1068,138 @@ async def get_voices():
 @app.post("/api/speech-to-text")
 async def speech_to_text(file: UploadFile = File(...)):
     """Convert speech to text"""
+    file_ext = ".webm" if file.filename and ".webm" in file.filename else ".wav"
     try:
-        # Save uploaded file with original extension
-        timestamp = int(time.time() * 1000)
-        file_ext = ".webm" if file.filename and ".webm" in file.filename else ".wav"
-        temp_path = f"uploads/temp_audio_{timestamp}{file_ext}"
-        
-        os.makedirs("uploads", exist_ok=True)
-        
-        with open(temp_path, "wb") as f:
-            contents = await file.read()
-            f.write(contents)
-        
-        print(f"Processing audio file: {temp_path} ({len(contents)} bytes)")
-        
-        # Try to use speech recognition with WebM support
+        contents = await file.read()
+    except Exception as e:
+        return {
+            "success": False,
+            "text": "",
+            "error": f"Upload error: {str(e)}"
+        }
+    
+    return await recognize_speech(contents, file_ext)
+
+
+async def decode_audio(contents: bytes, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Decode an audio clip in memory to float32 mono PCM
+    
+    16-bit WAV at the target rate is read directly; anything else (WebM,
+    Ogg, MP3, other rates) is piped through ffmpeg without touching disk.
+    """
+    if contents[:4] == b"RIFF":
         try:
-            import speech_recognition as sr
-            
-            recognizer = sr.Recognizer()
-            recognizer.energy_threshold = 300
-            recognizer.dynamic_energy_threshold = True
-            
-            # Handle WebM files with pydub + FFmpeg conversion
-            if file_ext == ".webm":
-                print("Converting WebM to WAV using FFmpeg...")
-                try:
-                    from pydub import AudioSegment
-                    import io
-                    
-                    # Load WebM and convert to WAV
-                    audio = AudioSegment.from_file(temp_path, format="webm")
-                    wav_io = io.BytesIO()
-                    audio.export(wav_io, format="wav")
-                    wav_io.seek(0)
-                    
-                    # Process with speech recognition
-                    with sr.AudioFile(wav_io) as source:
-                        recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                        audio_data = recognizer.record(source)
-                    print("WebM converted and processed successfully")
-                    
-                except Exception as webm_error:
-                    print(f"WebM conversion failed: {webm_error}")
-                    raise Exception(f"WebM processing failed: {webm_error}")
-            else:
-                # Process WAV/other formats directly
-                try:
-                    with sr.AudioFile(temp_path) as source:
-                        recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                        audio_data = recognizer.record(source)
-                    print("Audio processed successfully")
-                except Exception as audio_error:
-                    print(f"Audio processing failed: {audio_error}")
-                    raise Exception(f"Audio file processing failed: {audio_error}")
-            
-            print("Sending to Google Speech Recognition...")
-            text = recognizer.recognize_google(audio_data, language='en-US')
-            
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            
-            print(f"Recognized text: {text}")
-            
-            return {
-                "success": True,
-                "text": text,
-                "error": None
-            }
-            
-        except sr.UnknownValueError:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            return {
-                "success": False,
-                "text": "",
-                "error": "Could not understand audio. Please speak clearly and try again."
-            }
-        except sr.RequestError as e:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            return {
-                "success": False,
-                "text": "",
-                "error": f"Speech recognition service error: {str(e)}"
-            }
-        except ImportError as e:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            return {
-                "success": False,
-                "text": "",
-                "error": "Speech recognition not available. Install: pip install SpeechRecognition pydub"
-            }
-        except Exception as e:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            with wave.open(io.BytesIO(contents)) as clip:
+                if clip.getsampwidth() == 2 and clip.getframerate() == sample_rate:
+                    pcm = np.frombuffer(clip.readframes(clip.getnframes()), dtype=np.int16)
+                    if clip.getnchannels() > 1:
+                        pcm = pcm.reshape(-1, clip.getnchannels()).mean(axis=1)
+                    return pcm.astype(np.float32) / 32768.0
+        except wave.Error:
+            pass  # Let ffmpeg deal with unusual WAV variants
+    
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-ar", str(sample_rate),
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    pcm, errors = await process.communicate(contents)
+    if process.returncode != 0:
+        raise RuntimeError(errors.decode(errors="ignore").strip() or "ffmpeg failed")
+    
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def recognize_google(audio: np.ndarray, sample_rate: int = 16000) -> str:
+    """Fallback recognizer when no local Whisper model is available (blocking)"""
+    import speech_recognition as sr
+    
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    return sr.Recognizer().recognize_google(sr.AudioData(pcm, sample_rate, 2), language='en-US')
+
+
+async def recognize_speech(contents: bytes, file_ext: str) -> Dict:
+    """Transcribe an audio clip (WebM or WAV bytes) entirely in memory"""
+    print(f"Processing audio clip: {file_ext} ({len(contents)} bytes)")
+    
+    try:
+        audio = await decode_audio(contents)
+    except FileNotFoundError:
+        return {
+            "success": False,
+            "text": "",
+            "error": "FFmpeg not found. Install FFmpeg to decode WebM audio, or send 16 kHz WAV."
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "text": "",
+            "error": f"Audio decoding failed: {str(e)}"
+        }
+    
+    loop = asyncio.get_event_loop()
+    try:
+        if stt_batcher is not None:
+            # Shared pre-loaded Whisper model, batched with other requests off the event loop
+            result = await stt_batcher.transcribe(audio)
+            text = result.text
+        else:
+            text = await loop.run_in_executor(stt_executor, recognize_google, audio)
+    except ImportError:
+        return {
+            "success": False,
+            "text": "",
+            "error": "Speech recognition not available. Install: pip install faster-whisper"
+        }
+    except Exception as e:
+        if type(e).__name__ == "UnknownValueError":
+            text = ""
+        else:
             return {
                 "success": False,
                 "text": "",
-                "error": f"Recognition failed: {str(e)}. Try using WAV format or install pydub for WebM support."
+                "error": f"Recognition failed: {str(e)}"
             }
-            
-    except Exception as e:
+    
+    if not text.strip():
         return {
             "success": False,
             "text": "",
-            "error": f"Upload error: {str(e)}"
+            "error": "Could not understand audio. Please speak clearly and try again."
         }
+    
+    print(f"Recognized text: {text}")
+    return {
+        "success": True,
+        "text": text,
+        "error": None
+    }
 
 
+def get_clone_engine():
+    """
+    Long-lived XTTS engine for voice cloning
+    
+    Uses the engine manager's Coqui engine when it has one, otherwise a
+    process-wide instance. The model loads on first use and stays loaded.
+    
+    Raises:
+        ImportError: If torch / Coqui TTS aren't installed
+    """
+    global clone_engine
+    if clone_engine is None:
+        engines = getattr(tts_manager, "engines", {})
+        if "coqui" in engines:
+            clone_engine = engines["coqui"]
+        else:
+            from coqui_engine import CoquiTTSEngine
+            clone_engine = CoquiTTSEngine("./models_cache")
+    return clone_engine
 
 
 @app.post("/api/voice-clone")
@@ -442,27 +1224,31 @@ async def voice_clone(file: UploadFile = File(...), text: str = Form(""), voice_
         
         print(f"Voice sample saved: {voice_name} ({len(contents)} bytes)")
         
+        # A new sample invalidates the speaker's cached latents
+        if clone_engine is not None:
+            clone_engine.forget_speaker(voice_name)
+        
         # If text provided, try voice cloning
         if text:
-            output_path = f"output/cloned_{voice_name}_{timestamp}.wav"
+            output_path = str(artifacts.path_for(f"cloned_{voice_name}_{timestamp}.wav"))
+            audio_url = artifacts.url_for(output_path)
             
             # Try advanced voice cloning first
             try:
-                from TTS.api import TTS
                 print("Using Coqui TTS for voice cloning...")
                 
-                tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-                tts.tts_to_file(
+                await get_clone_engine().clone_voice(
                     text=text,
-                    speaker_wav=sample_path,
+                    speaker_audio_path=sample_path,
+                    output_path=output_path,
                     language="en",
-                    file_path=output_path
+                    voice_name=voice_name
                 )
                 
                 return {
                     "success": True,
                     "voice_id": voice_name,
-                    "audio_url": f"/output/cloned_{voice_name}_{timestamp}.wav",
+                    "audio_url": audio_url,
                     "method": "coqui_xtts",
                     "message": f"Voice cloned successfully using Coqui TTS! Sample: '{voice_name}'"
                 }
@@ -478,7 +1264,7 @@ async def voice_clone(file: UploadFile = File(...), text: str = Form(""), voice_
                     return {
                         "success": False,
                         "voice_id": voice_name,
-                        "audio_url": f"/output/cloned_{voice_name}_{timestamp}.wav",
+                        "audio_url": audio_url,
                         "method": "gtts_fallback",
                         "message": f"Voice cloning failed: Advanced TTS not available. Voice sample saved as '{voice_name}' but cannot clone voice characteristics. Install 'pip install TTS torch torchaudio' for true voice cloning."
                     }
@@ -502,7 +1288,7 @@ async def voice_clone(file: UploadFile = File(...), text: str = Form(""), voice_
                     return {
                         "success": False,
                         "voice_id": voice_name,
-                        "audio_url": f"/output/cloned_{voice_name}_{timestamp}.wav",
+                        "audio_url": audio_url,
                         "method": "gtts_fallback",
                         "message": f"Voice cloning failed: Cannot clone voice characteristics. Voice sample saved but using generic TTS. Install Coqui TTS for true voice cloning."
                     }
@@ -0,0 +1,156 @@
+"""
+Async Ollama client
+Shared, pooled HTTP client so Ollama calls never block the event loop
+"""
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before the Ollama call finished"""
+
+
+class OllamaClient:
+    """Pooled keep-alive client for the Ollama REST API"""
+
+    def __init__(
+        self,
+        host: str = "http://localhost:11434",
+        max_connections: int = 32,
+        keepalive_connections: int = 16,
+        keepalive_expiry: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            transport: Custom httpx transport (e.g. httpx.MockTransport in tests)
+        """
+        self.host = host
+        self._client = httpx.AsyncClient(
+            base_url=host,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            transport=transport
+        )
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        options: Optional[Dict] = None,
+        timeout: float = 60.0,
+        **extra
+    ) -> Dict:
+        """Non-streaming chat completion"""
+        payload = {"model": model, "messages": messages, "stream": False, **extra}
+        if options:
+            payload["options"] = options
+
+        response = await self._client.post("/api/chat", json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def stream_chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        options: Optional[Dict] = None,
+        timeout: float = 60.0,
+        **extra
+    ) -> AsyncIterator[Dict]:
+        """Streaming chat completion, yielding Ollama's NDJSON chunks as they arrive"""
+        payload = {"model": model, "messages": messages, "stream": True, **extra}
+        if options:
+            payload["options"] = options
+
+        async with self._client.stream("POST", "/api/chat", json=payload, timeout=timeout) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict] = None,
+        timeout: float = 30.0,
+        **extra
+    ) -> Dict:
+        """Non-streaming text generation"""
+        payload = {"model": model, "prompt": prompt, "stream": False, **extra}
+        if options:
+            payload["options"] = options
+
+        response = await self._client.post("/api/generate", json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def embeddings(self, model: str, prompt: str, timeout: float = 10.0, **extra) -> List[float]:
+        """Embedding vector of a text"""
+        response = await self._client.post(
+            "/api/embeddings",
+            json={"model": model, "prompt": prompt, **extra},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        return response.json()["embedding"]
+
+    async def tags(self, timeout: float = 10.0) -> List[Dict]:
+        """Locally available models"""
+        response = await self._client.get("/api/tags", timeout=timeout)
+        response.raise_for_status()
+        return response.json().get("models", [])
+
+    async def ps(self, timeout: float = 10.0) -> List[Dict]:
+        """Models currently loaded in memory"""
+        response = await self._client.get("/api/ps", timeout=timeout)
+        response.raise_for_status()
+        return response.json().get("models", [])
+
+
+async def cancel_on_disconnect(request, coro, poll_interval: float = 0.25):
+    """
+    Run a coroutine, cancelling it if the HTTP client disconnects
+
+    Args:
+        request: Starlette/FastAPI Request of the caller
+        coro: Awaitable doing the work (e.g. an Ollama call)
+        poll_interval: Seconds between disconnect checks
+
+    Raises:
+        ClientDisconnected: If the caller went away first
+    """
+    task = asyncio.ensure_future(coro)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+# Global instance
+_ollama_client = None
+
+def get_ollama_client(host: str = "http://localhost:11434") -> OllamaClient:
+    global _ollama_client
+    if _ollama_client is None:
+        _ollama_client = OllamaClient(host)
+    return _ollama_client
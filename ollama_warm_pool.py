@@ -0,0 +1,210 @@
+"""
+Ollama warm pool
+Keeps selected models resident with keep_alive and evicts by LRU within a RAM budget
+"""
+import asyncio
+import time
+from typing import Dict, List, Set
+
+
+class OllamaWarmPool:
+    """
+    Manages which models Ollama keeps in memory
+
+    Configured models are loaded at startup and re-warmed if Ollama drops
+    them. Other models are warmed on demand (e.g. when a user selects one
+    in the UI). Every chat passes keep_alive so resident models don't time
+    out, and when loading a model would exceed the RAM budget the least
+    recently used non-pinned model is unloaded first (keep_alive=0).
+    Room is made and the model's size reserved under a lock before it
+    loads, whether a background warm-up or a chat to a cold model loads
+    it, so concurrent loads cannot overshoot the budget together.
+    Resident state is synced from Ollama's /api/ps.
+    """
+
+    def __init__(
+        self,
+        client,
+        pinned: List[str],
+        ram_budget: int = 8 * 1024 ** 3,
+        keep_alive: str = "30m",
+        metrics=None
+    ):
+        """
+        Args:
+            client: OllamaClient
+            pinned: Models always kept resident
+            ram_budget: Bytes Ollama may use for loaded models
+            keep_alive: keep_alive sent with every request for pooled models
+            metrics: Optional ServerMetrics
+        """
+        self.client = client
+        self.pinned = list(pinned)
+        self.ram_budget = ram_budget
+        self.keep_alive = keep_alive
+        self.metrics = metrics
+
+        self.resident: Dict[str, int] = {}      # model -> bytes in memory
+        self.last_used: Dict[str, float] = {}
+        self.model_sizes: Dict[str, int] = {}   # from /api/tags, for not-yet-loaded models
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._reserved: Set[str] = set()        # Loads in progress (counted, never evicted)
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _normalize(model: str) -> str:
+        return model if ":" in model else f"{model}:latest"
+
+    async def refresh(self):
+        """Sync resident models from Ollama"""
+        loaded = await self.client.ps()
+        self.resident = {
+            self._normalize(m["name"]): m.get("size", 0)
+            for m in loaded
+        }
+        # Models still loading are not listed yet but already use their share
+        for model in self._reserved:
+            self.resident.setdefault(model, self.model_sizes.get(model, 0))
+        if self.metrics:
+            self.metrics.set_resident(len(self.resident), sum(self.resident.values()))
+
+    async def _refresh_sizes(self):
+        try:
+            for m in await self.client.tags():
+                self.model_sizes[self._normalize(m["name"])] = m.get("size", 0)
+        except Exception:
+            pass
+
+    def is_resident(self, model: str) -> bool:
+        return self._normalize(model) in self.resident
+
+    async def touch(self, model: str) -> bool:
+        """
+        Record a chat request for a model, making room if it is cold
+
+        Returns:
+            True if the model was cold (not resident) when requested
+        """
+        model = self._normalize(model)
+        cold = model not in self.resident
+        self.last_used[model] = time.time()
+        if self.metrics:
+            self.metrics.observe_model_request(model, cold)
+            if cold:
+                self.metrics.observe_cold_load(model, "request")
+        if cold:
+            # Ollama loads it as part of this request
+            await self._reserve(model)
+        return cold
+
+    async def ensure_warm(self, model: str, reason: str = "prewarm"):
+        """Load a model in the background unless it is resident or already loading"""
+        model = self._normalize(model)
+        task = self._loading.get(model)
+        if task is None or task.done():
+            # Reserved models count as resident while they load
+            if model in self.resident:
+                self.last_used[model] = time.time()
+                return
+            task = asyncio.create_task(self._load(model, reason))
+            self._loading[model] = task
+        await task
+
+    async def _reserve(self, model: str) -> bool:
+        """
+        Evict to fit a model and count it as resident before it loads
+
+        Returns:
+            False if it was already resident (or being loaded)
+        """
+        while True:
+            async with self._lock:
+                if model in self.resident:
+                    return False
+                if not self.model_sizes:
+                    await self._refresh_sizes()
+                fits = await self._make_room(model)
+                loading = [self._loading[m] for m in self._reserved if m in self._loading]
+                if fits or not loading:
+                    self.resident[model] = self.model_sizes.get(model, 0)
+                    return True
+            # Models still loading can't be evicted yet: wait for them, then retry
+            await asyncio.wait(loading)
+
+    async def _load(self, model: str, reason: str):
+        if not await self._reserve(model):
+            return  # A chat request is loading it
+        self._reserved.add(model)
+
+        print(f"🔥 Warming {model} ({reason})...")
+        start = time.time()
+        try:
+            # A generate request without a prompt just loads the model
+            await self.client.generate(model, "", keep_alive=self.keep_alive, timeout=120)
+        except BaseException:
+            self.resident.pop(model, None)  # Give the reservation back
+            raise
+        finally:
+            self._reserved.discard(model)
+        print(f"✅ {model} resident after {time.time() - start:.1f}s")
+
+        self.last_used[model] = time.time()
+        if self.metrics:
+            self.metrics.observe_cold_load(model, reason)
+
+    async def _make_room(self, model: str) -> bool:
+        """
+        Unload least recently used models until the new one fits the budget
+
+        Returns:
+            True if it fits
+        """
+        needed = self.model_sizes.get(model, 0)
+        used = sum(self.resident.values())
+
+        candidates = sorted(
+            (m for m in self.resident if m not in self.pinned and m not in self._reserved and m != model),
+            key=lambda m: self.last_used.get(m, 0)
+        )
+        for victim in candidates:
+            if used + needed <= self.ram_budget:
+                break
+            print(f"💤 Evicting {victim} to fit {model}")
+            used -= self.resident.get(victim, 0)
+            await self.unload(victim)
+            if self.metrics:
+                self.metrics.observe_eviction(victim)
+        return used + needed <= self.ram_budget
+
+    async def unload(self, model: str):
+        await self.client.generate(model, "", keep_alive=0, timeout=30)
+        self.resident.pop(self._normalize(model), None)
+
+    def request_options(self, model: str) -> Dict:
+        """Extra fields for chat/generate requests of a model"""
+        return {"keep_alive": self.keep_alive}
+
+    async def run(self, interval: float = 30.0):
+        """Warm pinned models and keep them resident"""
+        pinned = [self._normalize(m) for m in self.pinned]
+        self.pinned = pinned
+        await self._refresh_sizes()
+
+        while True:
+            try:
+                await self.refresh()
+                for model in pinned:
+                    if model not in self.resident:
+                        await self.ensure_warm(model, reason="pinned")
+            except Exception as e:
+                print(f"Warning: Warm pool refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+    def status(self) -> Dict:
+        return {
+            "resident": {m: size for m, size in self.resident.items()},
+            "pinned": self.pinned,
+            "ram_budget": self.ram_budget,
+            "used": sum(self.resident.values()),
+            "loading": [m for m, t in self._loading.items() if not t.done()]
+        }
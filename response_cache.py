@@ -0,0 +1,161 @@
+"""
+Response cache
+Serves repeated questions without calling Ollama or the TTS engine
+"""
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a question"""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+class CachedResponse:
+    """An LLM reply plus the audio already synthesized for it"""
+
+    def __init__(self, model: str, query: str, response: str, embedding: Optional[np.ndarray] = None):
+        self.model = model
+        self.query = query
+        self.response = response
+        self.embedding = embedding
+        self.created_at = time.time()
+        self.audio: Dict[Tuple[str, str], Dict] = {}   # (voice_id, engine) -> {"path", "duration"}
+
+    def get_audio(self, voice_id: str, engine: str) -> Optional[Dict]:
+        audio = self.audio.get((voice_id, engine))
+        if audio is not None and not os.path.exists(audio["path"]):
+            del self.audio[(voice_id, engine)]
+            return None
+        return audio
+
+    def add_audio(self, voice_id: str, engine: str, path: str, duration: float):
+        self.audio[(voice_id, engine)] = {"path": path, "duration": duration}
+
+
+class ResponseCache:
+    """
+    Two-tier cache for first-turn chat replies
+
+    The exact tier matches normalized question text per model. The
+    optional semantic tier embeds the question and returns the closest
+    cached question of the same model if its cosine similarity reaches
+    the threshold ("what time do you open" ~ "what are your hours").
+    Embeddings are kept in an in-process matrix searched by brute force,
+    which is plenty for the few thousand entries the cache holds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        ttl: float = 3600.0,
+        embed: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+        threshold: float = 0.92,
+        metrics=None
+    ):
+        """
+        Args:
+            max_entries: Entries kept (least recently used evicted)
+            ttl: Seconds an entry stays valid
+            embed: Coroutine text -> embedding; None disables the semantic tier
+            threshold: Minimum cosine similarity for a semantic hit
+            metrics: Optional ServerMetrics
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed = embed
+        self.threshold = threshold
+        self.metrics = metrics
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self.stats = {"exact": 0, "semantic": 0, "miss": 0}
+
+    async def _embedding(self, text: str) -> Optional[np.ndarray]:
+        if self.embed is None:
+            return None
+        try:
+            vector = np.asarray(await self.embed(text), dtype=np.float32)
+        except Exception as e:
+            print(f"Warning: Query embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for key in [k for k, e in self._entries.items() if e.created_at < cutoff]:
+            del self._entries[key]
+
+    def _record(self, result: str):
+        self.stats[result] += 1
+        if self.metrics:
+            total = sum(self.stats.values())
+            hits = self.stats["exact"] + self.stats["semantic"]
+            self.metrics.observe_response_cache(result, hits / total, len(self._entries))
+
+    async def lookup(self, model: str, text: str) -> Tuple[Optional[CachedResponse], Optional[np.ndarray]]:
+        """
+        Find a cached reply
+
+        Returns:
+            (entry or None, query embedding) - the embedding is handed back
+            so a following store() doesn't compute it again
+        """
+        self._expire()
+        key = (model, normalize_query(text))
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._record("exact")
+            return entry, None
+
+        embedding = await self._embedding(text)
+        if embedding is not None:
+            candidates = [
+                (k, e) for k, e in self._entries.items()
+                if e.model == model and e.embedding is not None and e.embedding.shape == embedding.shape
+            ]
+            if candidates:
+                matrix = np.stack([e.embedding for _, e in candidates])
+                scores = matrix @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    best_key, entry = candidates[best]
+                    self._entries.move_to_end(best_key)
+                    print(f"🧠 Semantic cache hit ({scores[best]:.3f}): \"{entry.query}\"")
+                    self._record("semantic")
+                    return entry, embedding
+
+        self._record("miss")
+        return None, embedding
+
+    async def store(
+        self,
+        model: str,
+        text: str,
+        response: str,
+        embedding: Optional[np.ndarray] = None
+    ) -> CachedResponse:
+        """Cache a reply (attach audio with entry.add_audio)"""
+        if embedding is None:
+            embedding = await self._embedding(text)
+
+        key = (model, normalize_query(text))
+        entry = CachedResponse(model, key[1], response, embedding)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
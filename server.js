@@ -66,6 +66,13 @@ const upload = multer({
   }
 });
 
+// Priority lanes consumed by the TTS worker (see tts-engines/job_queue.py)
+const QUEUE_LANES = {
+  interactive: 'tts:jobs:interactive',
+  standard: 'tts:jobs',
+  bulk: 'tts:jobs:bulk'
+};
+
 // Voice models configuration
 const VOICE_MODELS = [
   { id: 'en-US-GuyNeural', name: 'Morgan Freeman-like', language: 'en-US', gender: 'Male' },
@@ -87,7 +94,7 @@ const VOICE_MODELS = [
 // Get Speech API - Main TTS endpoint
 app.post('/api/v1/lightning/get_speech', apiLimiter, authenticateToken, async (req, res) => {
   try {
-    const { voice_id, text, sample_rate = 24000, add_wav_header = true, output_format = 'mp3' } = req.body;
+    const { voice_id, text, sample_rate = 24000, add_wav_header = true, output_format = 'mp3', priority = 'standard' } = req.body;
 
     // Validation
     if (!voice_id || !text) {
@@ -114,6 +121,13 @@ app.post('/api/v1/lightning/get_speech', apiLimiter, authenticateToken, async (r
       });
     }
 
+    if (!QUEUE_LANES[priority]) {
+      return res.status(400).json({ 
+        error: 'Invalid priority',
+        allowed: Object.keys(QUEUE_LANES)
+      });
+    }
+
     // Create job
     const jobId = uuidv4();
     const outputFilename = `audio_${jobId}.${output_format}`;
@@ -127,12 +141,14 @@ app.post('/api/v1/lightning/get_speech', apiLimiter, authenticateToken, async (r
       add_wav_header,
       output_format,
       outputFilename,
+      priority,
       status: 'pending',
-      createdAt: new Date().toISOString()
+      createdAt: new Date().toISOString(),
+      enqueuedAt: Date.now() / 1000
     };
 
-    // Add job to Redis queue
-    await redis.lpush('tts:jobs', JSON.stringify(job));
+    // Add job to its priority lane
+    await redis.lpush(QUEUE_LANES[priority], JSON.stringify(job));
     await redis.set(`job:${jobId}`, JSON.stringify(job), 'EX', 3600); // Expire in 1 hour
 
     res.json({
@@ -222,11 +238,13 @@ app.post('/api/v1/pdf/convert', upload.single('file'), apiLimiter, authenticateT
       sample_rate,
       inputFile: req.file.filename,
       outputFilename,
+      priority: 'bulk',
       status: 'pending',
-      createdAt: new Date().toISOString()
+      createdAt: new Date().toISOString(),
+      enqueuedAt: Date.now() / 1000
     };
 
-    await redis.lpush('tts:jobs', JSON.stringify(job));
+    await redis.lpush(QUEUE_LANES.bulk, JSON.stringify(job));
     await redis.set(`job:${jobId}`, JSON.stringify(job), 'EX', 3600);
 
     res.json({
@@ -271,11 +289,13 @@ app.post('/api/v1/batch/convert', apiLimiter, authenticateToken, async (req, res
         text: item.text,
         sample_rate,
         outputFilename,
+        priority: 'bulk',
         status: 'pending',
-        createdAt: new Date().toISOString()
+        createdAt: new Date().toISOString(),
+        enqueuedAt: Date.now() / 1000
       };
 
-      await redis.lpush('tts:jobs', JSON.stringify(job));
+      await redis.lpush(QUEUE_LANES.bulk, JSON.stringify(job));
       await redis.set(`job:${jobId}`, JSON.stringify(job), 'EX', 3600);
       jobIds.push(jobId);
     }
@@ -363,11 +383,13 @@ app.post('/upload', upload.single('pdf'), async (req, res) => {
       voice_id: voice,
       inputFile: req.file.filename,
       outputFilename,
+      priority: 'bulk',
       status: 'pending',
-      createdAt: new Date().toISOString()
+      createdAt: new Date().toISOString(),
+      enqueuedAt: Date.now() / 1000
     };
 
-    await redis.lpush('tts:jobs', JSON.stringify(job));
+    await redis.lpush(QUEUE_LANES.bulk, JSON.stringify(job));
     await redis.set(`job:${jobId}`, JSON.stringify(job), 'EX', 3600);
 
     res.json({
@@ -0,0 +1,155 @@
+"""
+API server metrics
+Prometheus counters and gauges for the Ollama voice API server
+"""
+from typing import List, Tuple
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+class ServerMetrics:
+    """
+    Metrics surface of the API server, served on /metrics
+
+    Without prometheus_client installed every method is a no-op.
+    """
+
+    def __init__(self):
+        self.enabled = PROMETHEUS_AVAILABLE
+        if not self.enabled:
+            print("Warning: Metrics disabled (requires prometheus-client package)")
+            return
+
+        self.model_requests = Counter(
+            "ollama_model_requests_total",
+            "Chat requests per model, by whether the model was already resident",
+            ["model", "state"]
+        )
+        self.cold_loads = Counter(
+            "ollama_cold_loads_total",
+            "Model loads into Ollama memory",
+            ["model", "reason"]
+        )
+        self.evictions = Counter(
+            "ollama_evictions_total",
+            "Models unloaded to stay within the RAM budget",
+            ["model"]
+        )
+        self.resident_models = Gauge(
+            "ollama_models_resident",
+            "Models currently loaded in Ollama"
+        )
+        self.resident_bytes = Gauge(
+            "ollama_resident_bytes",
+            "Memory used by loaded Ollama models"
+        )
+        self.response_cache_requests = Counter(
+            "chat_response_cache_requests_total",
+            "Response cache lookups",
+            ["result"]
+        )
+        self.response_cache_hit_ratio = Gauge(
+            "chat_response_cache_hit_ratio",
+            "Share of response cache lookups served from cache since startup"
+        )
+        self.response_cache_entries = Gauge(
+            "chat_response_cache_entries",
+            "Replies held in the response cache"
+        )
+        self.rejections = Counter(
+            "admission_rejections_total",
+            "Requests rejected by admission control",
+            ["stage", "reason"]
+        )
+        self.stage_waiting = Gauge(
+            "admission_stage_waiting",
+            "Requests queued for a stage slot",
+            ["stage"]
+        )
+        self.stage_active = Gauge(
+            "admission_stage_active",
+            "Requests holding a stage slot",
+            ["stage"]
+        )
+        self.stage_service_time = Gauge(
+            "admission_stage_service_seconds",
+            "Smoothed service time of a stage",
+            ["stage"]
+        )
+        self.stt_tier = Gauge(
+            "stt_model_tier",
+            "Whisper model tier serving requests (1 = active)",
+            ["tier"]
+        )
+        self.stt_tier_switches = Counter(
+            "stt_tier_switches_total",
+            "Load-driven switches between Whisper model tiers",
+            ["from_tier", "to_tier"]
+        )
+        self.stt_queue_wait = Gauge(
+            "stt_queue_wait_seconds",
+            "Smoothed queue wait of the active Whisper tier"
+        )
+
+    def render(self) -> Tuple[bytes, str]:
+        """Prometheus text exposition"""
+        if not self.enabled:
+            return b"", "text/plain"
+        return generate_latest(), CONTENT_TYPE_LATEST
+
+    def observe_model_request(self, model: str, cold: bool):
+        if self.enabled:
+            self.model_requests.labels(model, "cold" if cold else "warm").inc()
+
+    def observe_cold_load(self, model: str, reason: str):
+        if self.enabled:
+            self.cold_loads.labels(model, reason).inc()
+
+    def observe_eviction(self, model: str):
+        if self.enabled:
+            self.evictions.labels(model).inc()
+
+    def set_resident(self, count: int, size: int):
+        if self.enabled:
+            self.resident_models.set(count)
+            self.resident_bytes.set(size)
+
+    def observe_rejection(self, stage: str, reason: str):
+        if self.enabled:
+            self.rejections.labels(stage, reason).inc()
+
+    def set_stage_load(self, stage: str, waiting: int, active: int, service_time: float):
+        if self.enabled:
+            self.stage_waiting.labels(stage).set(waiting)
+            self.stage_active.labels(stage).set(active)
+            self.stage_service_time.labels(stage).set(service_time)
+
+    def set_stt_tier(self, tier: str, tiers: List[str], queue_wait: float):
+        if self.enabled:
+            for name in tiers:
+                self.stt_tier.labels(name).set(1 if name == tier else 0)
+            self.stt_queue_wait.set(queue_wait)
+
+    def observe_stt_tier_switch(self, from_tier: str, to_tier: str):
+        if self.enabled:
+            self.stt_tier_switches.labels(from_tier, to_tier).inc()
+
+    def observe_response_cache(self, result: str, hit_ratio: float, entries: int):
+        if self.enabled:
+            self.response_cache_requests.labels(result).inc()
+            self.response_cache_hit_ratio.set(hit_ratio)
+            self.response_cache_entries.set(entries)
+
+
+# Global instance
+_server_metrics = None
+
+def get_server_metrics() -> ServerMetrics:
+    global _server_metrics
+    if _server_metrics is None:
+        _server_metrics = ServerMetrics()
+    return _server_metrics
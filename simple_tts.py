@@ -60,6 +60,8 @@ class SimpleTTSManager:
         return voices
 
 class EdgeTTSSimple:
+    stream_media_type = "audio/mpeg"
+    
     async def synthesize(self, text, voice_id, output_path, **kwargs):
         import edge_tts
         
@@ -75,6 +77,18 @@ class EdgeTTSSimple:
             "audio_duration": len(text) * 0.1
         }
     
+    async def stream(self, text, voice_id, **kwargs):
+        """Yield MP3 chunks as Edge TTS produces them"""
+        import edge_tts
+        
+        if not voice_id or voice_id == "auto":
+            voice_id = "en-US-AriaNeural"
+        
+        communicate = edge_tts.Communicate(text, voice_id)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+    
     def get_voices(self):
         return [
             {"id": "en-US-AriaNeural", "name": "Aria (US)", "language": "en-US"},
@@ -83,6 +97,8 @@ class EdgeTTSSimple:
         ]
 
 class GTTSSimple:
+    stream_media_type = "audio/mpeg"
+    
     def __init__(self):
         self.lang_map = {
             "gtts-en": "en",
@@ -120,6 +136,21 @@ class GTTSSimple:
             "audio_duration": len(text) * 0.1
         }
     
+    async def stream(self, text, voice_id, **kwargs):
+        """Yield MP3 chunks per text part as Google returns them"""
+        from gtts import gTTS
+        
+        lang = self.lang_map.get(voice_id, "en")
+        parts = gTTS(text=text, lang=lang, slow=False).stream()
+        loop = asyncio.get_event_loop()
+        
+        while True:
+            # gTTS streams with blocking HTTP calls; fetch each part off-loop
+            chunk = await loop.run_in_executor(None, next, parts, None)
+            if chunk is None:
+                break
+            yield chunk
+    
     def get_voices(self):
         return [
             {"id": "gtts-en", "name": "Google English (US)", "language": "en"},
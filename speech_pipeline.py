@@ -0,0 +1,199 @@
+"""
+Sentence-pipelined LLM-to-TTS
+Synthesizes each sentence while the model is still generating the next
+"""
+import asyncio
+import io
+import re
+import struct
+import wave
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r'[.!?…]+["\'”’)\]]*\s+|\n+')
+
+
+class SentenceSplitter:
+    """Cuts a stream of tokens into sentences as boundaries appear"""
+
+    def __init__(self, min_chars: int = 20):
+        """
+        Args:
+            min_chars: Shorter pieces ("Hi!", "Dr.") are merged with the next sentence
+        """
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add generated text, returning the sentences it completed"""
+        self.buffer += text
+        sentences = []
+        start = 0
+
+        for match in _SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue  # Keep accumulating into the next boundary
+            sentences.append(candidate)
+            start = match.end()
+
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once generation has finished"""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return [rest] if rest else []
+
+
+async def pipeline_speech(
+    tokens: AsyncIterator[str],
+    synthesize: Callable[[str, int], Awaitable[dict]],
+    min_chars: int = 20,
+    max_parallel: int = 2,
+    on_segment: Optional[Callable[[int, dict], Awaitable[None]]] = None
+) -> Tuple[str, List[dict]]:
+    """
+    Stream tokens into sentence-level TTS
+
+    Each sentence is handed to synthesize() as soon as it is complete, so
+    audio for the first sentence is ready roughly one sentence of LLM time
+    plus one sentence of TTS time after the request starts.
+
+    Args:
+        tokens: Async iterator of generated text pieces
+        synthesize: Coroutine (sentence, index) -> segment result
+        min_chars: Minimum sentence length sent to TTS
+        max_parallel: Sentences synthesized concurrently
+        on_segment: Coroutine (index, result) called in sentence order as
+            soon as each segment is ready (for streaming to a client)
+
+    Returns:
+        (full response text, segment results in sentence order)
+    """
+    splitter = SentenceSplitter(min_chars)
+    semaphore = asyncio.Semaphore(max_parallel)
+    tasks = []
+    emitters = []
+    parts = []
+
+    async def _bounded(sentence: str, index: int):
+        async with semaphore:
+            return await synthesize(sentence, index)
+
+    async def _emit(previous, task, index: int):
+        # Chained so segments reach the callback strictly in order
+        if previous is not None:
+            await previous
+        result = await task
+        await on_segment(index, result)
+        return result
+
+    def _schedule(sentences: List[str]):
+        for sentence in sentences:
+            index = len(tasks)
+            task = asyncio.create_task(_bounded(sentence, index))
+            tasks.append(task)
+            if on_segment is not None:
+                previous = emitters[-1] if emitters else None
+                emitters.append(asyncio.create_task(_emit(previous, task, index)))
+
+    try:
+        async for token in tokens:
+            parts.append(token)
+            _schedule(splitter.feed(token))
+        _schedule(splitter.flush())
+
+        results = await asyncio.gather(*tasks)
+        await asyncio.gather(*emitters)
+    except BaseException:
+        for task in tasks + emitters:
+            task.cancel()
+        raise
+
+    return "".join(parts), list(results)
+
+
+async def stream_events(
+    produce: Callable[[Callable[[dict], Awaitable[None]]], Awaitable[dict]]
+) -> AsyncIterator[dict]:
+    """
+    Yield the events a producer emits while it is still running
+
+    produce(emit) runs as a task; every dict it passes to emit() is
+    yielded as soon as it arrives, then {"type": "done", **result} once
+    it returns. Its exception is raised from the iterator, and closing
+    the iterator early (client gone) cancels it.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(produce(queue.put))
+
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                break
+            yield getter.result()
+
+        while not queue.empty():
+            yield queue.get_nowait()
+        yield {"type": "done", **(await task)}
+    finally:
+        task.cancel()
+
+
+def join_audio_segments(paths: List[str], output_path: str) -> bool:
+    """
+    Concatenate per-sentence audio files into one file (blocking)
+
+    WAV segments are joined frame by frame under a single header; MP3
+    segments are concatenated frame streams. Returns False (writing
+    nothing) when WAV segments differ in format.
+    """
+    segments = []
+    for path in paths:
+        with open(path, "rb") as f:
+            segments.append(f.read())
+
+    if not all(data[:4] == b"RIFF" for data in segments):
+        with open(output_path, "wb") as out:
+            for data in segments:
+                out.write(data)
+        return True
+
+    params = None
+    frames = []
+    for data in segments:
+        with wave.open(io.BytesIO(data)) as segment:
+            shape = (segment.getnchannels(), segment.getsampwidth(), segment.getframerate())
+            if params is not None and shape != params:
+                return False
+            params = shape
+            frames.append(segment.readframes(segment.getnframes()))
+
+    with wave.open(output_path, "wb") as out:
+        out.setnchannels(params[0])
+        out.setsampwidth(params[1])
+        out.setframerate(params[2])
+        out.writeframes(b"".join(frames))
+    return True
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    WAV header for a stream of unknown length
+
+    RIFF and data sizes are set to 0xFFFFFFFF, which browsers and ffmpeg
+    treat as "read until the connection closes".
+    """
+    byte_rate = sample_rate * channels * sample_width
+    return b"".join([
+        b"RIFF", struct.pack("<I", 0xFFFFFFFF), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate,
+                             channels * sample_width, sample_width * 8),
+        b"data", struct.pack("<I", 0xFFFFFFFF),
+    ])
@@ -0,0 +1,234 @@
+"""
+In-memory stand-in for the redis.asyncio commands the TTS worker uses
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class FakeClock:
+    """Settable wall clock (patched over time.time in the modules under test)"""
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    @staticmethod
+    def strftime(fmt: str) -> str:
+        return time.strftime(fmt)
+
+
+class FakePubSub:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.channels: List[str] = []
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self.redis._subscribers.setdefault(channel, []).append(self)
+            self.channels.append(channel)
+
+    async def unsubscribe(self):
+        for channel in self.channels:
+            self.redis._subscribers[channel].remove(self)
+        self.channels = []
+
+    async def reset(self):
+        await self.unsubscribe()
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class FakeRedis:
+    """
+    Lists, sorted sets, sets, strings with expiry, and pub/sub
+
+    Keys expire against the given clock, so tests can step past leases
+    and visibility timeouts without sleeping.
+    """
+
+    def __init__(self, clock: Optional[Callable[[], float]] = None):
+        self.clock = clock or time.time
+        self.data: Dict[str, object] = {}
+        self.expiry: Dict[str, float] = {}
+        self.published: List[tuple] = []
+        self._subscribers: Dict[str, List[FakePubSub]] = {}
+
+    def _live(self, key: str) -> bool:
+        if key in self.expiry and self.expiry[key] <= self.clock():
+            del self.expiry[key]
+            self.data.pop(key, None)
+        return key in self.data
+
+    def _get(self, key: str, factory):
+        if not self._live(key):
+            self.data[key] = factory()
+        return self.data[key]
+
+    def _cleanup(self, key: str):
+        if key in self.data and not self.data[key]:
+            del self.data[key]
+
+    # Strings and keys
+
+    async def set(self, key: str, value, nx: bool = False, ex: Optional[int] = None):
+        if ex is not None and ex <= 0:
+            raise ValueError("invalid expire time in 'set' command")
+        if nx and self._live(key):
+            return None
+        self.data[key] = str(value)
+        self.expiry.pop(key, None)
+        if ex is not None:
+            self.expiry[key] = self.clock() + ex
+        return True
+
+    async def get(self, key: str):
+        return self.data[key] if self._live(key) else None
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._live(key):
+                del self.data[key]
+                self.expiry.pop(key, None)
+                removed += 1
+        return removed
+
+    async def exists(self, key: str) -> int:
+        return int(self._live(key))
+
+    # Lists (index 0 is the left end)
+
+    async def lpush(self, key: str, *values) -> int:
+        items = self._get(key, list)
+        for value in values:
+            items.insert(0, value)
+        return len(items)
+
+    async def rpush(self, key: str, *values) -> int:
+        items = self._get(key, list)
+        items.extend(values)
+        return len(items)
+
+    async def rpop(self, key: str):
+        if not self._live(key):
+            return None
+        value = self.data[key].pop()
+        self._cleanup(key)
+        return value
+
+    async def lmove(self, source: str, destination: str, src: str = "LEFT", dest: str = "RIGHT"):
+        if not self._live(source):
+            return None
+        value = self.data[source].pop(-1 if src == "RIGHT" else 0)
+        self._cleanup(source)
+        if dest == "LEFT":
+            await self.lpush(destination, value)
+        else:
+            await self.rpush(destination, value)
+        return value
+
+    async def blmove(self, source: str, destination: str, timeout: float, src: str = "LEFT", dest: str = "RIGHT"):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            value = await self.lmove(source, destination, src, dest)
+            if value is not None or asyncio.get_running_loop().time() >= deadline:
+                return value
+            await asyncio.sleep(0.005)
+
+    async def lrem(self, key: str, count: int, value) -> int:
+        if not self._live(key):
+            return 0
+        items = self.data[key]
+        removed = 0
+        while value in items and (count == 0 or removed < count):
+            items.remove(value)
+            removed += 1
+        self._cleanup(key)
+        return removed
+
+    async def llen(self, key: str) -> int:
+        return len(self.data[key]) if self._live(key) else 0
+
+    async def lrange(self, key: str, start: int, end: int) -> list:
+        items = self.data[key] if self._live(key) else []
+        return list(items[start:None if end == -1 else end + 1])
+
+    # Sorted sets
+
+    async def zadd(self, key: str, mapping: Dict[str, float], xx: bool = False) -> int:
+        scores = self._get(key, dict)
+        added = 0
+        for member, score in mapping.items():
+            if xx and member not in scores:
+                continue
+            added += member not in scores
+            scores[member] = score
+        self._cleanup(key)
+        return added
+
+    async def zrem(self, key: str, *members: str) -> int:
+        if not self._live(key):
+            return 0
+        removed = sum(self.data[key].pop(member, None) is not None for member in members)
+        self._cleanup(key)
+        return removed
+
+    async def zrange(self, key: str, start: int, end: int) -> list:
+        if not self._live(key):
+            return []
+        members = sorted(self.data[key], key=self.data[key].get)
+        return members[start:None if end == -1 else end + 1]
+
+    async def zrangebyscore(self, key: str, low: float, high: float) -> list:
+        if not self._live(key):
+            return []
+        return [m for m in sorted(self.data[key], key=self.data[key].get) if low <= self.data[key][m] <= high]
+
+    # Sets
+
+    async def sadd(self, key: str, *members: str) -> int:
+        items = self._get(key, set)
+        added = len(set(members) - items)
+        items.update(members)
+        return added
+
+    async def srem(self, key: str, *members: str) -> int:
+        if not self._live(key):
+            return 0
+        removed = len(set(members) & self.data[key])
+        self.data[key].difference_update(members)
+        self._cleanup(key)
+        return removed
+
+    async def smembers(self, key: str) -> set:
+        return set(self.data[key]) if self._live(key) else set()
+
+    # Pub/sub and streams
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    async def publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        subscribers = self._subscribers.get(channel, [])
+        for subscriber in subscribers:
+            subscriber.messages.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    async def xadd(self, key: str, fields: Dict, maxlen: Optional[int] = None, approximate: bool = False):
+        entries = self._get(key, list)
+        entries.append(fields)
+        if maxlen is not None:
+            del entries[:-maxlen]
+        return f"{len(entries)}-0"
@@ -0,0 +1,37 @@
+"""
+Admission control stage queueing
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from admission import Overloaded, Stage
+
+
+async def _hold(stage: Stage, seconds: float):
+    async with stage.slot():
+        await asyncio.sleep(seconds)
+
+
+def _run_burst(requests: int, concurrency: int = 2, max_queue: int = 2):
+    async def run():
+        stage = Stage("tts", concurrency=concurrency, max_queue=max_queue, deadline=10.0)
+        return await asyncio.gather(
+            *[_hold(stage, 0.05) for _ in range(requests)],
+            return_exceptions=True
+        )
+    return asyncio.run(run())
+
+
+def test_simultaneous_requests_fill_free_slots_before_queueing():
+    results = _run_burst(4)
+    assert not any(isinstance(r, Overloaded) for r in results)
+
+
+def test_queue_full_rejects_only_beyond_slots_plus_queue():
+    results = _run_burst(5)
+    rejected = [r for r in results if isinstance(r, Overloaded)]
+    assert len(rejected) == 1
+    assert rejected[0].reason == "queue_full"
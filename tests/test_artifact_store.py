@@ -0,0 +1,106 @@
+"""
+Artifact store garbage collection, pinning and hard-linked dedup
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tts-engines"))
+
+from artifact_store import ArtifactStore
+
+KB = 1024
+
+
+def _artifact(store: ArtifactStore, name: str, size: int = KB, age: float = 0.0):
+    path = store.path_for(name)
+    path.write_bytes(b"\0" * size)
+    if age:
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_ttl_gc_keeps_pinned_artifacts(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl=60)
+    expired = _artifact(store, "expired.wav", age=120)
+    pinned = _artifact(store, "pinned.wav", age=120)
+    fresh = _artifact(store, "fresh.wav")
+    store.pin(pinned, ttl=3600)
+
+    stats = store.collect_garbage()
+
+    assert stats["expired"] == 1
+    assert not expired.exists()
+    assert pinned.exists() and fresh.exists()
+
+
+def test_expired_pin_no_longer_protects(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl=60)
+    path = _artifact(store, "old.wav", age=120)
+    store.pin(path, ttl=-1)
+
+    store.collect_garbage()
+
+    assert not path.exists()
+    assert not os.path.exists(f"{path}.pin")
+
+
+def test_lru_gc_evicts_oldest_unpinned_first(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=3 * KB, ttl=3600)
+    oldest_pinned = _artifact(store, "a.wav", age=50)
+    older = _artifact(store, "b.wav", age=40)
+    old = _artifact(store, "c.wav", age=30)
+    new = _artifact(store, "d.wav", age=20)
+    newest = _artifact(store, "e.wav", age=10)
+    store.pin(oldest_pinned, ttl=3600)
+
+    stats = store.collect_garbage()
+
+    assert stats["evicted"] == 2
+    assert not older.exists() and not old.exists()
+    assert oldest_pinned.exists() and new.exists() and newest.exists()
+    assert stats["bytes"] == 3 * KB
+
+
+def test_pinned_artifacts_survive_even_over_budget(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=KB, ttl=3600)
+    pinned = [_artifact(store, f"p{i}.wav", age=100 + i) for i in range(3)]
+    for path in pinned:
+        store.pin(path, ttl=3600)
+
+    stats = store.collect_garbage()
+
+    assert stats["evicted"] == 0
+    assert all(path.exists() for path in pinned)
+
+
+def test_dedup_link_survives_deleting_the_original(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    original = store.path_for("job_1.wav")
+    original.write_bytes(b"audio" * 100)
+
+    entry = store.publish("key", original, {"audio_duration": 1.5})
+    assert os.path.samefile(entry, original)
+    assert store.usage()["bytes"] == 500  # Hard links counted once
+
+    original.unlink()
+
+    copy = store.path_for("job_2.wav")
+    assert store.materialize("key", ".wav", copy) == {"audio_duration": 1.5}
+    assert copy.read_bytes() == b"audio" * 100
+
+
+def test_gc_of_original_keeps_published_entry(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl=60)
+    original = _artifact(store, "job_1.wav")
+    entry = store.publish("key", original, {})
+    stamp = time.time() - 120
+    os.utime(original, (stamp, stamp))  # Shared inode: the entry ages too
+    store.pin(entry, ttl=3600)
+
+    store.collect_garbage()
+
+    assert not original.exists()
+    assert entry.exists()
+    assert store.materialize("key", ".wav", store.path_for("job_2.wav")) == {}
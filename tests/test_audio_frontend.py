@@ -0,0 +1,88 @@
+"""
+Telephony front-end: G.711 tables against reference values, streaming vs batch resampling
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "voice-ai-agent"))
+
+from audio_frontend import (
+    StreamingResampler,
+    alaw_to_pcm16,
+    pcm16_to_alaw,
+    pcm16_to_ulaw,
+    resample,
+    ulaw_to_pcm16,
+)
+
+# Values of the ITU-T G.711 reference (Sun g711.c) conversions
+ULAW_DECODED = {0x00: -32124, 0x0F: -16764, 0x10: -15996, 0x55: -716, 0x7E: -8, 0x7F: 0, 0x80: 32124, 0xFF: 0}
+ALAW_DECODED = {0x00: -5504, 0x0F: -6784, 0x10: -2752, 0x2A: -32256, 0x55: -8, 0x7F: -848,
+                0x80: 5504, 0xAA: 32256, 0xD5: 8, 0xFA: 1008}
+ULAW_ENCODED = {0: 0xFF, 1: 0xFF, -1: 0x7E, 8: 0xFE, 100: 0xF2, -100: 0x72, 1000: 0xCE, -1000: 0x4E,
+                32767: 0x80, -32768: 0x00}
+ALAW_ENCODED = {0: 0xD5, 1: 0xD5, -1: 0x55, 8: 0xD5, 100: 0xD3, -100: 0x53, 1000: 0xFA, -1000: 0x7A,
+                32767: 0xAA, -32768: 0x2A}
+
+
+@pytest.mark.parametrize("decode, known", [(ulaw_to_pcm16, ULAW_DECODED), (alaw_to_pcm16, ALAW_DECODED)])
+def test_g711_decoding_matches_reference(decode, known):
+    decoded = decode(bytes(known))
+    assert decoded.dtype == np.int16
+    assert decoded.tolist() == list(known.values())
+
+
+@pytest.mark.parametrize("encode, known", [(pcm16_to_ulaw, ULAW_ENCODED), (pcm16_to_alaw, ALAW_ENCODED)])
+def test_g711_encoding_matches_reference(encode, known):
+    assert list(encode(np.array(list(known), dtype=np.int16))) == list(known.values())
+
+
+def test_ulaw_codes_survive_a_round_trip():
+    codes = bytes(range(256))
+    again = pcm16_to_ulaw(ulaw_to_pcm16(codes))
+    # 0x7F is negative zero; it comes back as positive zero
+    assert [c for c, d in zip(codes, again) if c != d] == [0x7F]
+    assert again[0x7F] == 0xFF
+
+
+def test_alaw_codes_survive_a_round_trip():
+    codes = bytes(range(256))
+    assert pcm16_to_alaw(alaw_to_pcm16(codes)) == codes
+
+
+def test_g711_decoding_is_symmetric():
+    codes = np.arange(128, dtype=np.uint8)
+    assert np.array_equal(ulaw_to_pcm16(bytes(codes | 0x80)), -ulaw_to_pcm16(bytes(codes)))
+    assert np.array_equal(alaw_to_pcm16(bytes(codes | 0x80)), -alaw_to_pcm16(bytes(codes)))
+
+
+@pytest.mark.parametrize("from_rate, to_rate", [
+    (8000, 16000), (16000, 8000), (22050, 16000), (24000, 8000), (48000, 16000), (16000, 16000)
+])
+def test_streamed_resampling_equals_batch(from_rate, to_rate):
+    rng = np.random.default_rng(from_rate + to_rate)
+    signal = rng.standard_normal(from_rate // 2).astype(np.float32)
+    # Irregular chunks, including empty and single-sample ones
+    bounds = np.sort(rng.integers(0, len(signal), 40))
+    chunks = np.split(signal, bounds)
+
+    resampler = StreamingResampler(from_rate, to_rate)
+    streamed = np.concatenate([resampler.process(chunk) for chunk in chunks] + [resampler.flush()])
+    start = int(round(resampler.delay))
+    length = -(-len(signal) * resampler.up // resampler.down)
+
+    np.testing.assert_allclose(streamed[start:start + length], resample(signal, from_rate, to_rate), atol=1e-6)
+
+
+def test_resampled_tone_keeps_its_shape():
+    t = np.arange(8000) / 8000
+    tone = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+
+    out = resample(tone, 8000, 16000)
+
+    expected = np.sin(2 * np.pi * 440 * np.arange(16000) / 16000)
+    # Away from the edges, where the filter sees zero padding
+    assert np.max(np.abs(out[200:-200] - expected[200:-200])) < 0.01
@@ -0,0 +1,121 @@
+"""
+Tiered STT: degrade under load, recover only when the primary could keep up
+"""
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("ctranslate2")
+pytest.importorskip("faster_whisper")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "voice-ai-agent"))
+
+import batched_stt
+from batched_stt import BatchedTranscriber, TieredTranscriber
+from stt_service import TranscriptionResult
+
+UTTERANCE = np.zeros(16000, dtype=np.float32)
+
+
+class FakeClock:
+    """Settable monotonic clock (patched over time in batched_stt)"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeTier:
+    """Single-server queue with a fixed per-utterance service time on the fake clock"""
+
+    def __init__(self, clock: FakeClock, service_time: float):
+        self.clock = clock
+        self.service_time = service_time
+        self.busy_until = 0.0
+        self.requests = 0
+
+    def expected_wait(self) -> float:
+        return max(0.0, self.busy_until - self.clock.now)
+
+    async def transcribe(self, audio_array, language=None) -> TranscriptionResult:
+        self.busy_until = max(self.clock.now, self.busy_until) + self.service_time
+        self.requests += 1
+        return TranscriptionResult(text="hello", language="en", confidence=1.0)
+
+    async def close(self):
+        pass
+
+
+def _run_load(tiered: TieredTranscriber, clock: FakeClock, rate: float, seconds: float):
+    async def run():
+        for _ in range(int(rate * seconds)):
+            clock.now += 1 / rate
+            await tiered.transcribe(UTTERANCE)
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(batched_stt, "time", clock)
+    return clock
+
+
+def _tiered(clock: FakeClock):
+    primary = FakeTier(clock, service_time=0.1)     # Keeps up with at most 10 utterances/s
+    fallback = FakeTier(clock, service_time=0.02)
+    tiered = TieredTranscriber([("base", primary), ("tiny", fallback)],
+                               degrade_wait=0.5, recover_wait=0.1, hold=10.0)
+    return tiered, primary, fallback
+
+
+def test_constant_overload_degrades_once_without_flapping(clock):
+    tiered, primary, fallback = _tiered(clock)
+
+    # 12 utterances/s: more than the primary can serve, trivial for the fallback
+    _run_load(tiered, clock, rate=12, seconds=120)
+
+    assert tiered.degraded
+    assert tiered.switches == 1
+    assert fallback.requests > primary.requests
+
+
+def test_recovers_once_load_drops_below_primary_capacity(clock):
+    tiered, primary, _ = _tiered(clock)
+    _run_load(tiered, clock, rate=12, seconds=30)
+    assert tiered.degraded
+
+    # 4 utterances/s: the primary would wait ~33 ms
+    _run_load(tiered, clock, rate=4, seconds=60)
+
+    assert not tiered.degraded
+    assert tiered.switches == 2
+    assert primary.expected_wait() <= tiered.degrade_wait
+
+
+def test_batcher_measures_service_time_per_utterance():
+    class Service:
+        model = None
+
+    def transcribe_batch(audios, languages):
+        time.sleep(0.02)
+        return [TranscriptionResult(text="", language="en", confidence=0.0) for _ in audios]
+
+    async def run():
+        batcher = BatchedTranscriber(Service(), max_batch=4, max_wait=0.05)
+        batcher._transcribe_batch = transcribe_batch
+        await asyncio.gather(*(batcher.transcribe(UTTERANCE) for _ in range(4)))
+        await batcher.close()
+        return batcher
+
+    batcher = asyncio.run(run())
+
+    assert batcher.stats["batches"] == 1
+    assert 0.004 <= batcher.service_time < 0.02
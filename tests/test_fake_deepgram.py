@@ -0,0 +1,66 @@
+"""
+DeepgramSTT connection pooling and streaming against the fake Deepgram server
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "voice-ai-agent"))
+
+from fake_deepgram import FakeDeepgram, _utterance, start_fake_server
+from stt_service import DeepgramSTT
+
+
+def _fake() -> FakeDeepgram:
+    return FakeDeepgram(latency=0.01, real_time_factor=0.0)
+
+
+def test_pooled_requests_reuse_one_connection():
+    fake = _fake()
+
+    async def run():
+        runner, url = await start_fake_server(fake)
+        client = DeepgramSTT("fake-key", host=url)
+        try:
+            return [await client.transcribe_audio(_utterance(0.5)) for _ in range(5)]
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    results = asyncio.run(run())
+
+    assert [r.text for r in results] == ["audio 0.00 to 0.50 seconds"] * 5
+    assert fake.stats["requests"] == 5
+    assert len(fake.connections) == 1
+
+
+def test_stream_yields_interim_and_final_transcripts():
+    fake = _fake()
+    audio = _utterance(2.5)
+    chunk = 16000 * 2 // 10  # 100ms of int16
+
+    async def chunks():
+        for i in range(0, len(audio), chunk):
+            yield audio[i:i + chunk]
+            await asyncio.sleep(0)
+
+    async def run():
+        runner, url = await start_fake_server(fake)
+        client = DeepgramSTT("fake-key", host=url)
+        try:
+            return [result async for result in client.transcribe_stream(chunks())]
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    results = asyncio.run(asyncio.wait_for(run(), timeout=10))
+
+    finals = [r for r in results if r.is_final]
+    assert any(not r.is_final for r in results)
+    assert [r.text for r in finals] == [
+        "audio 0.00 to 1.00 seconds",
+        "audio 1.00 to 2.00 seconds",
+        "audio 2.00 to 2.50 seconds",
+    ]
+    assert finals[-1].segments[0]["end"] == 2.5
+    assert fake.stats["streams"] == 1
@@ -0,0 +1,167 @@
+"""
+Reliable TTS job queue: claiming, visibility timeout, reaping and lanes
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tts-engines"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import job_queue
+from fake_redis import FakeClock, FakeRedis
+from job_queue import DEAD_LETTER_KEY, INFLIGHT_KEY, LANES, ReliableJobQueue
+
+VISIBILITY = 30.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(job_queue, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def redis(clock):
+    return FakeRedis(clock.time)
+
+
+def _queue(redis, worker_id: str, **kwargs) -> ReliableJobQueue:
+    kwargs.setdefault("visibility_timeout", VISIBILITY)
+    return ReliableJobQueue(redis, worker_id=worker_id, block_timeout=0.01, **kwargs)
+
+
+async def _lane_jobs(redis, lane: str):
+    return [json.loads(raw) for raw in await redis.lrange(LANES[lane], 0, -1)]
+
+
+def test_claim_tracks_job_until_ack(redis):
+    async def run():
+        queue = _queue(redis, "a")
+        await queue.register()
+        await queue.enqueue({"id": "j1", "text": "hi"})
+
+        lane, raw, job = await queue.claim()
+        assert (lane, job["id"]) == ("standard", "j1")
+        assert await redis.lrange(queue.processing_key, 0, -1) == [raw]
+        assert len(await redis.zrange(INFLIGHT_KEY, 0, -1)) == 1
+
+        await queue.ack(lane, raw)
+        assert await redis.llen(queue.processing_key) == 0
+        assert await redis.zrange(INFLIGHT_KEY, 0, -1) == []
+        assert await queue.claim() is None
+
+    asyncio.run(run())
+
+
+def test_expired_visibility_returns_job_to_its_lane(redis, clock):
+    async def run():
+        stuck, reaper = _queue(redis, "a"), _queue(redis, "b")
+        await stuck.register()
+        await reaper.register()
+        await stuck.enqueue({"id": "j1"}, lane="interactive")
+        await stuck.claim()
+
+        clock.advance(VISIBILITY / 2)
+        await stuck.extend("interactive", (await redis.lrange(stuck.processing_key, 0, -1))[0])
+        clock.advance(VISIBILITY * 0.75)
+        assert await reaper.reap() == 0  # Heartbeat pushed the deadline
+
+        clock.advance(VISIBILITY)
+        await reaper.heartbeat()
+        assert await reaper.reap() == 1
+        assert await redis.llen(stuck.processing_key) == 0
+        assert await redis.zrange(INFLIGHT_KEY, 0, -1) == []
+        jobs = await _lane_jobs(redis, "interactive")
+        assert [(j["id"], j["attempts"], j["status"]) for j in jobs] == [("j1", 1, "pending")]
+
+    asyncio.run(run())
+
+
+def test_dead_worker_jobs_requeued_to_claimed_lane(redis):
+    async def run():
+        crashed, reaper = _queue(redis, "a"), _queue(redis, "b")
+        await crashed.register()
+        await reaper.register()
+        # Lane chosen by the producer, not the one lane_for_job would pick
+        await crashed.enqueue({"id": "j1"}, lane="interactive")
+        await crashed.claim()
+
+        await redis.delete(crashed.alive_key)
+        assert await reaper.reap() == 1
+
+        assert [j["id"] for j in await _lane_jobs(redis, "interactive")] == ["j1"]
+        assert await redis.llen(LANES["standard"]) == 0
+        assert await redis.zrange(INFLIGHT_KEY, 0, -1) == []
+        assert "a" not in await redis.smembers(job_queue.WORKERS_KEY)
+
+    asyncio.run(run())
+
+
+def test_restarted_worker_recovers_its_processing_list(redis):
+    async def run():
+        before = _queue(redis, "a")
+        await before.register()
+        await before.enqueue({"id": "j1"}, lane="bulk")
+        await before.claim()
+
+        await _queue(redis, "a").register()
+
+        assert [j["id"] for j in await _lane_jobs(redis, "bulk")] == ["j1"]
+        assert await redis.zrange(INFLIGHT_KEY, 0, -1) == []
+
+    asyncio.run(run())
+
+
+def test_job_dead_lettered_after_max_retries(redis, clock):
+    async def run():
+        worker, reaper = _queue(redis, "a", max_retries=2), _queue(redis, "b", max_retries=2)
+        await worker.register()
+        await worker.enqueue({"id": "j1"})
+
+        for attempt in range(3):
+            assert await worker.claim() is not None
+            clock.advance(VISIBILITY + 1)
+            await worker.heartbeat()
+            await reaper.heartbeat()
+            assert await reaper.reap() == 1
+
+        assert await redis.llen(LANES["standard"]) == 0
+        dead = [json.loads(raw) for raw in await redis.lrange(DEAD_LETTER_KEY, 0, -1)]
+        assert [(j["id"], j["attempts"], j["status"]) for j in dead] == [("j1", 3, "failed")]
+        assert json.loads(await redis.get("job:j1"))["status"] == "failed"
+
+    asyncio.run(run())
+
+
+def test_lanes_claimed_in_weight_proportion(redis):
+    async def run():
+        queue = _queue(redis, "a")
+        await queue.register()
+        for lane in LANES:
+            for i in range(100):
+                await queue.enqueue({"id": f"{lane}-{i}"}, lane=lane)
+
+        counts = {lane: 0 for lane in LANES}
+        for _ in range(100):
+            lane, raw, _ = await queue.claim()
+            counts[lane] += 1
+            await queue.ack(lane, raw)
+        return counts
+
+    assert asyncio.run(run()) == {"interactive": 60, "standard": 30, "bulk": 10}
+
+
+def test_empty_lanes_do_not_starve_others(redis):
+    async def run():
+        queue = _queue(redis, "a")
+        await queue.register()
+        for i in range(5):
+            await queue.enqueue({"id": f"bulk-{i}"}, lane="bulk")
+        return [(await queue.claim())[0] for _ in range(5)]
+
+    assert asyncio.run(run()) == ["bulk"] * 5
@@ -0,0 +1,107 @@
+"""
+OllamaClient concurrency and disconnect handling against a fake Ollama
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ollama_client import ClientDisconnected, OllamaClient, cancel_on_disconnect
+
+DELAY = 0.2
+
+
+class FakeOllama:
+    """Delayed /api/chat handler that records overlap and cancellations"""
+
+    def __init__(self, delay: float = DELAY):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.cancelled = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+        body = json.loads(request.content)
+        return httpx.Response(200, json={
+            "model": body["model"],
+            "message": {"role": "assistant", "content": "hi"},
+            "done": True
+        })
+
+
+class FakeRequest:
+    """Starlette-like request that disconnects after a delay"""
+
+    def __init__(self, disconnect_after: float):
+        self.deadline = time.monotonic() + disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+
+def _client(fake: FakeOllama) -> OllamaClient:
+    return OllamaClient("http://ollama.test", transport=httpx.MockTransport(fake))
+
+
+def test_concurrent_chats_overlap():
+    fake = FakeOllama()
+    calls = 8
+
+    async def run():
+        client = _client(fake)
+        try:
+            start = time.monotonic()
+            results = await asyncio.gather(*[
+                client.chat("llama3.2:1b", [{"role": "user", "content": f"q{i}"}])
+                for i in range(calls)
+            ])
+            return time.monotonic() - start, results
+        finally:
+            await client.close()
+
+    elapsed, results = asyncio.run(run())
+
+    assert all(r["message"]["content"] == "hi" for r in results)
+    assert fake.max_active == calls
+    # Serialized calls would take calls * DELAY
+    assert elapsed < DELAY * 3
+
+
+def test_disconnect_cancels_upstream_call():
+    fake = FakeOllama(delay=5.0)
+
+    async def run():
+        client = _client(fake)
+        try:
+            with pytest.raises(ClientDisconnected):
+                await cancel_on_disconnect(
+                    FakeRequest(disconnect_after=0.1),
+                    client.chat("llama3.2:1b", [{"role": "user", "content": "q"}]),
+                    poll_interval=0.02
+                )
+            await asyncio.sleep(0)  # Let the cancellation reach the handler
+        finally:
+            await client.close()
+
+    start = time.monotonic()
+    asyncio.run(run())
+
+    assert fake.cancelled == 1
+    assert fake.active == 0
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,99 @@
+"""
+Ollama warm pool RAM budget under cold requests and concurrent loads
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ollama_warm_pool import OllamaWarmPool
+
+GB = 1024 ** 3
+
+
+class FakeOllama:
+    """Loads models on generate (unloads with keep_alive=0), tracking peak memory"""
+
+    def __init__(self, sizes, load_time: float = 0.05):
+        self.sizes = sizes
+        self.load_time = load_time
+        self.loaded = {}
+        self.peak = 0
+
+    async def tags(self, timeout: float = 10):
+        return [{"name": name, "size": size} for name, size in self.sizes.items()]
+
+    async def ps(self):
+        return [{"name": name, "size": size} for name, size in self.loaded.items()]
+
+    def load(self, model: str):
+        self.loaded[model] = self.sizes[model]
+        self.peak = max(self.peak, sum(self.loaded.values()))
+
+    async def generate(self, model: str, prompt: str, keep_alive=None, timeout: float = 30):
+        if keep_alive == 0:
+            self.loaded.pop(model, None)
+            return {}
+        await asyncio.sleep(self.load_time)
+        self.load(model)
+        return {}
+
+
+def _pool(client, budget: int = 8 * GB) -> OllamaWarmPool:
+    return OllamaWarmPool(client, pinned=[], ram_budget=budget)
+
+
+def test_concurrent_loads_stay_within_budget():
+    client = FakeOllama({"a:latest": 3 * GB, "b:latest": 5 * GB, "c:latest": 5 * GB})
+
+    async def run():
+        pool = _pool(client)
+        await pool.ensure_warm("a")
+        await asyncio.gather(pool.ensure_warm("b"), pool.ensure_warm("c"))
+        return pool
+
+    pool = asyncio.run(run())
+
+    assert client.peak <= 8 * GB
+    assert sum(pool.resident.values()) <= 8 * GB
+    assert set(client.loaded) == set(pool.resident)
+
+
+def test_cold_chat_request_evicts_before_loading():
+    client = FakeOllama({"a:latest": 5 * GB, "b:latest": 5 * GB})
+
+    async def run():
+        pool = _pool(client)
+        await pool.ensure_warm("a")
+        cold = await pool.touch("b")
+        client.load("b:latest")  # Ollama loads it while answering the chat
+        return pool, cold
+
+    pool, cold = asyncio.run(run())
+
+    assert cold
+    assert list(pool.resident) == ["b:latest"]
+    assert client.peak <= 8 * GB
+
+
+def test_failed_load_releases_its_reservation():
+    client = FakeOllama({"a:latest": 5 * GB})
+
+    async def failing_generate(*args, **kwargs):
+        raise ConnectionError("ollama down")
+
+    client.generate = failing_generate
+
+    async def run():
+        pool = _pool(client)
+        try:
+            await pool.ensure_warm("a")
+        except ConnectionError:
+            pass
+        return pool
+
+    pool = asyncio.run(run())
+
+    assert pool.resident == {}
+    assert pool.status()["used"] == 0
@@ -0,0 +1,155 @@
+"""
+Cross-worker singleflight: leader/follower, lease expiry and leader failure
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tts-engines"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_redis import FakeClock, FakeRedis
+from job_events import publish_job_state
+from singleflight import SingleFlight
+
+KEY = "content-key"
+
+
+class Synthesis:
+    """compute() factory that writes a file once released, or fails"""
+
+    def __init__(self, path, audio: bytes = b"RIFF-audio", fail: bool = False):
+        self.path = path
+        self.audio = audio
+        self.fail = fail
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("engine crashed")
+        self.path.write_bytes(self.audio)
+        return {"output_path": str(self.path), "duration": 1.0}
+
+
+async def _until_locked(redis):
+    while await redis.get(f"tts:singleflight:{KEY}") is None:
+        await asyncio.sleep(0)
+
+
+def test_follower_reuses_leader_output(tmp_path):
+    async def run():
+        redis = FakeRedis()
+        leader = Synthesis(tmp_path / "leader.wav")
+        follower = Synthesis(tmp_path / "follower.wav")
+
+        leading = asyncio.create_task(
+            SingleFlight(redis).run(KEY, "job-1", str(leader.path), leader)
+        )
+        await _until_locked(redis)
+        flight = SingleFlight(redis)
+        following = asyncio.create_task(flight.run(KEY, "job-2", str(follower.path), follower))
+        await asyncio.sleep(0.01)
+
+        leader.release.set()
+        await leading
+        await publish_job_state(redis, {"id": "job-1", "status": "completed"})
+        result, shared = await asyncio.wait_for(following, timeout=2)
+        return result, shared, flight
+
+    result, shared, flight = asyncio.run(run())
+
+    assert shared
+    assert result["shared_from"] == "job-1"
+    assert result["output_path"] == str(tmp_path / "follower.wav")
+    assert (tmp_path / "follower.wav").read_bytes() == b"RIFF-audio"
+    assert flight.stats == {"leader": 0, "shared": 1, "fallback": 0}
+
+
+def test_expired_lease_lets_follower_take_over(tmp_path):
+    async def run():
+        clock = FakeClock()
+        redis = FakeRedis(clock.time)
+        # A leader that died without releasing its lease
+        await redis.set(f"tts:singleflight:{KEY}", "job-dead", nx=True, ex=600)
+
+        follower = Synthesis(tmp_path / "follower.wav")
+        follower.release.set()
+        flight = SingleFlight(redis, lease=1)
+        following = asyncio.create_task(flight.run(KEY, "job-2", str(follower.path), follower))
+
+        await asyncio.sleep(0.1)
+        assert not following.done()  # Still waiting on the dead leader
+        clock.advance(601)
+        result, shared = await asyncio.wait_for(following, timeout=3)
+        return result, shared, flight, follower
+
+    result, shared, flight, follower = asyncio.run(run())
+
+    assert not shared
+    assert follower.calls == 1
+    assert flight.stats["leader"] == 1
+    assert result["output_path"] == str(tmp_path / "follower.wav")
+
+
+def test_leader_failure_releases_lease_for_follower(tmp_path):
+    async def run():
+        redis = FakeRedis()
+        leader = Synthesis(tmp_path / "leader.wav", fail=True)
+        follower = Synthesis(tmp_path / "follower.wav")
+        follower.release.set()
+
+        leading = asyncio.create_task(
+            SingleFlight(redis).run(KEY, "job-1", str(leader.path), leader)
+        )
+        await _until_locked(redis)
+        flight = SingleFlight(redis)
+        following = asyncio.create_task(flight.run(KEY, "job-2", str(follower.path), follower))
+        await asyncio.sleep(0.01)
+
+        leader.release.set()
+        with pytest.raises(RuntimeError):
+            await leading
+        assert await redis.get(f"tts:singleflight:{KEY}") is None
+        await publish_job_state(redis, {"id": "job-1", "status": "failed"})
+
+        result, shared = await asyncio.wait_for(following, timeout=2)
+        return result, shared, flight
+
+    result, shared, flight = asyncio.run(run())
+
+    assert not shared
+    assert flight.stats == {"leader": 1, "shared": 0, "fallback": 0}
+    assert (tmp_path / "follower.wav").read_bytes() == b"RIFF-audio"
+
+
+def test_followers_compute_themselves_when_leaders_keep_failing(tmp_path):
+    async def run():
+        redis = FakeRedis()
+        await redis.set(f"tts:singleflight:{KEY}", "job-stuck", nx=True, ex=600)
+        follower = Synthesis(tmp_path / "follower.wav")
+        follower.release.set()
+        flight = SingleFlight(redis, lease=1, max_rounds=2)
+
+        async def fail_leader():
+            # The stuck leader reports failure every time it is waited on
+            for _ in range(2):
+                await asyncio.sleep(0.02)
+                await publish_job_state(redis, {"id": "job-stuck", "status": "failed"})
+                await redis.delete("job:job-stuck")
+
+        reporter = asyncio.create_task(fail_leader())
+        result, shared = await asyncio.wait_for(
+            flight.run(KEY, "job-2", str(follower.path), follower), timeout=3
+        )
+        await reporter
+        return result, shared, flight
+
+    result, shared, flight = asyncio.run(run())
+
+    assert not shared
+    assert flight.stats == {"leader": 0, "shared": 0, "fallback": 1}
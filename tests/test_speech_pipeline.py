@@ -0,0 +1,91 @@
+"""
+Sentence-pipelined speech: segments stream out while the model is generating
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from speech_pipeline import pipeline_speech, stream_events
+
+
+def test_first_segment_streams_before_generation_ends():
+    state = {"generating": True}
+
+    async def run():
+        first_seen = asyncio.Event()
+
+        async def tokens():
+            yield "The first sentence is complete. "
+            # The rest is only generated once the client has the first audio;
+            # a reply that waited for the whole turn would time out here
+            await asyncio.wait_for(first_seen.wait(), timeout=2)
+            yield "And here comes the second "
+            yield "sentence, the last one."
+            state["generating"] = False
+
+        async def synthesize(sentence: str, index: int):
+            await asyncio.sleep(0.01)
+            return {"text": sentence, "url": f"/output/{index}.wav", "duration": 1.0}
+
+        async def turn(emit):
+            async def on_segment(index, segment):
+                await emit({"type": "segment", "index": index, "text": segment["text"]})
+
+            text, segments = await pipeline_speech(tokens(), synthesize, on_segment=on_segment)
+            return {"response": text, "segments": len(segments)}
+
+        events = []
+        async for event in stream_events(turn):
+            if event["type"] == "segment" and event["index"] == 0:
+                assert state["generating"]
+                first_seen.set()
+            events.append(event)
+        return events
+
+    events = asyncio.run(run())
+
+    assert [e["type"] for e in events] == ["segment", "segment", "done"]
+    assert [e["index"] for e in events[:2]] == [0, 1]
+    assert events[-1]["segments"] == 2
+    assert events[-1]["response"].endswith("the last one.")
+
+
+def test_stream_events_raises_producer_errors_after_emitted_events():
+    async def turn(emit):
+        await emit({"type": "segment", "index": 0})
+        raise RuntimeError("TTS failed")
+
+    async def run():
+        seen = []
+        with pytest.raises(RuntimeError):
+            async for event in stream_events(turn):
+                seen.append(event)
+        return seen
+
+    assert asyncio.run(run()) == [{"type": "segment", "index": 0}]
+
+
+def test_closing_the_stream_cancels_the_producer():
+    cancelled = []
+
+    async def turn(emit):
+        await emit({"type": "segment", "index": 0})
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return {}
+
+    async def run():
+        events = stream_events(turn)
+        assert (await events.__anext__())["index"] == 0
+        await events.aclose()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cancelled == [True]
@@ -0,0 +1,72 @@
+"""
+Streaming transcription: greedy partials, full-beam final pass, window trimmed at committed text
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "voice-ai-agent"))
+
+from stt_service import StreamingTranscriber, TranscriptionConfig
+
+SAMPLE_RATE = 16000
+SPEECH = [(0.0, 0.5, "Hello"), (0.6, 1.0, " there,"), (1.2, 1.5, " how"), (1.6, 1.9, " are"), (2.0, 2.4, " you?")]
+
+
+class FakeWhisper:
+    """
+    Recognizes SPEECH inside whatever window it is given
+
+    Every sample's value is its stream time, so the window's position in
+    the stream can be read off the audio itself.
+    """
+
+    def __init__(self):
+        self.config = TranscriptionConfig(beam_size=5)
+        self.calls = []
+
+    def transcribe_words(self, audio, prompt=None, language=None, beam_size=None):
+        start, end = float(audio[0]), float(audio[-1]) + 1 / SAMPLE_RATE
+        self.calls.append({"seconds": len(audio) / SAMPLE_RATE, "beam_size": beam_size, "prompt": prompt})
+        words = [
+            (w_start - start, w_end - start, text, 0.9)
+            for w_start, w_end, text in SPEECH
+            if w_start >= start - 1e-6 and w_end <= end + 1e-6
+        ]
+        return words, "en"
+
+
+def _stream(seconds: float, chunk: float = 0.5):
+    for i in range(int(seconds / chunk)):
+        yield (np.arange(int(chunk * SAMPLE_RATE)) + i * chunk * SAMPLE_RATE) / SAMPLE_RATE
+
+
+def test_partials_are_greedy_and_the_final_pass_uses_the_full_beam():
+    whisper = FakeWhisper()
+    transcriber = StreamingTranscriber(whisper, min_chunk=0.5)
+
+    for chunk in _stream(2.5):
+        transcriber.insert_audio(chunk)
+        transcriber.process()
+    transcriber.finish()
+
+    assert [call["beam_size"] for call in whisper.calls] == [1] * 5 + [5]
+    assert "".join(w[2] for w in transcriber.committed) == "Hello there, how are you?"
+
+
+def test_window_is_trimmed_at_committed_text():
+    whisper = FakeWhisper()
+    transcriber = StreamingTranscriber(whisper, min_chunk=0.5)
+
+    for chunk in _stream(2.5):
+        transcriber.insert_audio(chunk)
+        transcriber.process()
+        if transcriber.committed:
+            assert transcriber.offset == transcriber.committed[-1][1]
+
+    # Each update decoded the unsettled tail, never the whole utterance
+    assert max(call["seconds"] for call in whisper.calls) <= 1.0
+    assert transcriber.offset == 1.9
+    # Trimmed words carry over as the prompt
+    assert whisper.calls[-1]["prompt"] == "Hello there, how"
@@ -0,0 +1,127 @@
+"""
+Streaming VAD hysteresis: speech start/end thresholds and silence hangover
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "voice-ai-agent"))
+
+from vad_service import StreamingVAD
+
+START_FRAMES = 8    # 32 ms frames: min_speech_ms=250 needs 8
+END_FRAMES = 16     # max_silence_ms=500 needs 16
+
+
+class StubVAD:
+    """VADService stand-in whose speech probability is the frame's mean loudness"""
+
+    threshold = 0.5
+    frame_samples = 512
+    sampling_rate = 16000
+
+    def __init__(self):
+        self.frames = 0
+
+    def new_stream_state(self):
+        return None
+
+    def frame_probability(self, frame: np.ndarray, state):
+        self.frames += 1
+        return float(np.abs(frame).mean()), state
+
+
+def _observe(vad: StreamingVAD, probabilities):
+    return [vad.observe(p) for p in probabilities]
+
+
+def _started_at(steps):
+    return [i for i, (started, _) in enumerate(steps) if started]
+
+
+def _ended_at(steps):
+    return [i for i, (_, ended) in enumerate(steps) if ended]
+
+
+def test_default_thresholds():
+    vad = StreamingVAD(StubVAD())
+
+    assert vad.threshold == 0.5
+    assert vad.neg_threshold == pytest.approx(0.35)
+    assert vad.frame_ms == 32
+
+
+def test_speech_starts_only_after_min_speech_ms_above_threshold():
+    vad = StreamingVAD(StubVAD())
+
+    # A 7-frame burst (224 ms) is too short; one dip resets the count
+    steps = _observe(vad, [0.9] * (START_FRAMES - 1) + [0.4] + [0.9] * START_FRAMES)
+
+    assert _started_at(steps) == [2 * START_FRAMES - 1]
+    assert vad.is_speaking
+    assert vad.speech_duration == START_FRAMES * 32
+
+
+def test_probability_between_thresholds_holds_speech():
+    vad = StreamingVAD(StubVAD())
+    _observe(vad, [0.9] * START_FRAMES)
+
+    # Below threshold but above neg_threshold: still speaking, however long
+    steps = _observe(vad, [0.4] * 100)
+
+    assert _ended_at(steps) == []
+    assert vad.is_speaking
+
+
+def test_probability_between_thresholds_does_not_start_speech():
+    vad = StreamingVAD(StubVAD())
+
+    steps = _observe(vad, [0.45] * 100)
+
+    assert _started_at(steps) == []
+    assert not vad.is_speaking
+
+
+def test_speech_ends_after_hangover_of_silence():
+    vad = StreamingVAD(StubVAD())
+    _observe(vad, [0.9] * START_FRAMES)
+
+    # A 480 ms pause inside speech does not end it; the next full 512 ms does
+    steps = _observe(vad, [0.1] * (END_FRAMES - 1) + [0.4] + [0.1] * END_FRAMES)
+
+    assert _ended_at(steps) == [2 * END_FRAMES - 1]
+    assert not vad.is_speaking
+    assert vad.speech_duration == 0
+
+
+def test_custom_thresholds():
+    vad = StreamingVAD(StubVAD(), threshold=0.8, neg_threshold=0.6)
+    steps = _observe(vad, [0.7] * START_FRAMES + [0.85] * START_FRAMES)
+    assert _started_at(steps) == [2 * START_FRAMES - 1]
+
+    steps = _observe(vad, [0.65] * END_FRAMES + [0.55] * END_FRAMES)
+    assert _ended_at(steps) == [2 * END_FRAMES - 1]
+
+
+def test_process_chunk_frames_audio_across_chunk_boundaries():
+    stub = StubVAD()
+    vad = StreamingVAD(stub)
+    chunk = 1600  # 100 ms of 16 kHz, not a whole number of frames
+    audio = np.concatenate([np.full(16000, 0.9), np.zeros(16000)])
+    pcm = (audio * 32767).astype(np.int16)
+
+    results = [vad.process_chunk(pcm[i:i + chunk].tobytes()) for i in range(0, len(pcm), chunk)]
+
+    started = [i for i, r in enumerate(results) if r["speech_started"]]
+    ended = [i for i, r in enumerate(results) if r["speech_ended"]]
+    # Frame 7 (ends at sample 4096) confirms speech; frame 31 is the first one
+    # mostly silent, so frame 46 (ends at sample 24064) ends it
+    assert started == [4096 // chunk]
+    assert ended == [24064 // chunk]
+    assert all(r["is_speaking"] for r in results[started[0]:ended[0]])
+    assert stub.frames == len(pcm) // 512
+    assert len(vad.pending) == len(pcm) % 512
@@ -0,0 +1,301 @@
+"""
+Output Artifact Store
+Sharded audio output directory with a byte budget and TTL garbage collection
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+PIN_SUFFIX = ".pin"        # Sidecar: referenced-until timestamp
+META_SUFFIX = ".meta"      # Sidecar: synthesis metadata of a content entry
+CONTENT_PREFIX = "sha_"    # Content-addressed entries shared by cache tiers
+
+
+class ArtifactStore:
+    """
+    Size-bounded store for generated audio
+
+    Files live in sharded subdirectories (output/ab/name.wav) so no single
+    directory grows without bound. Garbage collection first removes files
+    older than the TTL, then the least recently used files until the store
+    fits its byte budget. Files referenced by a job record are pinned until
+    the record expires and are never collected.
+
+    Content-addressed entries (keyed by a synthesis content hash) let the
+    worker, the singleflight tier and the API server reuse regenerated audio
+    through hard links instead of writing another copy.
+
+    All state is on the filesystem, so several workers and the API server
+    can share one store.
+    """
+
+    def __init__(
+        self,
+        root: str = "./output",
+        max_bytes: int = 2 * 1024 ** 3,
+        ttl: float = 24 * 3600,
+        shard_chars: int = 2
+    ):
+        """
+        Initialize artifact store
+
+        Args:
+            root: Store directory (served as /output)
+            max_bytes: Byte budget enforced by garbage collection
+            ttl: Seconds an unpinned, unused file is kept
+            shard_chars: Hex characters of the name hash used as subdirectory
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shard_chars = shard_chars
+
+    @classmethod
+    def from_env(cls, root: str = "./output") -> "ArtifactStore":
+        """Create a store configured from environment variables"""
+        return cls(
+            root=os.getenv("ARTIFACT_ROOT", root),
+            max_bytes=int(os.getenv("ARTIFACT_MAX_BYTES", str(2 * 1024 ** 3))),
+            ttl=float(os.getenv("ARTIFACT_TTL", str(24 * 3600)))
+        )
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    def path_for(self, name: str) -> Path:
+        """Sharded path for a new artifact (parent directory is created)"""
+        shard = hashlib.sha1(name.encode("utf-8")).hexdigest()[:self.shard_chars]
+        path = self.root / shard / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def relative(self, path) -> str:
+        """Path relative to the store root, for /output URLs"""
+        return Path(path).resolve().relative_to(self.root.resolve()).as_posix()
+
+    def url_for(self, path, prefix: str = "/output") -> str:
+        return f"{prefix}/{self.relative(path)}"
+
+    def _content_path(self, content_key: str, ext: str) -> Path:
+        if ext and not ext.startswith("."):
+            ext = f".{ext}"
+        return self.path_for(f"{CONTENT_PREFIX}{content_key}{ext.lower()}")
+
+    # ------------------------------------------------------------------
+    # Content-addressed reuse
+    # ------------------------------------------------------------------
+
+    def publish(self, content_key: str, path, metadata: Dict = None) -> Path:
+        """
+        Register a generated file under its content key
+
+        Returns:
+            Path of the content entry (hard link to the same data)
+        """
+        path = Path(path)
+        content_path = self._content_path(content_key, path.suffix)
+
+        if not content_path.exists():
+            try:
+                os.link(path, content_path)
+            except FileExistsError:
+                pass  # Another process published it first
+            except OSError:
+                return path  # No hard links on this filesystem: keep the original only
+
+        Path(f"{content_path}{META_SUFFIX}").write_text(json.dumps(metadata or {}))
+
+        return content_path
+
+    def materialize(self, content_key: str, ext: str, destination) -> Optional[Dict]:
+        """
+        Expose a stored content entry under a new name
+
+        Returns:
+            Stored metadata, or None on a miss
+        """
+        content_path = self._content_path(content_key, ext)
+
+        # The metadata sidecar is written last by publish(), so an entry
+        # without it is incomplete and must not be linked
+        try:
+            metadata = json.loads(Path(f"{content_path}{META_SUFFIX}").read_text())
+        except (OSError, ValueError):
+            return None
+        if not content_path.exists():
+            return None
+
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if destination.resolve() != content_path.resolve():
+            if destination.exists():
+                destination.unlink()
+            try:
+                os.link(content_path, destination)
+            except OSError:
+                shutil.copyfile(content_path, destination)
+
+        self.touch(content_path)
+        return metadata
+
+    # ------------------------------------------------------------------
+    # Reference tracking
+    # ------------------------------------------------------------------
+
+    def pin(self, path, ttl: float):
+        """Keep a file at least until ttl seconds from now (e.g. job record expiry)"""
+        pin_path = Path(f"{path}{PIN_SUFFIX}")
+        until = time.time() + ttl
+        try:
+            until = max(until, float(pin_path.read_text()))
+        except (OSError, ValueError):
+            pass
+        pin_path.write_text(f"{until:.0f}")
+
+    def unpin(self, path):
+        try:
+            Path(f"{path}{PIN_SUFFIX}").unlink()
+        except FileNotFoundError:
+            pass
+
+    def is_pinned(self, path, now: float = None) -> bool:
+        try:
+            return float(Path(f"{path}{PIN_SUFFIX}").read_text()) > (now or time.time())
+        except (OSError, ValueError):
+            return False
+
+    @staticmethod
+    def touch(path):
+        """Mark a file as recently used"""
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def _scan(self):
+        """Artifacts under the root as (path, stat), sidecars excluded"""
+        for path in self.root.rglob("*"):
+            if path.suffix in (PIN_SUFFIX, META_SUFFIX):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                yield path, stat
+
+    def usage(self) -> Dict:
+        """Bytes and files in the store (hard links counted once)"""
+        inodes = {}
+        files = 0
+        for _, stat in self._scan():
+            inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+            files += 1
+        return {"bytes": sum(inodes.values()), "files": files, "max_bytes": self.max_bytes}
+
+    def _remove(self, path: Path):
+        for victim in (path, Path(f"{path}{PIN_SUFFIX}"), Path(f"{path}{META_SUFFIX}")):
+            try:
+                victim.unlink()
+            except FileNotFoundError:
+                pass
+
+    def collect_garbage(self) -> Dict:
+        """
+        Remove expired files, then least recently used ones over budget
+
+        Returns:
+            Statistics of the run
+        """
+        now = time.time()
+        removed_expired = 0
+        removed_budget = 0
+
+        entries = []
+        for path, stat in self._scan():
+            if self.is_pinned(path, now):
+                continue
+            if now - stat.st_mtime > self.ttl:
+                self._remove(path)
+                removed_expired += 1
+            else:
+                entries.append((stat.st_mtime, path))
+
+        # Byte budget: oldest first, until the store fits
+        inodes = {}
+        links = {}
+        for path, stat in self._scan():
+            inode = (stat.st_dev, stat.st_ino)
+            inodes[inode] = stat.st_size
+            links.setdefault(path, inode)
+        total = sum(inodes.values())
+
+        if total > self.max_bytes:
+            remaining_links = {}
+            for inode in links.values():
+                remaining_links[inode] = remaining_links.get(inode, 0) + 1
+
+            for _, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                inode = links.get(path)
+                if inode is None:
+                    continue
+                self._remove(path)
+                removed_budget += 1
+                remaining_links[inode] -= 1
+                if remaining_links[inode] == 0:
+                    total -= inodes[inode]
+
+        # Sidecars whose artifact is gone
+        for sidecar in list(self.root.rglob(f"*{PIN_SUFFIX}")) + list(self.root.rglob(f"*{META_SUFFIX}")):
+            owner = Path(str(sidecar)[:-len(sidecar.suffix)])
+            if not owner.exists():
+                try:
+                    sidecar.unlink()
+                except FileNotFoundError:
+                    pass
+
+        if removed_expired or removed_budget:
+            logger.info(
+                f"🗑️  Artifact GC removed {removed_expired} expired and "
+                f"{removed_budget} over-budget file(s), {total / 1024 ** 2:.1f}MB in use"
+            )
+
+        return {"expired": removed_expired, "evicted": removed_budget, "bytes": total}
+
+    async def gc_loop(self, interval: float = 300.0):
+        """Run garbage collection periodically (off the event loop)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.collect_garbage)
+            except Exception as e:
+                logger.error(f"Artifact GC error: {e}")
+            await asyncio.sleep(interval)
+
+
+# Singleton instance
+_artifact_store = None
+
+def get_artifact_store() -> ArtifactStore:
+    """Get or create the global artifact store"""
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore.from_env()
+    return _artifact_store
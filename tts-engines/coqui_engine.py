@@ -5,8 +5,9 @@ Supports XTTS-v2 for voice cloning and multiple languages
 import os
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import torch
 
 logger = logging.getLogger(__name__)
@@ -18,29 +19,48 @@ class CoquiTTSEngine:
     def __init__(self, cache_dir: str):
         self.cache_dir = Path(cache_dir) / "coqui"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.speakers_dir = self.cache_dir / "speakers"
+        self.speakers_dir.mkdir(parents=True, exist_ok=True)
         self.model = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         
+        # One model, one inference thread: XTTS isn't safe to run concurrently
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xtts")
+        self._load_lock = asyncio.Lock()
+        
+        # voice_name -> (gpt_cond_latent, speaker_embedding)
+        self.speaker_latents: Dict[str, Tuple] = {}
+        
         logger.info(f"🎨 Coqui TTS engine initialized (device: {self.device})")
         
+    async def _run(self, func, *args):
+        """Run blocking model work on the engine's inference thread"""
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+        
     async def _load_model(self):
-        """Load XTTS-v2 model (lazy loading for memory efficiency)"""
+        """Load XTTS-v2 model once (lazy loading for memory efficiency)"""
         if self.model is not None:
             return
         
-        logger.info("📦 Loading Coqui XTTS-v2 model...")
-        
-        try:
-            from TTS.api import TTS
-            
-            # Load XTTS-v2 model (supports 13 languages)
-            self.model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(self.device)
+        async with self._load_lock:
+            if self.model is not None:
+                return
             
-            logger.info("✅ XTTS-v2 model loaded successfully")
+            logger.info("📦 Loading Coqui XTTS-v2 model...")
             
-        except Exception as e:
-            logger.error(f"Failed to load Coqui model: {e}")
-            raise
+            try:
+                from TTS.api import TTS
+                
+                # Load XTTS-v2 model (supports 13 languages) off the event loop
+                self.model = await self._run(
+                    lambda: TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(self.device)
+                )
+                
+                logger.info("✅ XTTS-v2 model loaded successfully")
+                
+            except Exception as e:
+                logger.error(f"Failed to load Coqui model: {e}")
+                raise
     
     async def synthesize(
         self,
@@ -68,9 +88,7 @@ class CoquiTTSEngine:
         speaker_wav = kwargs.get("speaker_wav", None)
         
         try:
-            # Run synthesis in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
+            # Run synthesis on the inference thread to avoid blocking
             def _synthesize():
                 if speaker_wav:
                     # Voice cloning mode
@@ -88,23 +106,26 @@ class CoquiTTSEngine:
                         file_path=output_path
                     )
             
-            await loop.run_in_executor(None, _synthesize)
-            
-            # Calculate audio duration
-            import soundfile as sf
-            data, samplerate = sf.read(output_path)
-            audio_duration = len(data) / samplerate
+            await self._run(_synthesize)
             
-            return {
-                "success": True,
-                "audio_duration": audio_duration,
-                "sample_rate": samplerate
-            }
+            return self._result(output_path)
             
         except Exception as e:
             logger.error(f"Coqui synthesis error: {e}")
             raise
     
+    @staticmethod
+    def _result(output_path: str) -> Dict:
+        """Synthesis result with the duration of the written file"""
+        import soundfile as sf
+        data, samplerate = sf.read(output_path)
+        
+        return {
+            "success": True,
+            "audio_duration": len(data) / samplerate,
+            "sample_rate": samplerate
+        }
+    
     def _extract_language(self, voice_id: str) -> str:
         """Extract language code from voice ID"""
         # Map voice IDs to XTTS language codes
@@ -131,12 +152,48 @@ class CoquiTTSEngine:
         
         return "en"  # Default to English
     
+    def _latents_path(self, voice_name: str) -> Path:
+        return self.speakers_dir / f"{voice_name}.pt"
+    
+    async def register_speaker(self, voice_name: str, speaker_audio_path: str) -> Tuple:
+        """
+        Compute a speaker's conditioning latents from their sample
+        
+        Latents are kept in memory and on disk (invalidated when the sample
+        is newer), so a sample is only processed once.
+        """
+        await self._load_model()
+        
+        latents_path = self._latents_path(voice_name)
+        tts_model = self.model.synthesizer.tts_model
+        
+        def _compute():
+            if latents_path.exists() and latents_path.stat().st_mtime >= os.path.getmtime(speaker_audio_path):
+                return tuple(t.to(self.device) for t in torch.load(latents_path, map_location="cpu"))
+            
+            gpt_cond_latent, speaker_embedding = tts_model.get_conditioning_latents(
+                audio_path=[speaker_audio_path]
+            )
+            torch.save((gpt_cond_latent.cpu(), speaker_embedding.cpu()), latents_path)
+            return gpt_cond_latent, speaker_embedding
+        
+        latents = await self._run(_compute)
+        self.speaker_latents[voice_name] = latents
+        logger.info(f"🎤 Speaker latents ready for '{voice_name}'")
+        return latents
+    
+    def forget_speaker(self, voice_name: str):
+        """Drop cached latents (e.g. after a new sample was uploaded)"""
+        self.speaker_latents.pop(voice_name, None)
+        self._latents_path(voice_name).unlink(missing_ok=True)
+    
     async def clone_voice(
         self,
         text: str,
         speaker_audio_path: str,
         output_path: str,
-        language: str = "en"
+        language: str = "en",
+        voice_name: Optional[str] = None
     ) -> Dict:
         """
         Clone a voice from a speaker sample
@@ -146,15 +203,39 @@ class CoquiTTSEngine:
             speaker_audio_path: Path to 6+ second audio sample of target voice
             output_path: Where to save output
             language: Language code
+            voice_name: Key for cached speaker latents; without it the
+                sample is re-processed on every call
         """
         await self._load_model()
         
-        return await self.synthesize(
-            text=text,
-            voice_id=f"{language}-CUSTOM",
-            output_path=output_path,
-            speaker_wav=speaker_audio_path
-        )
+        if voice_name is None:
+            return await self.synthesize(
+                text=text,
+                voice_id=f"{language}-CUSTOM",
+                output_path=output_path,
+                speaker_wav=speaker_audio_path
+            )
+        
+        latents = self.speaker_latents.get(voice_name)
+        if latents is None:
+            latents = await self.register_speaker(voice_name, speaker_audio_path)
+        gpt_cond_latent, speaker_embedding = latents
+        tts_model = self.model.synthesizer.tts_model
+        
+        def _clone():
+            import soundfile as sf
+            out = tts_model.inference(text, language, gpt_cond_latent, speaker_embedding)
+            wav = out["wav"]
+            if hasattr(wav, "cpu"):
+                wav = wav.cpu().numpy()
+            sf.write(output_path, wav, 24000)
+        
+        try:
+            await self._run(_clone)
+            return self._result(output_path)
+        except Exception as e:
+            logger.error(f"Coqui voice cloning error: {e}")
+            raise
     
     async def preload_model(self, voice_id: str):
         """Preload model"""
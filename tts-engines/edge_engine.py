@@ -14,6 +14,8 @@ logger = logging.getLogger(__name__)
 class EdgeTTSEngine:
     """Microsoft Edge TTS - Free high-quality voices"""
     
+    stream_media_type = "audio/mpeg"
+    
     # Comprehensive voice list
     VOICES = {
         # US English
@@ -108,6 +110,16 @@ class EdgeTTSEngine:
             logger.error(f"Edge TTS synthesis error: {e}")
             raise
     
+    async def stream(self, text: str, voice_id: str, **kwargs):
+        """Yield MP3 chunks as Edge TTS produces them"""
+        if voice_id not in self.VOICES:
+            voice_id = self._find_voice(voice_id)
+        
+        communicate = edge_tts.Communicate(text, voice_id)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+    
     def _find_voice(self, voice_id: str) -> str:
         """Find closest matching voice"""
         # If exact match exists, use it
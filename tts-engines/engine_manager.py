@@ -204,6 +204,20 @@ class TTSEngineManager:
                 except:
                     pass  # Skip if voice not supported by this engine
     
+    def get_resident_models(self) -> Dict[str, int]:
+        """Number of models currently loaded in memory per engine"""
+        resident = {}
+        for eng_name, eng in self.engines.items():
+            if hasattr(eng, "models_loaded"):
+                resident[eng_name] = len(eng.models_loaded)
+            elif hasattr(eng, "models"):
+                resident[eng_name] = len(eng.models)
+            elif hasattr(eng, "model"):
+                resident[eng_name] = 1 if eng.model is not None else 0
+            else:
+                resident[eng_name] = 0  # Remote/system engines keep nothing resident
+        return resident
+    
     def get_engine_stats(self) -> Dict:
         """Get statistics about loaded engines"""
         return {
@@ -0,0 +1,111 @@
+"""
+TTS Job Events
+Push-based job state notifications over Redis pub/sub and streams
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+EVENTS_STREAM = "tts:job-events"       # Global stream of every transition
+EVENTS_STREAM_MAXLEN = 10000
+TERMINAL_STATES = ("completed", "failed")
+
+# Fields that are large or irrelevant to listeners
+_OMITTED_FIELDS = ("text",)
+
+
+def job_channel(job_id: str) -> str:
+    """Pub/sub channel carrying the state transitions of one job"""
+    return f"tts:job:{job_id}"
+
+
+def job_event(job_data: Dict) -> Dict:
+    """Build the event payload for a job record"""
+    return {k: v for k, v in job_data.items() if k not in _OMITTED_FIELDS}
+
+
+async def publish_job_state(redis, job_data: Dict, ttl: int = 3600):
+    """
+    Persist a job record and announce its new state
+
+    The record is written before publishing, so a listener that subscribes
+    and then reads job:<id> can never miss the final state.
+
+    Args:
+        redis: redis.asyncio client
+        job_data: Job record (must contain "id")
+        ttl: Expiry of the job record in seconds
+    """
+    job_id = job_data["id"]
+    await redis.set(f"job:{job_id}", json.dumps(job_data), ex=ttl)
+
+    event = json.dumps(job_event(job_data))
+    try:
+        await redis.publish(job_channel(job_id), event)
+        await redis.xadd(
+            EVENTS_STREAM,
+            {"job_id": job_id, "status": job_data.get("status", ""), "event": event},
+            maxlen=EVENTS_STREAM_MAXLEN,
+            approximate=True
+        )
+    except Exception as e:
+        # Notifications are best effort; the job record is authoritative
+        logger.warning(f"Failed to publish state of job {job_id}: {e}")
+
+
+async def wait_for_job(
+    redis,
+    job_id: str,
+    timeout: float = 30.0,
+    states: Iterable[str] = TERMINAL_STATES
+) -> Optional[Dict]:
+    """
+    Wait until a job reaches one of the given states
+
+    Subscribes to the job channel first and then reads the stored record,
+    so completion that happens before or during subscription is not lost.
+
+    Args:
+        redis: redis.asyncio client (decode_responses=True)
+        job_id: Job to wait for
+        timeout: Deadline in seconds
+        states: States that end the wait
+
+    Returns:
+        Job event dict, or None if the deadline passed
+    """
+    states = tuple(states)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(job_channel(job_id))
+
+    try:
+        stored = await redis.get(f"job:{job_id}")
+        if stored:
+            job_data = json.loads(stored)
+            if job_data.get("status") in states:
+                return job_event(job_data)
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"Timed out waiting for job {job_id}")
+                return None
+
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message is None:
+                continue
+
+            event = json.loads(message["data"])
+            if event.get("status") in states:
+                return event
+
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.reset()
@@ -0,0 +1,309 @@
+"""
+Reliable TTS Job Queue
+Redis-backed queue with priority lanes, visibility timeout and bounded retries
+"""
+import json
+import logging
+import os
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+from job_events import publish_job_state
+
+logger = logging.getLogger(__name__)
+
+
+# Priority lanes. "standard" keeps the legacy list name so producers that
+# still LPUSH onto tts:jobs keep working.
+LANES = {
+    "interactive": "tts:jobs:interactive",
+    "standard": "tts:jobs",
+    "bulk": "tts:jobs:bulk",
+}
+
+# Relative polling weights (interactive is checked most often)
+DEFAULT_LANE_WEIGHTS = {
+    "interactive": 6,
+    "standard": 3,
+    "bulk": 1,
+}
+
+INFLIGHT_KEY = "tts:inflight"              # ZSET: envelope -> visibility deadline
+WORKERS_KEY = "tts:workers"                # SET of known worker ids
+DEAD_LETTER_KEY = "tts:jobs:dead"          # Jobs that exhausted their retries
+
+
+def lane_for_job(job_data: Dict) -> str:
+    """Pick the lane a job belongs to"""
+    priority = job_data.get("priority")
+    if priority in LANES:
+        return priority
+
+    # PDFs and batch items never compete with interactive traffic
+    if job_data.get("type") == "pdf_to_speech" or job_data.get("batchId"):
+        return "bulk"
+
+    return "standard"
+
+
+class ReliableJobQueue:
+    """
+    Reliable queue protocol on top of Redis lists
+
+    Jobs are atomically moved (LMOVE/BLMOVE) from a lane into a per-worker
+    processing list, so a job is never only in worker memory. Every claimed
+    job gets a visibility deadline in a ZSET; the worker extends it while it
+    is still busy. A reaper running in every worker returns expired jobs and
+    the processing lists of dead workers to their lane, up to max_retries,
+    after which they go to the dead-letter list.
+    """
+
+    def __init__(
+        self,
+        redis,
+        worker_id: str = None,
+        lane_weights: Dict[str, int] = None,
+        visibility_timeout: float = 300.0,
+        max_retries: int = 3,
+        block_timeout: float = 1.0
+    ):
+        """
+        Initialize job queue
+
+        Args:
+            redis: redis.asyncio client (decode_responses=True)
+            worker_id: Unique worker identifier
+            lane_weights: Relative polling weight per lane
+            visibility_timeout: Seconds a claimed job stays invisible without a heartbeat
+            max_retries: Redeliveries before a job is dead-lettered
+            block_timeout: Seconds to block on the interactive lane when all lanes are empty
+        """
+        self.redis = redis
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lane_weights = lane_weights or dict(DEFAULT_LANE_WEIGHTS)
+        self.visibility_timeout = visibility_timeout
+        self.max_retries = max_retries
+        self.block_timeout = block_timeout
+
+        self.processing_key = f"tts:processing:{self.worker_id}"
+        self.alive_key = f"tts:worker:{self.worker_id}"
+
+        # Smooth weighted round-robin state
+        self._current_weights = {lane: 0 for lane in self.lane_weights}
+
+    @classmethod
+    def from_env(cls, redis) -> "ReliableJobQueue":
+        """Create a queue configured from environment variables"""
+        weights = dict(DEFAULT_LANE_WEIGHTS)
+        for lane in LANES:
+            value = os.getenv(f"TTS_LANE_WEIGHT_{lane.upper()}")
+            if value:
+                weights[lane] = int(value)
+
+        return cls(
+            redis,
+            worker_id=os.getenv("WORKER_ID"),
+            lane_weights=weights,
+            visibility_timeout=float(os.getenv("TTS_VISIBILITY_TIMEOUT", "300")),
+            max_retries=int(os.getenv("TTS_MAX_RETRIES", "3"))
+        )
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    async def enqueue(self, job_data: Dict, lane: str = None):
+        """Push a job onto its lane"""
+        lane = lane or lane_for_job(job_data)
+        job_data.setdefault("enqueuedAt", time.time())
+        await self.redis.lpush(LANES[lane], json.dumps(job_data))
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    async def register(self):
+        """Announce this worker and recover anything left in its processing list"""
+        await self.heartbeat()
+        await self._recover_processing_list(self.worker_id)
+
+    async def heartbeat(self):
+        """
+        Refresh worker liveness
+
+        Re-adds the worker to the known set too, in case a peer's reaper
+        dropped it during a pause longer than the visibility timeout.
+        """
+        await self.redis.sadd(WORKERS_KEY, self.worker_id)
+        await self.redis.set(self.alive_key, int(time.time()), ex=int(self.visibility_timeout))
+
+    def _lane_order(self) -> List[str]:
+        """Lane polling order for this round (smooth weighted round-robin)"""
+        total = sum(self.lane_weights.values())
+        for lane, weight in self.lane_weights.items():
+            self._current_weights[lane] += weight
+
+        first = max(self._current_weights, key=self._current_weights.get)
+        self._current_weights[first] -= total
+
+        # The selected lane goes first, remaining lanes by priority
+        return [first] + [lane for lane in LANES if lane != first and lane in self.lane_weights]
+
+    async def claim(self) -> Optional[Tuple[str, str, Dict]]:
+        """
+        Claim the next job
+
+        Returns:
+            (lane, raw_json, job_data) or None if no job arrived
+        """
+        raw = None
+        lane = None
+
+        for candidate in self._lane_order():
+            raw = await self.redis.lmove(LANES[candidate], self.processing_key, "RIGHT", "LEFT")
+            if raw is not None:
+                lane = candidate
+                break
+
+        if raw is None:
+            # Nothing queued anywhere: block on the call path so an
+            # interactive job is picked up the moment it lands
+            raw = await self.redis.blmove(
+                LANES["interactive"], self.processing_key, self.block_timeout, "RIGHT", "LEFT"
+            )
+            lane = "interactive"
+            if raw is None:
+                return None
+
+        try:
+            job_data = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.error(f"❌ Dropping malformed job payload from {lane} lane")
+            await self.redis.lrem(self.processing_key, 1, raw)
+            return None
+
+        await self.redis.zadd(
+            INFLIGHT_KEY, {self._envelope(lane, raw): time.time() + self.visibility_timeout}
+        )
+        return lane, raw, job_data
+
+    async def extend(self, lane: str, raw: str):
+        """Push the visibility deadline of a job that is still being processed"""
+        await self.redis.zadd(
+            INFLIGHT_KEY, {self._envelope(lane, raw): time.time() + self.visibility_timeout}, xx=True
+        )
+        await self.heartbeat()
+
+    async def ack(self, lane: str, raw: str):
+        """Remove a finished (completed or permanently failed) job"""
+        await self.redis.zrem(INFLIGHT_KEY, self._envelope(lane, raw))
+        await self.redis.lrem(self.processing_key, 1, raw)
+
+    def _envelope(self, lane: str, raw: str) -> str:
+        return json.dumps({"worker": self.worker_id, "lane": lane, "raw": raw})
+
+    # ------------------------------------------------------------------
+    # Reaper
+    # ------------------------------------------------------------------
+
+    async def reap(self) -> int:
+        """
+        Return expired and orphaned jobs to their lanes
+
+        Safe to run from every worker: ZREM/SREM act as the claim, so only
+        one reaper requeues a given job.
+
+        Returns:
+            Number of jobs requeued or dead-lettered
+        """
+        reaped = 0
+
+        # Jobs whose visibility deadline passed without a heartbeat
+        expired = await self.redis.zrangebyscore(INFLIGHT_KEY, 0, time.time())
+        for envelope in expired:
+            if not await self.redis.zrem(INFLIGHT_KEY, envelope):
+                continue  # Another reaper got it (or it was just acked)
+
+            info = json.loads(envelope)
+            removed = await self.redis.lrem(f"tts:processing:{info['worker']}", 1, info["raw"])
+            if removed:
+                await self._redeliver(info["lane"], info["raw"], reason="visibility timeout")
+                reaped += 1
+
+        # Workers that stopped heartbeating: drain their processing lists
+        for worker_id in await self.redis.smembers(WORKERS_KEY):
+            if worker_id == self.worker_id:
+                continue
+            if await self.redis.exists(f"tts:worker:{worker_id}"):
+                continue
+            if not await self.redis.srem(WORKERS_KEY, worker_id):
+                continue
+            reaped += await self._recover_processing_list(worker_id)
+
+        return reaped
+
+    async def _recover_processing_list(self, worker_id: str) -> int:
+        """Redeliver every job in a worker's processing list"""
+        processing_key = f"tts:processing:{worker_id}"
+        recovered = 0
+
+        # Lanes recorded at claim time (a job blocked on from the interactive
+        # lane need not be where lane_for_job would put it)
+        claimed = {}
+        for envelope in await self.redis.zrange(INFLIGHT_KEY, 0, -1):
+            info = json.loads(envelope)
+            if info["worker"] == worker_id:
+                claimed[info["raw"]] = (envelope, info["lane"])
+
+        while True:
+            raw = await self.redis.rpop(processing_key)
+            if raw is None:
+                break
+
+            if raw in claimed:
+                envelope, lane = claimed.pop(raw)
+                await self.redis.zrem(INFLIGHT_KEY, envelope)
+            else:
+                # Claimed but crashed before its envelope was written
+                try:
+                    lane = lane_for_job(json.loads(raw))
+                except json.JSONDecodeError:
+                    continue
+
+            await self._redeliver(lane, raw, reason=f"worker {worker_id} gone")
+            recovered += 1
+
+        if recovered:
+            logger.warning(f"♻️  Recovered {recovered} job(s) from worker {worker_id}")
+        return recovered
+
+    async def _redeliver(self, lane: str, raw: str, reason: str):
+        """Requeue a job with its attempt count bumped, or dead-letter it"""
+        job_data = json.loads(raw)
+        job_data["attempts"] = job_data.get("attempts", 0) + 1
+        job_id = job_data.get("id")
+
+        if job_data["attempts"] > self.max_retries:
+            logger.error(f"☠️  Job {job_id} dead-lettered after {self.max_retries} retries ({reason})")
+            job_data.update({
+                "status": "failed",
+                "error": f"Exceeded {self.max_retries} retries ({reason})",
+                "failedAt": time.strftime("%Y-%m-%d %H:%M:%S")
+            })
+            await self.redis.lpush(DEAD_LETTER_KEY, json.dumps(job_data))
+            await publish_job_state(self.redis, job_data)
+            return
+
+        logger.warning(f"🔁 Requeueing job {job_id} on {lane} lane (attempt {job_data['attempts']}, {reason})")
+        job_data["status"] = "pending"
+        # Retries go to the front of the lane: they have already waited once
+        await self.redis.rpush(LANES.get(lane, LANES["standard"]), json.dumps(job_data))
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    async def depths(self) -> Dict[str, int]:
+        """Queue depth per lane"""
+        return {lane: await self.redis.llen(key) for lane, key in LANES.items()}
@@ -0,0 +1,181 @@
+"""
+Cross-worker Singleflight
+Deduplicates identical in-flight TTS jobs through Redis
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Tuple
+
+from job_events import wait_for_job
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(text: str, voice_id: str, engine: str, sample_rate: int, output_format: str) -> str:
+    """Content hash identifying interchangeable synthesis requests"""
+    payload = json.dumps(
+        [text, voice_id, engine, int(sample_rate), output_format.lower()],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def reuse_artifact(source: str, destination: str):
+    """Expose an existing audio file under another name (hard link, copy as fallback)"""
+    if os.path.abspath(source) == os.path.abspath(destination):
+        return
+
+    Path(destination).parent.mkdir(parents=True, exist_ok=True)
+    if os.path.exists(destination):
+        os.remove(destination)
+
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class SingleFlight:
+    """
+    Singleflight for TTS synthesis across workers
+
+    The first worker to see a content key claims it (SET NX with a lease)
+    and synthesizes. Workers that see the same key while it is claimed
+    wait for the leader's job to finish and reuse its output file instead
+    of recomputing. The leader's result is kept for result_ttl seconds so
+    repeats arriving shortly after (campaigns, broadcasts) are served too;
+    with an artifact store, results are also published under their content
+    key and reused for as long as the store keeps them.
+    """
+
+    def __init__(
+        self,
+        redis,
+        store=None,
+        lease: float = 600.0,
+        result_ttl: int = 3600,
+        max_rounds: int = 3
+    ):
+        """
+        Initialize singleflight
+
+        Args:
+            redis: redis.asyncio client (decode_responses=True)
+            store: Optional ArtifactStore shared with other cache tiers
+            lease: Seconds a leader holds a key (also the follower wait limit)
+            result_ttl: Seconds a finished result stays reusable
+            max_rounds: Claim/wait rounds before a follower computes itself
+        """
+        self.redis = redis
+        self.store = store
+        self.lease = lease
+        self.result_ttl = result_ttl
+        self.max_rounds = max_rounds
+        self.stats = {"leader": 0, "shared": 0, "fallback": 0}
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"tts:singleflight:{key}"
+
+    @staticmethod
+    def _result_key(key: str) -> str:
+        return f"tts:singleflight:{key}:result"
+
+    async def run(
+        self,
+        key: str,
+        job_id: str,
+        output_path: str,
+        compute: Callable[[], Awaitable[Dict]]
+    ) -> Tuple[Dict, bool]:
+        """
+        Produce the artifact for a content key exactly once across workers
+
+        Args:
+            key: Content key (see content_key)
+            job_id: Job requesting the artifact
+            output_path: Where this job expects its audio file
+            compute: Coroutine factory that synthesizes into output_path
+
+        Returns:
+            (synthesis result, shared) where shared is True if the audio
+            came from another job
+        """
+        for _ in range(self.max_rounds):
+            shared = await self._reuse_result(key, output_path)
+            if shared is not None:
+                self.stats["shared"] += 1
+                return shared, True
+
+            if await self.redis.set(self._lock_key(key), job_id, nx=True, ex=int(self.lease)):
+                return await self._lead(key, job_id, output_path, compute), False
+
+            leader = await self.redis.get(self._lock_key(key))
+            if leader is None:
+                continue  # Leader just finished or gave up
+
+            logger.info(f"🔗 Job {job_id} waiting on identical job {leader}")
+            event = await wait_for_job(self.redis, leader, timeout=self.lease)
+            if event is None or event.get("status") != "completed":
+                logger.warning(f"Leader job {leader} did not complete; retrying claim")
+
+        # Leaders kept failing: don't wait forever, synthesize ourselves
+        self.stats["fallback"] += 1
+        return await compute(), False
+
+    async def _lead(self, key: str, job_id: str, output_path: str, compute) -> Dict:
+        """Synthesize as leader and publish the result"""
+        self.stats["leader"] += 1
+        try:
+            result = await compute()
+            if self.store is not None:
+                self.store.publish(key, output_path, result)
+            await self.redis.set(
+                self._result_key(key),
+                json.dumps({"job_id": job_id, "output_path": output_path, "result": result}),
+                ex=self.result_ttl
+            )
+            return result
+        finally:
+            # Only release our own lease
+            if await self.redis.get(self._lock_key(key)) == job_id:
+                await self.redis.delete(self._lock_key(key))
+
+    async def _reuse_result(self, key: str, output_path: str):
+        """Return a copy of the leader's result if its artifact still exists"""
+        stored = await self.redis.get(self._result_key(key))
+        if not stored:
+            return self._reuse_stored_artifact(key, output_path)
+
+        info = json.loads(stored)
+        source = info["output_path"]
+        if not os.path.exists(source):
+            await self.redis.delete(self._result_key(key))
+            return self._reuse_stored_artifact(key, output_path)
+
+        reuse_artifact(source, output_path)
+        logger.info(f"♻️  Reusing audio from job {info['job_id']}")
+
+        result = dict(info["result"])
+        result["output_path"] = output_path
+        result["shared_from"] = info["job_id"]
+        return result
+
+    def _reuse_stored_artifact(self, key: str, output_path: str):
+        """Fall back to the content-addressed artifact store"""
+        if self.store is None:
+            return None
+
+        metadata = self.store.materialize(key, Path(output_path).suffix, output_path)
+        if metadata is None:
+            return None
+
+        logger.info("♻️  Reusing audio from artifact store")
+        result = dict(metadata)
+        result["output_path"] = output_path
+        result["shared_from"] = "artifact-store"
+        return result
@@ -3,7 +3,6 @@ Enterprise TTS Worker - High Performance
 Multi-engine support with automatic optimization
 """
 import asyncio
-import json
 import logging
 import os
 import sys
@@ -14,6 +13,11 @@ import time
 sys.path.insert(0, os.path.dirname(__file__))
 
 from engine_manager import get_engine_manager
+from job_queue import ReliableJobQueue
+from job_events import publish_job_state
+from singleflight import SingleFlight, content_key
+from worker_metrics import WorkerMetrics
+from artifact_store import get_artifact_store
 import redis.asyncio as aioredis
 
 # Configure logging
@@ -34,7 +38,13 @@ class TTSWorker:
     def __init__(self, redis_url: str = "redis://localhost:6379"):
         self.redis_url = redis_url
         self.redis = None
+        self.queue = None
+        self.singleflight = None
         self.engine_manager = get_engine_manager()
+        self.artifacts = get_artifact_store()
+        self.reap_interval = float(os.getenv("TTS_REAP_INTERVAL", "15"))
+        self.metrics = WorkerMetrics()
+        self.metrics_port = int(os.getenv("TTS_METRICS_PORT", "9108"))
         self.stats = {
             "total_jobs": 0,
             "successful_jobs": 0,
@@ -50,10 +60,25 @@ class TTSWorker:
         self.redis = await aioredis.from_url(self.redis_url, decode_responses=True)
         logger.info(f"✅ Connected to Redis: {self.redis_url}")
         
+        # Register with the reliable queue (recovers jobs from a previous run)
+        self.queue = ReliableJobQueue.from_env(self.redis)
+        await self.queue.register()
+        logger.info(f"✅ Registered as worker {self.queue.worker_id}")
+        
+        # Identical jobs across workers are synthesized once
+        self.singleflight = SingleFlight(
+            self.redis,
+            store=self.artifacts,
+            lease=float(os.getenv("TTS_SINGLEFLIGHT_LEASE", "600"))
+        )
+        
         # Initialize TTS engines
         # Start with fastest engines first
         await self.engine_manager.initialize_engines(["piper", "edge", "silero", "coqui"])
         
+        # Expose Prometheus metrics
+        self.metrics.start(self.metrics_port)
+        
         # Ensure directories exist
         Path("./uploads").mkdir(exist_ok=True)
         Path("./output").mkdir(exist_ok=True)
@@ -75,14 +100,14 @@ class TTSWorker:
             # Update job status to processing
             job_data["status"] = "processing"
             job_data["progress"] = 10
-            await self.redis.set(f"job:{job_id}", json.dumps(job_data), ex=3600)
+            await self._save_job(job_data)
             
             # Extract job details
             job_type = job_data.get("type")
             voice_id = job_data.get("voice_id")
             sample_rate = job_data.get("sample_rate", 24000)
             output_filename = job_data.get("outputFilename")
-            output_path = Path("./output") / output_filename
+            output_path = self.artifacts.path_for(Path(output_filename).name)
             
             # Get text based on job type
             if job_type == "text_to_speech":
@@ -91,10 +116,12 @@ class TTSWorker:
             elif job_type == "pdf_to_speech":
                 # Extract text from PDF
                 pdf_path = Path("./uploads") / job_data.get("inputFile")
+                extract_start = time.time()
                 text = await self._extract_pdf_text(pdf_path)
+                self.metrics.observe_extraction(job_type, time.time() - extract_start)
                 
                 job_data["progress"] = 30
-                await self.redis.set(f"job:{job_id}", json.dumps(job_data), ex=3600)
+                await self._save_job(job_data)
                 
             else:
                 raise ValueError(f"Unknown job type: {job_type}")
@@ -112,17 +139,27 @@ class TTSWorker:
             
             # Update progress
             job_data["progress"] = 50
-            await self.redis.set(f"job:{job_id}", json.dumps(job_data), ex=3600)
+            await self._save_job(job_data)
             
-            # Synthesize speech
-            result = await self.engine_manager.synthesize(
-                text=text,
-                voice_id=voice_id,
-                output_path=str(output_path),
-                engine="auto",  # Auto-select best engine
-                sample_rate=sample_rate
+            # Synthesize speech (once per identical request across workers)
+            engine = "auto"  # Auto-select best engine
+            flight_key = content_key(text, voice_id, engine, sample_rate, output_path.suffix)
+            result, shared = await self.singleflight.run(
+                flight_key,
+                job_id,
+                str(output_path),
+                lambda: self.engine_manager.synthesize(
+                    text=text,
+                    voice_id=voice_id,
+                    output_path=str(output_path),
+                    engine=engine,
+                    sample_rate=sample_rate
+                )
             )
             
+            if not shared:
+                self.metrics.observe_synthesis(job_type, voice_id, result)
+            
             # Update job as completed
             processing_time = time.time() - start_time
             
@@ -133,18 +170,25 @@ class TTSWorker:
                 "size": result["file_size"],
                 "audio_duration": result["audio_duration"],
                 "engine_used": result["engine"],
+                "shared_from": result.get("shared_from"),
+                "outputFilename": self.artifacts.relative(output_path),
                 "completedAt": time.strftime("%Y-%m-%d %H:%M:%S")
             })
             
-            await self.redis.set(f"job:{job_id}", json.dumps(job_data), ex=3600)
+            # Keep the file while the job record points at it
+            self.artifacts.pin(output_path, ttl=3600)
+            await self._save_job(job_data)
             
             # Update statistics
             self.stats["successful_jobs"] += 1
             self.stats["total_processing_time"] += processing_time
+            self.metrics.observe_finished(job_type, "completed", shared=shared)
             await self._update_stats()
             
             logger.info(f"✨ Job {job_id} completed in {processing_time:.2f}s")
             logger.info(f"   Engine: {result['engine']}")
+            if shared:
+                logger.info(f"   Audio shared from job {result['shared_from']}")
             logger.info(f"   Audio duration: {result['audio_duration']:.2f}s")
             logger.info(f"   File size: {result['file_size']/1024:.1f}KB")
             
@@ -169,11 +213,16 @@ class TTSWorker:
                 "duration": processing_time
             })
             
-            await self.redis.set(f"job:{job_id}", json.dumps(job_data), ex=3600)
+            await self._save_job(job_data)
             
             self.stats["failed_jobs"] += 1
+            self.metrics.observe_finished(job_data.get("type"), "failed")
             await self._update_stats()
     
+    async def _save_job(self, job_data: dict):
+        """Store the job record and notify listeners of the state change"""
+        await publish_job_state(self.redis, job_data)
+    
     async def _extract_pdf_text(self, pdf_path: Path) -> str:
         """Extract text from PDF file"""
         logger.info(f"📄 Extracting text from: {pdf_path.name}")
@@ -207,6 +256,48 @@ class TTSWorker:
             avg_time = self.stats["total_processing_time"] / self.stats["successful_jobs"]
             await self.redis.set("stats:avg_processing_time", f"{avg_time:.2f}")
     
+    async def _process_claimed(self, lane: str, job_json: str, job_data: dict):
+        """Process a claimed job while keeping its visibility deadline fresh"""
+        async def _keep_visible():
+            while True:
+                await asyncio.sleep(self.queue.visibility_timeout / 3)
+                await self.queue.extend(lane, job_json)
+        
+        self.metrics.observe_claim(lane, job_data)
+        self.metrics.add_in_flight(1)
+        
+        keeper = asyncio.create_task(_keep_visible())
+        try:
+            await self.process_job(job_data)
+        finally:
+            keeper.cancel()
+            self.metrics.add_in_flight(-1)
+        
+        # process_job records both success and failure on the job itself,
+        # so the job leaves the processing list either way
+        await self.queue.ack(lane, job_json)
+    
+    async def _gauge_loop(self):
+        """Periodically refresh queue depth and resident model gauges"""
+        while True:
+            try:
+                self.metrics.set_queue_depths(await self.queue.depths())
+                self.metrics.set_resident_models(self.engine_manager.get_resident_models())
+            except Exception as e:
+                logger.error(f"Metrics refresh error: {e}")
+            await asyncio.sleep(5)
+    
+    async def _reaper_loop(self):
+        """Periodically return expired and orphaned jobs to their lanes"""
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                reaped = await self.queue.reap()
+                if reaped:
+                    logger.info(f"♻️  Reaper returned {reaped} job(s)")
+            except Exception as e:
+                logger.error(f"Reaper error: {e}")
+    
     async def run(self):
         """Main worker loop"""
         await self.initialize()
@@ -215,18 +306,25 @@ class TTSWorker:
         logger.info("🎙️  ENTERPRISE TTS WORKER ACTIVE")
         logger.info("="*60)
         logger.info(f"Engines loaded: {', '.join(self.engine_manager.engines.keys())}")
+        logger.info(f"Lanes (weight): {', '.join(f'{k}={v}' for k, v in self.queue.lane_weights.items())}")
         logger.info("Waiting for jobs from Redis queue...")
         logger.info("="*60 + "\n")
         
+        reaper = asyncio.create_task(self._reaper_loop())
+        gauges = asyncio.create_task(self._gauge_loop())
+        gc = asyncio.create_task(self.artifacts.gc_loop())
+        
         while True:
             try:
-                # Block and wait for jobs (timeout 5 seconds)
-                result = await self.redis.brpop("tts:jobs", timeout=5)
+                # Stay alive for peers' reapers even while jobs arrive back to back
+                await self.queue.heartbeat()
+                
+                # Claim the next job (moved atomically into our processing list)
+                claimed = await self.queue.claim()
                 
-                if result:
-                    queue_name, job_json = result
-                    job_data = json.loads(job_json)
-                    await self.process_job(job_data)
+                if claimed:
+                    lane, job_json, job_data = claimed
+                    await self._process_claimed(lane, job_json, job_data)
                 
             except KeyboardInterrupt:
                 logger.info("\n⚠️  Received shutdown signal")
@@ -237,6 +335,9 @@ class TTSWorker:
                 logger.exception(e)
                 await asyncio.sleep(5)  # Wait before retrying
         
+        reaper.cancel()
+        gauges.cancel()
+        gc.cancel()
         logger.info("🛑 Worker shutting down...")
         await self.redis.close()
 
@@ -0,0 +1,149 @@
+"""
+TTS Worker Metrics
+Prometheus histograms and gauges for queue wait, extraction and synthesis
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, start_http_server
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+# Buckets in seconds: call-path jobs live in the sub-second range, PDFs in minutes
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RTF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+
+def job_enqueued_at(job_data: Dict) -> Optional[float]:
+    """Enqueue timestamp (epoch seconds) of a job, if known"""
+    if job_data.get("enqueuedAt"):
+        return float(job_data["enqueuedAt"])
+
+    created = job_data.get("createdAt")
+    if created:
+        try:
+            return datetime.fromisoformat(created.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class WorkerMetrics:
+    """
+    Metrics surface of a TTS worker
+
+    Served in Prometheus text format by start(). Without prometheus_client
+    installed every method is a no-op, so the worker runs unchanged.
+    """
+
+    def __init__(self):
+        self.enabled = PROMETHEUS_AVAILABLE
+        if not self.enabled:
+            logger.warning("⚠️ Metrics disabled (requires prometheus-client package)")
+            return
+
+        self.queue_wait = Histogram(
+            "tts_queue_wait_seconds",
+            "Time between enqueue and claim by a worker",
+            ["lane", "job_type"],
+            buckets=LATENCY_BUCKETS
+        )
+        self.extraction_time = Histogram(
+            "tts_extraction_seconds",
+            "Text extraction time (PDF jobs)",
+            ["job_type"],
+            buckets=LATENCY_BUCKETS
+        )
+        self.synthesis_time = Histogram(
+            "tts_synthesis_seconds",
+            "Speech synthesis time",
+            ["engine", "voice", "job_type"],
+            buckets=LATENCY_BUCKETS
+        )
+        self.real_time_factor = Histogram(
+            "tts_real_time_factor",
+            "Synthesis time divided by audio duration",
+            ["engine", "voice", "job_type"],
+            buckets=RTF_BUCKETS
+        )
+        self.jobs = Counter(
+            "tts_jobs_total",
+            "Finished jobs",
+            ["job_type", "status"]
+        )
+        self.shared_jobs = Counter(
+            "tts_jobs_shared_total",
+            "Jobs whose audio was reused from an identical job"
+        )
+        self.in_flight = Gauge(
+            "tts_jobs_in_flight",
+            "Jobs currently being processed by this worker"
+        )
+        self.queue_depth = Gauge(
+            "tts_queue_depth",
+            "Jobs waiting per priority lane",
+            ["lane"]
+        )
+        self.resident_models = Gauge(
+            "tts_models_resident",
+            "Models loaded in memory per engine",
+            ["engine"]
+        )
+
+    def start(self, port: int):
+        """Serve /metrics on the given port"""
+        if not self.enabled:
+            return
+        start_http_server(port)
+        logger.info(f"📈 Metrics served on :{port}/metrics")
+
+    def observe_claim(self, lane: str, job_data: Dict):
+        if not self.enabled:
+            return
+        enqueued_at = job_enqueued_at(job_data)
+        if enqueued_at is not None:
+            self.queue_wait.labels(lane, job_data.get("type", "unknown")).observe(
+                max(0.0, time.time() - enqueued_at)
+            )
+
+    def observe_extraction(self, job_type: str, seconds: float):
+        if self.enabled:
+            self.extraction_time.labels(job_type).observe(seconds)
+
+    def observe_synthesis(self, job_type: str, voice_id: str, result: Dict):
+        if not self.enabled:
+            return
+        labels = (result.get("engine", "unknown"), voice_id or "unknown", job_type)
+        self.synthesis_time.labels(*labels).observe(result.get("duration", 0))
+
+        audio_duration = result.get("audio_duration") or 0
+        if audio_duration > 0:
+            self.real_time_factor.labels(*labels).observe(result.get("duration", 0) / audio_duration)
+
+    def observe_finished(self, job_type: str, status: str, shared: bool = False):
+        if not self.enabled:
+            return
+        self.jobs.labels(job_type or "unknown", status).inc()
+        if shared:
+            self.shared_jobs.inc()
+
+    def add_in_flight(self, delta: int):
+        if self.enabled:
+            self.in_flight.inc(delta)
+
+    def set_queue_depths(self, depths: Dict[str, int]):
+        if self.enabled:
+            for lane, depth in depths.items():
+                self.queue_depth.labels(lane).set(depth)
+
+    def set_resident_models(self, resident: Dict[str, int]):
+        if self.enabled:
+            for engine, count in resident.items():
+                self.resident_models.labels(engine).set(count)
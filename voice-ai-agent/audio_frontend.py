@@ -0,0 +1,263 @@
+"""
+Audio Front-End
+G.711 μ-law/A-law codecs and polyphase resampling for telephony audio
+"""
+
+import time
+from fractions import Fraction
+from typing import Dict
+
+import numpy as np
+
+
+# ============================================
+# G.711 codecs (lookup tables)
+# ============================================
+
+def _ulaw_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.uint8)
+    sign = u & 0x80
+    exponent = ((u >> 4) & 0x07).astype(np.int32)
+    mantissa = (u & 0x0F).astype(np.int32)
+    sample = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(sign, -sample, sample).astype(np.int16)
+
+
+def _ulaw_encode_table() -> np.ndarray:
+    # Indexed by the int16 sample reinterpreted as uint16; 14-bit domain as in G.711
+    x = np.arange(65536, dtype=np.uint32).astype(np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(x < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(x) + 0x21, 0x1FFF)
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 5
+    mantissa = (magnitude >> (exponent + 1)) & 0x0F
+    return (((exponent << 4) | mantissa) ^ mask).astype(np.uint8)
+
+
+def _alaw_decode_table() -> np.ndarray:
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (a >> 4) & 0x07
+    mantissa = a & 0x0F
+    magnitude = (mantissa << 4) + 8
+    magnitude = np.where(exponent > 0, (magnitude + 0x100) << np.maximum(exponent - 1, 0), magnitude)
+    return np.where(a & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+def _alaw_encode_table() -> np.ndarray:
+    x = np.arange(65536, dtype=np.uint32).astype(np.uint16).view(np.int16).astype(np.int32)
+    sign = np.where(x >= 0, 0x80, 0x00)
+    magnitude = np.minimum(np.where(x >= 0, x, -x - 1) >> 3, 0xFFF)   # 13-bit domain
+    exponent = np.where(magnitude < 0x20, 0, np.floor(np.log2(np.maximum(magnitude, 1))).astype(np.int32) - 4)
+    mantissa = np.where(exponent == 0, magnitude >> 1, magnitude >> np.maximum(exponent, 0)) & 0x0F
+    return ((sign | (exponent << 4) | mantissa) ^ 0x55).astype(np.uint8)
+
+
+ULAW_DECODE = _ulaw_decode_table()
+ULAW_ENCODE = _ulaw_encode_table()
+ALAW_DECODE = _alaw_decode_table()
+ALAW_ENCODE = _alaw_encode_table()
+
+
+def ulaw_to_pcm16(data: bytes) -> np.ndarray:
+    """Decode G.711 μ-law bytes to int16 samples"""
+    return ULAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def pcm16_to_ulaw(samples: np.ndarray) -> bytes:
+    """Encode int16 samples to G.711 μ-law bytes"""
+    return ULAW_ENCODE[np.asarray(samples, dtype=np.int16).view(np.uint16)].tobytes()
+
+
+def alaw_to_pcm16(data: bytes) -> np.ndarray:
+    """Decode G.711 A-law bytes to int16 samples"""
+    return ALAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def pcm16_to_alaw(samples: np.ndarray) -> bytes:
+    """Encode int16 samples to G.711 A-law bytes"""
+    return ALAW_ENCODE[np.asarray(samples, dtype=np.int16).view(np.uint16)].tobytes()
+
+
+def pcm16_to_float(samples: np.ndarray) -> np.ndarray:
+    return samples.astype(np.float32) / 32768.0
+
+
+def float_to_pcm16(samples: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(samples * 32768.0), -32768, 32767).astype(np.int16)
+
+
+# ============================================
+# Polyphase resampling
+# ============================================
+
+SUPPORTED_RATES = (8000, 16000, 22050, 24000, 48000)
+
+
+def _design_filter(up: int, down: int, half_width: int = 10, beta: float = 5.0) -> np.ndarray:
+    """Kaiser-windowed sinc lowpass at the upsampled rate (DC gain = up)"""
+    factor = max(up, down)
+    numtaps = 2 * half_width * factor + 1
+    n = np.arange(numtaps) - (numtaps - 1) / 2
+    cutoff = 1.0 / factor
+    h = cutoff * np.sinc(cutoff * n) * np.kaiser(numtaps, beta)
+    return h / h.sum() * up
+
+
+class StreamingResampler:
+    """
+    Polyphase rational resampler that keeps filter history across chunks
+
+    The rate ratio is reduced to up/down; the lowpass filter is split into
+    `up` phases so each output sample costs one short dot product, and the
+    last input samples are carried over so chunk boundaries are seamless.
+    Output lags input by the filter's group delay (~half_width input
+    samples at the lower rate).
+    """
+
+    def __init__(self, from_rate: int, to_rate: int, half_width: int = 10):
+        ratio = Fraction(to_rate, from_rate)
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.up = ratio.numerator
+        self.down = ratio.denominator
+
+        h = _design_filter(self.up, self.down, half_width)
+        self.taps = -(-len(h) // self.up)   # Taps per phase
+        padded = np.zeros(self.taps * self.up)
+        padded[:len(h)] = h
+        # phases[p, k] = h[p + k * up]
+        self.phases = padded.reshape(self.taps, self.up).T.astype(np.float32).copy()
+        # In output samples (equal rates pass through untouched)
+        self.delay = (len(h) - 1) / 2 / self.down if self.up != self.down else 0.0
+
+        self.reset()
+
+    def reset(self):
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.consumed = 0       # Input samples seen
+        self.produced = 0       # Output samples emitted
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample a float32 chunk"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.up == self.down:
+            return samples.copy()
+
+        buffer = np.concatenate([self.history, samples])
+        available = self.consumed + len(samples)
+
+        # Output n needs input index (n * down) // up < available
+        end = -(-available * self.up // self.down)
+        n = np.arange(self.produced, end, dtype=np.int64)
+        if len(n) == 0:
+            self._advance(samples, buffer)
+            return np.zeros(0, dtype=np.float32)
+
+        position = n * self.down
+        phase = position % self.up
+        index = position // self.up - self.consumed + (self.taps - 1)   # Into buffer
+
+        windows = buffer[index[:, None] - np.arange(self.taps)[None, :]]
+        out = np.einsum("ij,ij->i", windows, self.phases[phase])
+
+        self.produced = end
+        self._advance(samples, buffer)
+        return out.astype(np.float32)
+
+    def _advance(self, samples: np.ndarray, buffer: np.ndarray):
+        self.consumed += len(samples)
+        self.history = buffer[len(buffer) - (self.taps - 1):] if self.taps > 1 else self.history
+
+    def flush(self) -> np.ndarray:
+        """Push out the samples still inside the filter"""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        return self.process(np.zeros(self.taps, dtype=np.float32))
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Resample a whole float32 signal, compensating the filter delay"""
+    if from_rate == to_rate:
+        return np.asarray(samples, dtype=np.float32)
+
+    resampler = StreamingResampler(from_rate, to_rate)
+    out = np.concatenate([resampler.process(samples), resampler.flush()])
+    start = int(round(resampler.delay))
+    length = -(-len(samples) * resampler.up // resampler.down)
+    out = out[start:start + length]
+    return np.pad(out, (0, length - len(out)))
+
+
+# ============================================
+# Telephony streams
+# ============================================
+
+class TelephonyDecoder:
+    """8 kHz G.711 payloads -> float32 PCM at the model rate (stateful)"""
+
+    def __init__(self, to_rate: int = 16000, codec: str = "ulaw"):
+        self.decode = ulaw_to_pcm16 if codec == "ulaw" else alaw_to_pcm16
+        self.resampler = StreamingResampler(8000, to_rate)
+
+    def process(self, payload: bytes) -> np.ndarray:
+        return self.resampler.process(pcm16_to_float(self.decode(payload)))
+
+
+class TelephonyEncoder:
+    """Float32 PCM at any rate -> 8 kHz G.711 payload bytes (stateful)"""
+
+    def __init__(self, from_rate: int, codec: str = "ulaw"):
+        self.encode = pcm16_to_ulaw if codec == "ulaw" else pcm16_to_alaw
+        self.resampler = StreamingResampler(from_rate, 8000)
+
+    def process(self, samples: np.ndarray) -> bytes:
+        return self.encode(float_to_pcm16(self.resampler.process(samples)))
+
+    def flush(self) -> bytes:
+        return self.encode(float_to_pcm16(self.resampler.flush()))
+
+
+# ============================================
+# Benchmarks
+# ============================================
+
+def benchmark(seconds: float = 10.0, chunk_ms: int = 20) -> Dict[str, float]:
+    """
+    Throughput of each stage in samples per second
+
+    Resampling is measured in streaming mode with chunk_ms chunks, the
+    way the telephony path uses it.
+    """
+    results = {}
+    rng = np.random.default_rng(0)
+
+    def _rate(label, samples, func, repeat=5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        results[label] = samples * repeat / (time.perf_counter() - start)
+
+    pcm = (rng.standard_normal(int(8000 * seconds)) * 3000).astype(np.int16)
+    ulaw = pcm16_to_ulaw(pcm)
+    alaw = pcm16_to_alaw(pcm)
+    _rate("ulaw_decode", len(pcm), lambda: ulaw_to_pcm16(ulaw))
+    _rate("ulaw_encode", len(pcm), lambda: pcm16_to_ulaw(pcm))
+    _rate("alaw_decode", len(pcm), lambda: alaw_to_pcm16(alaw))
+    _rate("alaw_encode", len(pcm), lambda: pcm16_to_alaw(pcm))
+
+    for from_rate, to_rate in [(8000, 16000), (16000, 8000), (22050, 16000), (24000, 8000), (48000, 16000)]:
+        signal = rng.standard_normal(int(from_rate * seconds)).astype(np.float32)
+        chunk = from_rate * chunk_ms // 1000
+
+        def _stream():
+            resampler = StreamingResampler(from_rate, to_rate)
+            for i in range(0, len(signal), chunk):
+                resampler.process(signal[i:i + chunk])
+
+        _rate(f"resample_{from_rate}_{to_rate}", len(signal), _stream, repeat=1)
+
+    return results
+
+
+if __name__ == "__main__":
+    for name, rate in benchmark().items():
+        print(f"{name:24s} {rate / 1e6:10.1f} M samples/s")
@@ -0,0 +1,433 @@
+"""
+Batched Speech-to-Text
+Groups concurrent transcription requests from all calls into batched Whisper passes
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, List, Optional, Tuple
+
+import ctranslate2
+import numpy as np
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.vad import SpeechTimestampsMap, collect_chunks, get_speech_timestamps
+
+from stt_service import STTService, TranscriptionResult
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+MAX_BATCHED_SECONDS = 30  # One Whisper window; longer audio is transcribed on its own
+TIME_PRECISION = 0.02     # Seconds per Whisper timestamp token
+
+
+class BatchedTranscriber:
+    """
+    Cross-call batching scheduler for a shared Whisper model
+
+    Requests are queued; the scheduler takes the first one, waits up to
+    max_wait for more, then runs the whole group through one batched
+    encoder pass and one batched decode on the CTranslate2 model behind
+    faster-whisper. Each caller gets its result through its own future.
+    With many concurrent calls the per-utterance cost drops instead of
+    every call's small inference competing for the same cores.
+
+    Results match STTService.transcribe_array: with config.vad_filter each
+    utterance is trimmed to its speech with the same Silero VAD before
+    batching (silence-only audio is never decoded), and decoding keeps
+    Whisper's timestamp tokens, so segments carry start/end times in the
+    original audio. Word timestamps are not produced here; callers that
+    need them use STTService.transcribe_words.
+    """
+
+    def __init__(
+        self,
+        service: STTService,
+        max_batch: int = 16,
+        max_wait: float = 0.03,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        """
+        Args:
+            service: Loaded STTService whose model is shared
+            max_batch: Most utterances per batched pass
+            max_wait: Seconds to wait for more requests after the first
+            executor: Where inference runs (one worker: batches are serialized)
+        """
+        self.service = service
+        self.model = service.model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt-batch")
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.busy = False
+        self.queue_wait = 0.0   # Smoothed seconds between enqueue and decode start (0 once drained)
+        self.service_time = 0.0  # Smoothed inference seconds per utterance
+        self.stats = {"requests": 0, "batches": 0}
+
+    async def transcribe(self, audio_array: np.ndarray, language: Optional[str] = None) -> TranscriptionResult:
+        """
+        Transcribe float32 mono 16 kHz audio as part of the next batch
+
+        Args:
+            audio_array: Samples in [-1, 1]
+            language: Skip language detection for this request
+        """
+        if len(audio_array) > MAX_BATCHED_SECONDS * SAMPLE_RATE:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self.executor, self.service.transcribe_array, audio_array)
+
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        await self._queue.put((audio_array, language, future, loop.time()))
+        self.stats["requests"] += 1
+        return await future
+
+    async def transcribe_audio(
+        self,
+        audio_data: bytes,
+        sample_rate: int = 16000,
+        language: Optional[str] = None
+    ) -> TranscriptionResult:
+        """Same interface as STTService.transcribe_audio (16 kHz int16 PCM)"""
+        return await self.transcribe(
+            np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0,
+            language=language
+        )
+
+    def expected_wait(self) -> float:
+        """Queue wait a request arriving now should expect (0 when idle)"""
+        if not self.busy and (self._queue is None or self._queue.empty()):
+            return 0.0
+        return self.queue_wait
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def status(self) -> dict:
+        return {"queue_wait": self.expected_wait(), "service_time": self.service_time, **self.stats}
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up (hang-up, barge-in) don't take a batch slot
+            batch = [item for item in batch if not item[2].done()]
+            if not batch:
+                continue
+
+            now = loop.time()
+            for _, _, _, enqueued in batch:
+                wait = now - enqueued
+                # Start a fresh average after a drain so a new backlog shows up at once
+                self.queue_wait = 0.8 * self.queue_wait + 0.2 * wait if self.queue_wait else wait
+
+            self.stats["batches"] += 1
+            self.busy = True
+            started = loop.time()
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self._transcribe_batch,
+                    [audio for audio, _, _, _ in batch], [language for _, language, _, _ in batch]
+                )
+                per_item = (loop.time() - started) / len(batch)
+                self.service_time = 0.8 * self.service_time + 0.2 * per_item if self.service_time else per_item
+            except Exception as e:
+                logger.error(f"Batched transcription error: {e}")
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.busy = False
+                if self._queue.empty():
+                    # Backlog drained: a past spike must not keep the wait high
+                    self.queue_wait = 0.0
+
+            for (_, _, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _features(self, audio_array: np.ndarray) -> np.ndarray:
+        """Log-mel features padded to one 30 s window"""
+        extractor = self.model.feature_extractor
+        features = extractor(audio_array)
+        frames = extractor.nb_max_frames
+        if features.shape[-1] < frames:
+            features = np.pad(features, ((0, 0), (0, frames - features.shape[-1])))
+        return features[:, :frames]
+
+    def _languages(self, encoder_output, requested: List[Optional[str]]) -> List[str]:
+        requested = [language or self.service.config.language for language in requested]
+        if all(requested):
+            return requested
+        if not self.model.model.is_multilingual:
+            return ["en"] * encoder_output.shape[0]
+        # Top language token per item, e.g. "<|en|>"; pinned languages win
+        detected = [scores[0][0][2:-2] for scores in self.model.model.detect_language(encoder_output)]
+        return [language or guess for language, guess in zip(requested, detected)]
+
+    def _speech(self, audio_array: np.ndarray) -> Tuple[np.ndarray, Optional[SpeechTimestampsMap]]:
+        """Speech-only audio (as transcribe(vad_filter=True) decodes it) and its time map"""
+        if not self.service.config.vad_filter:
+            return audio_array, None
+        chunks = get_speech_timestamps(audio_array)
+        if not chunks:
+            return audio_array[:0], None
+        return collect_chunks(audio_array, chunks), SpeechTimestampsMap(chunks, SAMPLE_RATE)
+
+    @staticmethod
+    def _segments(
+        tokenizer: Tokenizer,
+        tokens: List[int],
+        score: float,
+        end_time: float,
+        speech_map: Optional[SpeechTimestampsMap]
+    ) -> List[dict]:
+        """Split decoded tokens at Whisper timestamp tokens into timed segments"""
+        segments = []
+        text_tokens: List[int] = []
+        start = 0.0
+
+        def _close(end: float):
+            text = tokenizer.decode(text_tokens).strip()
+            if not text:
+                return
+            if speech_map is not None:
+                segments.append({
+                    "start": speech_map.get_original_time(start),
+                    "end": speech_map.get_original_time(end),
+                    "text": text,
+                    "confidence": score
+                })
+            else:
+                segments.append({"start": start, "end": end, "text": text, "confidence": score})
+
+        for token in tokens:
+            if token >= tokenizer.timestamp_begin:
+                time = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+                if text_tokens:
+                    _close(time)
+                    text_tokens = []
+                start = time
+            elif token < tokenizer.eot:
+                text_tokens.append(token)
+
+        if text_tokens:
+            _close(end_time)
+        return segments
+
+    def _transcribe_batch(
+        self,
+        audios: List[np.ndarray],
+        languages: Optional[List[Optional[str]]] = None
+    ) -> List[TranscriptionResult]:
+        """One batched encoder pass and one batched decode (blocking)"""
+        languages = languages or [None] * len(audios)
+        results: List[Optional[TranscriptionResult]] = [None] * len(audios)
+
+        speech = [self._speech(audio) for audio in audios]
+        for i, (audio, (trimmed, _)) in enumerate(zip(audios, speech)):
+            if len(trimmed) == 0:
+                results[i] = TranscriptionResult(
+                    text="",
+                    language=languages[i] or self.service.config.language or "en",
+                    confidence=0.0,
+                    duration=len(audio) / SAMPLE_RATE
+                )
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        features = np.ascontiguousarray(np.stack([self._features(speech[i][0]) for i in pending]))
+        encoder_output = self.model.model.encode(
+            ctranslate2.StorageView.from_array(features),
+            to_cpu=False
+        )
+
+        detected = self._languages(encoder_output, [languages[i] for i in pending])
+        tokenizers = [
+            Tokenizer(self.model.hf_tokenizer, self.model.model.is_multilingual,
+                      task="transcribe", language=language)
+            for language in detected
+        ]
+        # No <|notimestamps|>: the decoder emits segment timestamps
+        prompts = [list(t.sot_sequence) for t in tokenizers]
+
+        outputs = self.model.model.generate(
+            encoder_output,
+            prompts,
+            beam_size=self.service.config.beam_size,
+            max_length=self.model.max_length,
+            return_scores=True,
+            suppress_blank=True,
+            suppress_tokens=[-1]
+        )
+
+        for i, tokenizer, language, output in zip(pending, tokenizers, detected, outputs):
+            trimmed, speech_map = speech[i]
+            score = output.scores[0]
+            segments = self._segments(
+                tokenizer, output.sequences_ids[0], score, len(trimmed) / SAMPLE_RATE, speech_map
+            )
+            results[i] = TranscriptionResult(
+                text=" ".join(segment["text"] for segment in segments),
+                language=language,
+                confidence=float(np.exp(score)) if segments else 0.0,
+                segments=segments,
+                duration=len(audios[i]) / SAMPLE_RATE
+            )
+        return results
+
+
+class TieredTranscriber:
+    """
+    Load-adaptive choice between a full and a smaller Whisper model
+
+    Requests go to the primary tier (e.g. base) until its expected queue
+    wait exceeds degrade_wait; then they go to the fallback tier (e.g.
+    tiny), trading accuracy for latency. Both tiers keep their own
+    batching scheduler.
+
+    Recovery is judged on the primary, not on the fallback: the fallback
+    is fast by design, so its queue stays short even under the load that
+    overwhelmed the primary. Instead the current arrival rate is applied
+    to the primary's smoothed per-utterance service time, and the wait
+    the primary would see (M/D/1: rho * S / (2 * (1 - rho))) must stay
+    under recover_wait for hold seconds before traffic returns to it.
+    """
+
+    def __init__(
+        self,
+        tiers: List[Tuple[str, BatchedTranscriber]],
+        degrade_wait: float = 0.5,
+        recover_wait: float = 0.1,
+        hold: float = 10.0,
+        rate_window: float = 5.0,
+        metrics=None
+    ):
+        """
+        Args:
+            tiers: (name, transcriber) pairs, primary first, fallback second
+            degrade_wait: Primary queue wait (s) that triggers the fallback
+            recover_wait: Predicted primary queue wait (s) under which load has subsided
+            hold: Seconds the prediction must stay low before switching back
+            rate_window: Seconds of requests the arrival rate is measured over
+            metrics: Optional ServerMetrics (stt tier gauge and switch counter)
+        """
+        (self.primary_name, self.primary), (self.fallback_name, self.fallback) = tiers
+        self.degrade_wait = degrade_wait
+        self.recover_wait = recover_wait
+        self.hold = hold
+        self.rate_window = rate_window
+        self.metrics = metrics
+
+        self.degraded = False
+        self._calm_since: Optional[float] = None
+        self._arrivals: Deque[float] = deque()
+        self.switches = 0
+        self._report()
+
+    @property
+    def tier(self) -> str:
+        return self.fallback_name if self.degraded else self.primary_name
+
+    def _switch(self, degraded: bool):
+        previous = self.tier
+        self.degraded = degraded
+        self._calm_since = None
+        self.switches += 1
+        logger.info(f"STT tier {previous} -> {self.tier}")
+        if self.metrics:
+            self.metrics.observe_stt_tier_switch(previous, self.tier)
+        self._report()
+
+    def _report(self):
+        if self.metrics:
+            active = self.fallback if self.degraded else self.primary
+            self.metrics.set_stt_tier(self.tier, [self.primary_name, self.fallback_name], active.expected_wait())
+
+    def arrival_rate(self, now: Optional[float] = None) -> float:
+        """Requests per second over the last rate_window seconds"""
+        now = time.monotonic() if now is None else now
+        while self._arrivals and self._arrivals[0] <= now - self.rate_window:
+            self._arrivals.popleft()
+        return len(self._arrivals) / self.rate_window
+
+    def predicted_primary_wait(self, now: Optional[float] = None) -> float:
+        """Queue wait the primary would see if it took the current traffic"""
+        service = self.primary.service_time
+        load = self.arrival_rate(now) * service
+        if load >= 1:
+            return float("inf")
+        # Whatever is still queued on the primary has to drain first
+        return self.primary.expected_wait() + load * service / (2 * (1 - load))
+
+    def _adapt(self):
+        now = time.monotonic()
+        self._arrivals.append(now)
+        if not self.degraded:
+            if self.primary.expected_wait() > self.degrade_wait:
+                self._switch(True)
+            return
+
+        if self.predicted_primary_wait(now) > self.recover_wait:
+            self._calm_since = None
+        elif self._calm_since is None:
+            self._calm_since = now
+        elif now - self._calm_since >= self.hold:
+            self._switch(False)
+
+    async def transcribe(self, audio_array: np.ndarray, language: Optional[str] = None) -> TranscriptionResult:
+        self._adapt()
+        transcriber = self.fallback if self.degraded else self.primary
+        result = await transcriber.transcribe(audio_array, language=language)
+        self._report()
+        return result
+
+    async def transcribe_audio(
+        self,
+        audio_data: bytes,
+        sample_rate: int = 16000,
+        language: Optional[str] = None
+    ) -> TranscriptionResult:
+        return await self.transcribe(
+            np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0,
+            language=language
+        )
+
+    async def close(self):
+        await self.primary.close()
+        await self.fallback.close()
+
+    def status(self) -> dict:
+        return {
+            "tier": self.tier,
+            "switches": self.switches,
+            "primary_wait": self.primary.expected_wait(),
+            "fallback_wait": self.fallback.expected_wait(),
+            "arrival_rate": self.arrival_rate(),
+            "primary_service_time": self.primary.service_time
+        }
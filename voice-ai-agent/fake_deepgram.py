@@ -0,0 +1,254 @@
+"""
+Fake Deepgram Server
+Local stand-in for Deepgram's /v1/listen (REST and WebSocket) to test and
+benchmark DeepgramSTT without an API key, plus a comparison against Whisper
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_SAMPLE = {"linear16": 2, "mulaw": 1, "alaw": 1}
+
+
+class FakeDeepgram:
+    """
+    Deepgram-shaped responses with a simulated processing delay
+
+    Transcripts describe the audio received ("audio 0.00 to 1.50 seconds"), so
+    tests can check what arrived. Distinct client connections are counted
+    to show whether callers reuse their connection pool.
+    """
+
+    def __init__(self, latency: float = 0.05, real_time_factor: float = 0.02,
+                 interim_every: float = 0.25, final_every: float = 1.0):
+        """
+        Args:
+            latency: Fixed seconds added to every REST response
+            real_time_factor: Extra processing seconds per second of audio
+            interim_every: Seconds of streamed audio between interim results
+            final_every: Seconds of streamed audio between final results
+        """
+        self.latency = latency
+        self.real_time_factor = real_time_factor
+        self.interim_every = interim_every
+        self.final_every = final_every
+        self.connections = set()
+        self.stats = {"requests": 0, "streams": 0}
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/v1/listen", self.listen)
+        return app
+
+    @staticmethod
+    def _duration(request: web.Request, size: int) -> float:
+        encoding = request.query.get("encoding", "linear16")
+        sample_rate = int(request.query.get("sample_rate", "16000"))
+        return size / BYTES_PER_SAMPLE.get(encoding, 2) / sample_rate
+
+    @staticmethod
+    def _alternative(start: float, end: float) -> Dict:
+        return {"transcript": f"audio {start:.2f} to {end:.2f} seconds", "confidence": 0.99}
+
+    async def listen(self, request: web.Request):
+        if not request.headers.get("Authorization", "").startswith("Token "):
+            return web.json_response({"err_msg": "Invalid credentials"}, status=401)
+
+        self.connections.add(request.transport.get_extra_info("peername"))
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return await self.stream(request)
+
+        self.stats["requests"] += 1
+        body = await request.read()
+        duration = self._duration(request, len(body))
+        await asyncio.sleep(self.latency + self.real_time_factor * duration)
+
+        return web.json_response({
+            "metadata": {"duration": duration, "channels": 1},
+            "results": {"channels": [{"alternatives": [self._alternative(0.0, duration)]}]}
+        })
+
+    async def stream(self, request: web.Request):
+        self.stats["streams"] += 1
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        received = 0
+        final_at = 0.0      # Audio time finalized so far
+        interim_at = 0.0
+
+        async def _results(end: float, is_final: bool):
+            await asyncio.sleep(self.real_time_factor * (end - final_at))
+            await ws.send_str(json.dumps({
+                "type": "Results",
+                "start": final_at,
+                "duration": end - final_at,
+                "is_final": is_final,
+                "channel": {"alternatives": [self._alternative(final_at, end)]}
+            }))
+
+        async for message in ws:
+            if message.type == WSMsgType.BINARY:
+                received += len(message.data)
+                now = self._duration(request, received)
+                if now - final_at >= self.final_every:
+                    await _results(now, True)
+                    final_at = interim_at = now
+                elif now - interim_at >= self.interim_every:
+                    await _results(now, False)
+                    interim_at = now
+
+            elif message.type == WSMsgType.TEXT:
+                if json.loads(message.data).get("type") == "CloseStream":
+                    now = self._duration(request, received)
+                    if now > final_at:
+                        await _results(now, True)
+                    break
+            else:
+                break
+
+        await ws.close()
+        return ws
+
+
+async def start_fake_server(fake: Optional[FakeDeepgram] = None, port: int = 0) -> Tuple[web.AppRunner, str]:
+    """Run a FakeDeepgram on localhost; returns (runner, http base URL)"""
+    fake = fake or FakeDeepgram()
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+# ============================================
+# Benchmark
+# ============================================
+
+def _utterance(seconds: float, sample_rate: int = 16000) -> bytes:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16).tobytes()
+
+
+def _summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+    }
+
+
+async def benchmark(utterances: int = 20, seconds: float = 1.5, chunk_ms: int = 20,
+                    whisper_model: Optional[str] = "tiny") -> Dict[str, Dict]:
+    """
+    Compare Deepgram modes against the fake server, and local Whisper
+
+    - rest_new_session: a new client session per utterance (old behaviour)
+    - rest_pooled: one pooled session for all utterances
+    - stream: one WebSocket, audio sent in chunk_ms chunks at real-time
+      pace; latency of the final result after the last chunk, and time to
+      the first interim result
+    - whisper: STTService.transcribe_audio (skipped if faster-whisper is
+      not installed)
+    """
+    from stt_service import DeepgramSTT
+
+    fake = FakeDeepgram()
+    runner, url = await start_fake_server(fake)
+    audio = _utterance(seconds)
+    results = {}
+
+    try:
+        latencies = []
+        for _ in range(utterances):
+            client = DeepgramSTT("fake-key", host=url)
+            start = time.perf_counter()
+            await client.transcribe_audio(audio)
+            latencies.append(time.perf_counter() - start)
+            await client.close()
+        results["rest_new_session"] = _summary(latencies)
+
+        fake.connections.clear()
+        client = DeepgramSTT("fake-key", host=url)
+        latencies = []
+        for _ in range(utterances):
+            start = time.perf_counter()
+            await client.transcribe_audio(audio)
+            latencies.append(time.perf_counter() - start)
+        results["rest_pooled"] = {**_summary(latencies), "connections": len(fake.connections)}
+
+        chunk = 16000 * 2 * chunk_ms // 1000
+        sent_last = 0.0
+
+        async def _chunks():
+            nonlocal sent_last
+            for _ in range(max(1, utterances // 5)):
+                for i in range(0, len(audio), chunk):
+                    yield audio[i:i + chunk]
+                    await asyncio.sleep(chunk_ms / 1000)
+            sent_last = time.perf_counter()
+
+        start = time.perf_counter()
+        first_interim = None
+        async for result in client.transcribe_stream(_chunks()):
+            if first_interim is None and not result.is_final:
+                first_interim = time.perf_counter() - start
+        results["stream"] = {
+            "final_after_last_chunk_ms": (time.perf_counter() - sent_last) * 1000,
+            "first_interim_ms": (first_interim or 0.0) * 1000
+        }
+        await client.close()
+    finally:
+        await runner.cleanup()
+
+    if whisper_model:
+        try:
+            from stt_service import STTService, TranscriptionConfig
+            stt = STTService(TranscriptionConfig(model_size=whisper_model))
+        except Exception as e:
+            logger.warning(f"Whisper benchmark skipped: {e}")
+        else:
+            latencies = []
+            for _ in range(utterances):
+                start = time.perf_counter()
+                await stt.transcribe_audio(audio)
+                latencies.append(time.perf_counter() - start)
+            results[f"whisper_{whisper_model}"] = _summary(latencies)
+
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Fake Deepgram server / STT benchmark")
+    parser.add_argument("--serve", action="store_true", help="Only run the fake server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--utterances", type=int, default=20)
+    parser.add_argument("--whisper-model", default="tiny", help="Empty to skip Whisper")
+    args = parser.parse_args()
+
+    if args.serve:
+        runner, url = await start_fake_server(port=args.port)
+        print(f"Fake Deepgram listening on {url} (DeepgramSTT(api_key, host=\"{url}\"))")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+        return
+
+    results = await benchmark(args.utterances, whisper_model=args.whisper_model or None)
+    for mode, numbers in results.items():
+        print(f"{mode:20s} " + "  ".join(f"{k}={v:.1f}" for k, v in numbers.items()))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,193 @@
+"""
+Long-File Transcription
+Parallel transcription of long recordings (post-call analytics)
+"""
+
+import asyncio
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from audio_frontend import StreamingResampler
+from stt_service import STTService, TranscriptionResult
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class LongFileTranscriber:
+    """
+    Block-wise, parallel transcription of a long audio file
+
+    The file is read in blocks (never decoded whole), downmixed and
+    resampled to 16 kHz on the fly, and cut into segments of roughly
+    target_segment seconds at a silence found by VAD. Segments are
+    transcribed concurrently on a worker pool while reading continues;
+    at most max_pending segments are held in memory. Segment timestamps
+    are shifted by each segment's offset and merged in file order.
+    """
+
+    def __init__(
+        self,
+        service: STTService,
+        vad=None,
+        workers: Optional[int] = None,
+        target_segment: float = 60.0,
+        max_segment: float = 90.0,
+        block_seconds: float = 10.0,
+        max_pending: Optional[int] = None
+    ):
+        """
+        Args:
+            service: Loaded STTService whose model is shared
+            vad: Optional VADService for split points (energy-based if None)
+            workers: Concurrent segment decodes (default: the service's workers)
+            target_segment: Seconds after which a split point is searched
+            max_segment: Hard cut when no silence is found
+            block_seconds: Read size
+            max_pending: Segments queued or decoding at once (default: 2 * workers)
+        """
+        self.service = service
+        self.vad = vad
+        self.workers = workers or service.config.workers
+        self.target_segment = target_segment
+        self.max_segment = max_segment
+        self.block_seconds = block_seconds
+        self.max_pending = max_pending or 2 * self.workers
+
+    # ============================================
+    # Reading and splitting
+    # ============================================
+
+    def _blocks(self, audio_path: str) -> Iterator[np.ndarray]:
+        """16 kHz float32 mono blocks of the file"""
+        with sf.SoundFile(audio_path) as f:
+            resampler = StreamingResampler(f.samplerate, SAMPLE_RATE) if f.samplerate != SAMPLE_RATE else None
+            blocksize = int(self.block_seconds * f.samplerate)
+
+            for block in f.blocks(blocksize=blocksize, dtype="float32", always_2d=True):
+                mono = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+                yield resampler.process(mono) if resampler else mono
+
+            if resampler:
+                yield resampler.flush()
+
+    def _silences(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """Non-speech (start, end) sample ranges of audio"""
+        if self.vad is not None:
+            speech = self.vad.speech_timestamps(audio)
+            edges = [0] + [s for ts in speech for s in (ts["start"], ts["end"])] + [len(audio)]
+            return [(edges[i], edges[i + 1]) for i in range(0, len(edges), 2) if edges[i + 1] > edges[i]]
+
+        # No VAD model: quietest 300 ms window by RMS energy
+        frame = SAMPLE_RATE * 3 // 100
+        frames = len(audio) // frame
+        if frames < 10:
+            return []
+        energy = np.sqrt(np.mean(audio[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+        window = np.convolve(energy, np.ones(10) / 10, mode="valid")
+        quietest = int(np.argmin(window))
+        return [(quietest * frame, (quietest + 10) * frame)]
+
+    def _split_point(self, audio: np.ndarray) -> int:
+        """Sample index to cut at: middle of the longest silence after target_segment"""
+        start = int(self.target_segment * SAMPLE_RATE)
+        silences = self._silences(audio[start:])
+        if not silences:
+            return min(len(audio), int(self.max_segment * SAMPLE_RATE))
+        begin, end = max(silences, key=lambda s: s[1] - s[0])
+        return start + (begin + end) // 2
+
+    def segments(self, audio_path: str, stop: Optional[threading.Event] = None) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        (offset seconds, samples) segments split at silences (blocking)
+        """
+        buffer = np.zeros(0, dtype=np.float32)
+        offset = 0
+
+        for block in self._blocks(audio_path):
+            if stop is not None and stop.is_set():
+                return
+            buffer = np.concatenate([buffer, block])
+
+            while len(buffer) >= self.max_segment * SAMPLE_RATE:
+                cut = self._split_point(buffer)
+                yield offset / SAMPLE_RATE, buffer[:cut]
+                buffer = buffer[cut:]
+                offset += cut
+
+        if len(buffer):
+            yield offset / SAMPLE_RATE, buffer
+
+    # ============================================
+    # Transcription
+    # ============================================
+
+    def _transcribe_segment(self, offset: float, audio: np.ndarray) -> TranscriptionResult:
+        result = self.service.transcribe_array(audio)
+        for segment in result.segments:
+            segment['start'] += offset
+            segment['end'] += offset
+        return result
+
+    def transcribe_path(self, audio_path: str, stop: Optional[threading.Event] = None) -> TranscriptionResult:
+        """
+        Transcribe a file (blocking)
+
+        Args:
+            audio_path: Any format soundfile reads
+            stop: Set to abandon the file; queued segments are skipped
+        """
+        slots = threading.BoundedSemaphore(self.max_pending)
+        futures: List[Future] = []
+        duration = 0.0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="whisper-long") as pool:
+            def _run(offset, audio):
+                try:
+                    if stop is not None and stop.is_set():
+                        return None
+                    return self._transcribe_segment(offset, audio)
+                finally:
+                    slots.release()
+
+            for offset, audio in self.segments(audio_path, stop):
+                slots.acquire()
+                duration = offset + len(audio) / SAMPLE_RATE
+                futures.append(pool.submit(_run, offset, audio))
+
+            results = [future.result() for future in futures]
+
+        if stop is not None and stop.is_set():
+            raise asyncio.CancelledError()
+
+        logger.info(f"Transcribed {duration:.0f}s in {len(results)} segments")
+        return self._merge(results, duration)
+
+    async def transcribe(self, audio_path: str) -> TranscriptionResult:
+        """Transcribe a file without blocking the event loop (cancellable)"""
+        loop = asyncio.get_event_loop()
+        stop = threading.Event()
+        try:
+            return await loop.run_in_executor(None, self.transcribe_path, audio_path, stop)
+        finally:
+            stop.set()
+
+    @staticmethod
+    def _merge(results: List[TranscriptionResult], duration: float) -> TranscriptionResult:
+        """Join per-segment results in file order"""
+        text_segments = [segment for result in results for segment in result.segments]
+
+        # Language spoken for the most audio
+        spoken = Counter()
+        for result in results:
+            spoken[result.language] += sum(s['end'] - s['start'] for s in result.segments)
+        language = spoken.most_common(1)[0][0] if spoken else ""
+
+        return STTService._combine(text_segments, language, duration)
@@ -0,0 +1,104 @@
+"""
+Model Registry
+Loads STT and VAD models once per process and shares them across calls
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Process-wide speech models
+
+    Whisper (behind a batching scheduler) and Silero VAD are loaded once
+    at startup. Calls only create lightweight per-call state, such as a
+    StreamingVAD tracking that caller's speech, on top of the shared
+    models. When STT_FALLBACK_MODEL_SIZE names a smaller model, it is
+    loaded too and requests move to it while the primary is overloaded.
+    With VAD_BACKEND=onnx, every call's VAD frames run in shared batched
+    inference steps.
+    """
+
+    def __init__(self, metrics=None):
+        self.stt = None
+        self.stt_batcher = None
+        self.vad = None
+        self.vad_batcher = None
+        self.metrics = metrics
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        """Load all models (blocking work runs off the event loop)"""
+        async with self._lock:
+            if self._loaded:
+                return
+
+            from stt_service import STTService, TranscriptionConfig
+            from batched_stt import BatchedTranscriber, TieredTranscriber
+            from vad_service import BatchedVAD, VADService
+
+            loop = asyncio.get_event_loop()
+            config = TranscriptionConfig(
+                model_size=os.getenv("STT_MODEL_SIZE", "base"),
+                language=os.getenv("STT_LANGUAGE") or None,
+                device=os.getenv("STT_DEVICE", "cpu"),
+                compute_type=os.getenv("STT_COMPUTE_TYPE", "int8")
+            )
+
+            logger.info("Loading shared speech models...")
+            self.stt, self.vad = await asyncio.gather(
+                loop.run_in_executor(None, STTService, config),
+                loop.run_in_executor(None, lambda: VADService(backend=os.getenv("VAD_BACKEND", "onnx")))
+            )
+            if self.vad.backend == "onnx":
+                self.vad_batcher = BatchedVAD(self.vad)
+            max_batch = int(os.getenv("STT_MAX_BATCH", "16"))
+            max_wait = float(os.getenv("STT_BATCH_WAIT_MS", "30")) / 1000
+            self.stt_batcher = BatchedTranscriber(self.stt, max_batch=max_batch, max_wait=max_wait)
+
+            fallback_size = os.getenv("STT_FALLBACK_MODEL_SIZE", "tiny")
+            if fallback_size and fallback_size != config.model_size:
+                fallback = await loop.run_in_executor(
+                    None, STTService, config.model_copy(update={"model_size": fallback_size})
+                )
+                self.stt_batcher = TieredTranscriber(
+                    [
+                        (config.model_size, self.stt_batcher),
+                        (fallback_size, BatchedTranscriber(fallback, max_batch=max_batch, max_wait=max_wait))
+                    ],
+                    degrade_wait=float(os.getenv("STT_DEGRADE_WAIT_MS", "500")) / 1000,
+                    recover_wait=float(os.getenv("STT_RECOVER_WAIT_MS", "100")) / 1000,
+                    metrics=self.metrics
+                )
+            self._loaded = True
+            logger.info("Shared speech models ready")
+
+    def new_streaming_vad(self):
+        """Per-call speech tracking on the shared VAD model (close() it at hang-up)"""
+        if self.vad_batcher is not None:
+            return self.vad_batcher.open_stream()
+        from vad_service import StreamingVAD
+        return StreamingVAD(self.vad)
+
+    async def close(self):
+        if self.stt_batcher is not None:
+            await self.stt_batcher.close()
+        if self.vad_batcher is not None:
+            await self.vad_batcher.close()
+
+
+# Global instance
+_registry: Optional[ModelRegistry] = None
+
+def get_model_registry(metrics=None) -> ModelRegistry:
+    """Process-wide registry; metrics (e.g. ServerMetrics) are taken from the first call"""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry(metrics)
+    return _registry
@@ -5,9 +5,12 @@ Provides real-time audio transcription with streaming support
 
 import asyncio
 import io
+import json
+import re
+import threading
 import wave
-from typing import AsyncGenerator, Optional
-from faster_whisper import WhisperModel
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
 import numpy as np
 import soundfile as sf
 from pydantic import BaseModel
@@ -24,6 +27,7 @@ class TranscriptionConfig(BaseModel):
     compute_type: str = "int8"  # int8, float16, float32
     beam_size: int = 5
     vad_filter: bool = True  # Use Voice Activity Detection
+    workers: int = 2  # Concurrent decodes (executor threads and CTranslate2 workers)
 
 
 class TranscriptionResult(BaseModel):
@@ -33,6 +37,189 @@ class TranscriptionResult(BaseModel):
     confidence: float
     segments: list = []
     duration: float = 0.0
+    is_final: bool = True  # False for partial (still changing) streaming hypotheses
+
+
+# A timestamped word: (start seconds, end seconds, text, probability)
+Word = Tuple[float, float, str, float]
+
+_NON_WORD = re.compile(r"[^\w']+")
+
+
+def _same_word(a: str, b: str) -> bool:
+    return _NON_WORD.sub("", a.lower()) == _NON_WORD.sub("", b.lower())
+
+
+class LanguageLock:
+    """
+    Per-session language: detected over the first audio, then pinned
+    
+    Until detect_seconds of transcribed audio have been seen, each
+    transcription detects the language and votes for it (weighted by
+    duration). After that the winner is passed to Whisper explicitly and
+    detection is skipped for the rest of the session.
+    """
+    
+    def __init__(self, detect_seconds: float = 3.0, fixed: Optional[str] = None):
+        self.detect_seconds = detect_seconds
+        self.language = fixed   # None while still detecting
+        self.votes: Dict[str, float] = {}
+    
+    def observe(self, language: str, seconds: float):
+        if self.language is not None or not language:
+            return
+        self.votes[language] = self.votes.get(language, 0.0) + seconds
+        if sum(self.votes.values()) >= self.detect_seconds:
+            self.language = max(self.votes, key=self.votes.get)
+            logger.info(f"Session language locked to {self.language}")
+
+
+class HypothesisBuffer:
+    """
+    Local agreement between consecutive streaming hypotheses
+
+    A word is committed once two successive transcriptions of the growing
+    audio window agree on it (and on everything before it). Words after
+    the first disagreement stay tentative until the next update.
+    """
+
+    def __init__(self):
+        self.committed_in_window: List[Word] = []   # Committed words still inside the audio window
+        self.tentative: List[Word] = []             # Previous hypothesis after the committed prefix
+        self.new: List[Word] = []
+        self.last_committed_time = 0.0
+
+    def insert(self, words: List[Word], offset: float):
+        """Add a new hypothesis (word times relative to the window start at offset)"""
+        words = [(start + offset, end + offset, text, p) for start, end, text, p in words]
+        self.new = [w for w in words if w[0] > self.last_committed_time - 0.1]
+
+        # Whisper re-transcribes the start of the window: drop words that
+        # repeat the end of the committed text (up to 5-grams)
+        if self.new and abs(self.new[0][0] - self.last_committed_time) < 1:
+            for n in range(min(len(self.committed_in_window), len(self.new), 5), 0, -1):
+                tail = self.committed_in_window[-n:]
+                head = self.new[:n]
+                if all(_same_word(a[2], b[2]) for a, b in zip(tail, head)):
+                    self.new = self.new[n:]
+                    break
+
+    def flush(self) -> List[Word]:
+        """Commit the prefix the new hypothesis shares with the previous one"""
+        committed = []
+        while self.new and self.tentative and _same_word(self.new[0][2], self.tentative[0][2]):
+            committed.append(self.new.pop(0))
+            self.tentative.pop(0)
+
+        if committed:
+            self.last_committed_time = committed[-1][1]
+            self.committed_in_window.extend(committed)
+        self.tentative = self.new
+        self.new = []
+        return committed
+
+    def forget_before(self, time: float):
+        """Drop committed words whose audio has been trimmed away"""
+        self.committed_in_window = [w for w in self.committed_in_window if w[1] > time]
+
+
+class StreamingTranscriber:
+    """
+    Incremental transcription of one audio stream
+
+    Audio accumulates in a window that is re-transcribed whenever
+    min_chunk seconds of new audio arrive. Words confirmed by local
+    agreement are committed; the rest is a partial hypothesis. After each
+    update the window is trimmed at the end of the last committed word,
+    so an update only decodes audio that is not settled yet; committed
+    text is passed to Whisper as the prompt, keeping context across
+    trims. If nothing is agreed on for 2 * max_window seconds the window
+    is cut to max_window anyway.
+
+    Partial updates decode greedily (partial_beam_size): they are redone
+    every min_chunk and only need to agree with each other. The final
+    pass in finish() uses the configured beam size.
+    """
+
+    SAMPLE_RATE = 16000
+
+    def __init__(self, service: "STTService", min_chunk: float = 0.3, max_window: float = 15.0,
+                 prompt_chars: int = 200, partial_beam_size: int = 1, language: Optional[str] = None):
+        self.service = service
+        self.min_chunk = min_chunk
+        self.max_window = max_window
+        self.prompt_chars = prompt_chars
+        self.partial_beam_size = partial_beam_size
+
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.offset = 0.0           # Stream time of the window start
+        self.unprocessed = 0        # Samples added since the last update
+        self.hypothesis = HypothesisBuffer()
+        self.committed: List[Word] = []
+        self.language_lock = LanguageLock(fixed=language or self.service.config.language)
+        self.language = self.language_lock.language or "en"
+
+    def insert_audio(self, samples: np.ndarray):
+        self.audio = np.concatenate([self.audio, samples.astype(np.float32)])
+        self.unprocessed += len(samples)
+
+    def ready(self) -> bool:
+        return self.unprocessed >= self.min_chunk * self.SAMPLE_RATE
+
+    def _prompt(self) -> Optional[str]:
+        # Committed words already trimmed out of the window give context
+        text = "".join(w[2] for w in self.committed if w[1] <= self.offset)
+        return text[-self.prompt_chars:] or None
+
+    def process(self, beam_size: Optional[int] = None) -> Tuple[List[Word], List[Word]]:
+        """
+        Re-transcribe the window (blocking)
+
+        Args:
+            beam_size: Override partial_beam_size (the final pass)
+
+        Returns:
+            (newly committed words, tentative words)
+        """
+        new_seconds = self.unprocessed / self.SAMPLE_RATE
+        self.unprocessed = 0
+        words, self.language = self.service.transcribe_words(
+            self.audio, prompt=self._prompt(), language=self.language_lock.language,
+            beam_size=beam_size or self.partial_beam_size
+        )
+        self.language_lock.observe(self.language, new_seconds)
+        self.hypothesis.insert(words, self.offset)
+        committed = self.hypothesis.flush()
+        self.committed.extend(committed)
+        self._trim()
+        return committed, list(self.hypothesis.tentative)
+
+    def _trim(self):
+        if self.hypothesis.committed_in_window:
+            self._cut(self.hypothesis.committed_in_window[-1][1])
+
+        # Nothing agreed for a whole window (noise, hallucination): keep compute bounded anyway
+        if len(self.audio) > 2 * self.max_window * self.SAMPLE_RATE:
+            self._cut(self.offset + len(self.audio) / self.SAMPLE_RATE - self.max_window)
+
+    def _cut(self, time: float):
+        samples = int((time - self.offset) * self.SAMPLE_RATE)
+        if samples <= 0:
+            return
+        self.audio = self.audio[samples:]
+        self.offset = time
+        self.hypothesis.forget_before(time)
+
+    def finish(self) -> List[Word]:
+        """Transcribe what is left at full beam and commit everything (blocking)"""
+        committed = []
+        if len(self.audio):
+            # The window holds only unsettled audio; redo it without the greedy shortcut
+            committed, _ = self.process(beam_size=self.service.config.beam_size)
+        rest = self.hypothesis.tentative
+        self.hypothesis.tentative = []
+        self.committed.extend(rest)
+        return committed + rest
 
 
 class STTService:
@@ -41,16 +228,25 @@ class STTService:
     def __init__(self, config: TranscriptionConfig = None):
         self.config = config or TranscriptionConfig()
         self.model = None
+        # Decoding never runs on the event loop; CTranslate2 releases the GIL
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.workers,
+            thread_name_prefix="whisper"
+        )
         self._initialize_model()
     
     def _initialize_model(self):
         """Initialize Whisper model"""
+        # Imported here so DeepgramSTT and the shared types work without faster-whisper
+        from faster_whisper import WhisperModel
+        
         try:
             logger.info(f"Loading Whisper model: {self.config.model_size}")
             self.model = WhisperModel(
                 self.config.model_size,
                 device=self.config.device,
-                compute_type=self.config.compute_type
+                compute_type=self.config.compute_type,
+                num_workers=self.config.workers
             )
             logger.info("Whisper model loaded successfully")
         except Exception as e:
@@ -72,10 +268,111 @@ class STTService:
         Returns:
             TranscriptionResult with transcription
         """
+        # Convert bytes to numpy array
+        audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+        
+        text_segments = []
+        language = self.config.language or ""
+        duration = len(audio_array) / 16000
+        async for segment in self.transcribe_segments(audio_array):
+            language = segment.language
+            text_segments.extend(segment.segments)
+        
+        return self._combine(text_segments, language, duration)
+    
+    async def transcribe_segments(self, audio_array: np.ndarray) -> AsyncGenerator[TranscriptionResult, None]:
+        """
+        Transcribe float32 mono 16 kHz audio, yielding segments as they decode
+        
+        Decoding runs on the service's executor. Cancelling the consumer
+        (hang-up, barge-in) or closing the generator stops decoding at the
+        next segment boundary.
+        
+        Yields:
+            One TranscriptionResult per decoded segment
+        """
+        loop = asyncio.get_event_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        
+        def _emit(kind, value=None):
+            loop.call_soon_threadsafe(queue.put_nowait, (kind, value))
+        
+        def _decode():
+            try:
+                segments, info = self.model.transcribe(
+                    audio_array,
+                    language=self.config.language,
+                    beam_size=self.config.beam_size,
+                    vad_filter=self.config.vad_filter,
+                    task="transcribe"
+                )
+                # Segments are decoded lazily, one per iteration
+                for segment in segments:
+                    if cancelled.is_set():
+                        break
+                    _emit("segment", (self._segment_dict(segment), info))
+            except Exception as e:
+                _emit("error", e)
+            finally:
+                _emit("done")
+        
+        loop.run_in_executor(self.executor, _decode)
+        
         try:
-            # Convert bytes to numpy array
-            audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+            while True:
+                kind, value = await queue.get()
+                if kind == "done":
+                    break
+                if kind == "error":
+                    logger.error(f"Transcription error: {value}")
+                    raise value
+                
+                segment, info = value
+                yield TranscriptionResult(
+                    text=segment['text'].strip(),
+                    language=info.language,
+                    confidence=float(np.exp(segment['confidence'])),
+                    segments=[segment],
+                    duration=info.duration
+                )
+        finally:
+            cancelled.set()
+    
+    @staticmethod
+    def _segment_dict(segment) -> dict:
+        return {
+            'start': segment.start,
+            'end': segment.end,
+            'text': segment.text,
+            'confidence': segment.avg_logprob
+        }
+    
+    @staticmethod
+    def _combine(text_segments: list, language: str, duration: float) -> TranscriptionResult:
+        """Join decoded segments into one result"""
+        confidences = [segment['confidence'] for segment in text_segments]
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        
+        return TranscriptionResult(
+            text=" ".join(segment['text'].strip() for segment in text_segments).strip(),
+            language=language,
+            confidence=float(np.exp(avg_confidence)),  # Convert log prob to confidence
+            segments=text_segments,
+            duration=duration
+        )
+    
+    def transcribe_array(self, audio_array: np.ndarray) -> TranscriptionResult:
+        """
+        Transcribe float32 mono 16 kHz audio (blocking)
+        
+        Args:
+            audio_array: Samples in [-1, 1]
             
+        Returns:
+            TranscriptionResult with transcription
+        """
+        try:
             # Transcribe with Whisper
             segments, info = self.model.transcribe(
                 audio_array,
@@ -85,59 +382,93 @@ class STTService:
                 task="transcribe"
             )
             
-            # Collect segments
-            text_segments = []
-            full_text = ""
-            total_confidence = 0.0
-            segment_count = 0
-            
-            for segment in segments:
-                text_segments.append({
-                    'start': segment.start,
-                    'end': segment.end,
-                    'text': segment.text,
-                    'confidence': segment.avg_logprob
-                })
-                full_text += segment.text + " "
-                total_confidence += segment.avg_logprob
-                segment_count += 1
-            
-            avg_confidence = total_confidence / segment_count if segment_count > 0 else 0.0
-            
-            return TranscriptionResult(
-                text=full_text.strip(),
-                language=info.language,
-                confidence=float(np.exp(avg_confidence)),  # Convert log prob to confidence
-                segments=text_segments,
-                duration=info.duration
-            )
+            text_segments = [self._segment_dict(segment) for segment in segments]
+            return self._combine(text_segments, info.language, info.duration)
             
         except Exception as e:
             logger.error(f"Transcription error: {e}")
             raise
     
-    async def transcribe_file(self, audio_path: str) -> TranscriptionResult:
+    def transcribe_words(
+        self,
+        audio_array: np.ndarray,
+        prompt: Optional[str] = None,
+        language: Optional[str] = None,
+        beam_size: Optional[int] = None
+    ) -> Tuple[List[Word], str]:
+        """
+        Word-timestamped transcription of float32 16 kHz audio (blocking)
+        
+        Args:
+            language: Skip detection and use this language
+            beam_size: Override config.beam_size (1 = greedy)
+        
+        Returns:
+            (words, detected language)
+        """
+        segments, info = self.model.transcribe(
+            audio_array,
+            language=language or self.config.language,
+            beam_size=beam_size or self.config.beam_size,
+            initial_prompt=prompt,
+            word_timestamps=True,
+            vad_filter=False,  # Trailing speech must not be dropped mid-stream
+            task="transcribe"
+        )
+        
+        words = [
+            (word.start, word.end, word.word, word.probability)
+            for segment in segments
+            for word in (segment.words or [])
+        ]
+        return words, info.language
+    
+    async def transcribe_file(
+        self,
+        audio_path: str,
+        long_file_seconds: float = 120.0,
+        vad=None
+    ) -> TranscriptionResult:
         """
         Transcribe audio file
         
+        Recordings longer than long_file_seconds are read in blocks, split
+        at silences and transcribed in parallel (LongFileTranscriber).
+        
         Args:
             audio_path: Path to audio file
+            long_file_seconds: Duration above which long-file mode is used
+            vad: Optional VADService used to find split points in long files
             
         Returns:
             TranscriptionResult
         """
         try:
-            # Read audio file
-            audio_array, sample_rate = sf.read(audio_path)
+            info = sf.info(audio_path)
+            if info.duration > long_file_seconds:
+                from long_transcription import LongFileTranscriber
+                return await LongFileTranscriber(self, vad=vad).transcribe(audio_path)
+            
+            # Read audio file as float32 (no int16 round trip)
+            loop = asyncio.get_event_loop()
+            audio_array, sample_rate = await loop.run_in_executor(
+                self.executor, lambda: sf.read(audio_path, dtype="float32", always_2d=True)
+            )
             
             # Convert to mono if stereo
-            if len(audio_array.shape) > 1:
-                audio_array = audio_array.mean(axis=1)
+            audio_array = audio_array.mean(axis=1) if audio_array.shape[1] > 1 else audio_array[:, 0]
             
-            # Convert to bytes
-            audio_bytes = (audio_array * 32768).astype(np.int16).tobytes()
+            if sample_rate != 16000:
+                from audio_frontend import resample
+                audio_array = resample(audio_array, sample_rate, 16000)
+            
+            text_segments = []
+            language = self.config.language or ""
+            async for segment in self.transcribe_segments(audio_array):
+                language = segment.language
+                text_segments.extend(segment.segments)
             
-            return await self.transcribe_audio(audio_bytes, sample_rate)
+            return self._combine(text_segments, language, len(audio_array) / 16000)
             
         except Exception as e:
             logger.error(f"File transcription error: {e}")
@@ -146,102 +477,310 @@ class STTService:
     async def transcribe_stream(
         self,
         audio_stream: AsyncGenerator[bytes, None],
-        chunk_duration: float = 2.0
+        min_chunk: float = 0.3,
+        max_window: float = 15.0,
+        language: Optional[str] = None
     ) -> AsyncGenerator[TranscriptionResult, None]:
         """
-        Transcribe streaming audio
+        Transcribe streaming audio incrementally
+        
+        Results with is_final=True carry newly committed text (it will not
+        change again); results with is_final=False carry the current
+        tentative text after everything committed so far. A display shows
+        all final texts followed by the latest partial.
         
         Args:
-            audio_stream: Async generator yielding audio chunks
-            chunk_duration: Duration of each chunk in seconds
+            audio_stream: Async generator yielding 16 kHz int16 PCM chunks
+            min_chunk: Seconds of new audio between updates (partial latency)
+            max_window: Longest audio window re-transcribed per update
+            language: Skip detection and use this language
             
         Yields:
-            TranscriptionResult for each chunk
+            Partial and final TranscriptionResults
         """
-        buffer = bytearray()
-        sample_rate = 16000
-        chunk_size = int(chunk_duration * sample_rate * 2)  # 2 bytes per sample
+        transcriber = StreamingTranscriber(self, min_chunk, max_window, language=language)
+        loop = asyncio.get_event_loop()
+        pending: List[bytes] = []
+        arrived = asyncio.Event()
+        ended = False
+        
+        async def _read():
+            # Keep receiving while a transcription runs, so updates use all audio that arrived
+            nonlocal ended
+            try:
+                async for audio_chunk in audio_stream:
+                    pending.append(audio_chunk)
+                    arrived.set()
+            finally:
+                ended = True
+                arrived.set()
+        
+        reader = asyncio.create_task(_read())
         
         try:
-            async for audio_chunk in audio_stream:
-                buffer.extend(audio_chunk)
+            while True:
+                await arrived.wait()
+                arrived.clear()
                 
-                # Process when we have enough data
-                while len(buffer) >= chunk_size:
-                    # Extract chunk
-                    chunk = bytes(buffer[:chunk_size])
-                    buffer = buffer[chunk_size:]
-                    
-                    # Transcribe chunk
-                    result = await self.transcribe_audio(chunk, sample_rate)
-                    
-                    if result.text.strip():  # Only yield non-empty results
-                        yield result
+                if pending:
+                    data = b"".join(pending)
+                    pending.clear()
+                    transcriber.insert_audio(np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0)
+                
+                if ended:
+                    break
+                if not transcriber.ready():
+                    continue
+                
+                committed, tentative = await loop.run_in_executor(self.executor, transcriber.process)
+                if committed:
+                    yield self._stream_result(committed, transcriber.language, True)
+                if tentative:
+                    yield self._stream_result(tentative, transcriber.language, False)
+                if pending:
+                    arrived.set()
+            
+            await reader  # Surface errors from the audio stream
             
-            # Process remaining buffer
-            if len(buffer) > 0:
-                result = await self.transcribe_audio(bytes(buffer), sample_rate)
-                if result.text.strip():
-                    yield result
+            final = await loop.run_in_executor(self.executor, transcriber.finish)
+            if final:
+                yield self._stream_result(final, transcriber.language, True)
                     
         except Exception as e:
             logger.error(f"Stream transcription error: {e}")
             raise
+        finally:
+            reader.cancel()
+    
+    async def transcribe_utterance_stream(
+        self,
+        audio_stream: AsyncGenerator[bytes, None],
+        language: Optional[str] = None
+    ) -> TranscriptionResult:
+        """
+        Transcribe one utterance while it is being spoken
+        
+        Runs transcribe_stream over the utterance's audio as it arrives,
+        so when the stream ends only the unsettled tail is left to decode.
+        
+        Args:
+            audio_stream: 16 kHz int16 PCM chunks, ending with the utterance
+            language: Skip detection and use this language
+        """
+        finals = []
+        samples = 0
+        
+        async def _counted():
+            nonlocal samples
+            async for chunk in audio_stream:
+                samples += len(chunk) // 2
+                yield chunk
+        
+        async for result in self.transcribe_stream(_counted(), language=language):
+            if result.is_final:
+                finals.append(result)
+        
+        segments = [segment for result in finals for segment in result.segments]
+        return TranscriptionResult(
+            text=" ".join(result.text for result in finals).strip(),
+            language=finals[-1].language if finals else (language or self.config.language or "en"),
+            confidence=float(np.mean([result.confidence for result in finals])) if finals else 0.0,
+            segments=segments,
+            duration=samples / 16000
+        )
+    
+    @staticmethod
+    def _stream_result(words: List[Word], language: str, is_final: bool) -> TranscriptionResult:
+        return TranscriptionResult(
+            text="".join(w[2] for w in words).strip(),
+            language=language,
+            confidence=float(np.mean([w[3] for w in words])),
+            segments=[{"start": w[0], "end": w[1], "text": w[2]} for w in words],
+            duration=words[-1][1] - words[0][0],
+            is_final=is_final
+        )
 
 
 class DeepgramSTT:
     """
     Deepgram STT as fallback/alternative
     (Requires API key and internet)
+    
+    One pooled aiohttp session is reused for every request, so utterances
+    after the first skip the TCP/TLS handshake. transcribe_stream keeps a
+    single WebSocket open for a whole call and yields interim results.
     """
     
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        host: str = "https://api.deepgram.com",
+        model: str = "nova-2",
+        language: str = "en",
+        max_connections: int = 32
+    ):
         self.api_key = api_key
-        self.base_url = "https://api.deepgram.com/v1/listen"
+        self.host = host.rstrip("/")
+        self.base_url = f"{self.host}/v1/listen"
+        self.model = model
+        self.language = language
+        self.max_connections = max_connections
+        self._session = None
     
-    async def transcribe_audio(
-        self,
-        audio_data: bytes,
-        sample_rate: int = 16000
-    ) -> TranscriptionResult:
-        """Transcribe using Deepgram API"""
+    def _get_session(self):
         import aiohttp
         
-        headers = {
-            "Authorization": f"Token {self.api_key}",
-            "Content-Type": "audio/wav"
-        }
-        
-        params = {
-            "model": "nova-2",
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                headers={"Authorization": f"Token {self.api_key}"}
+            )
+        return self._session
+    
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def _params(self, sample_rate: int, encoding: str, **extra) -> dict:
+        return {
+            "model": self.model,
             "smart_format": "true",
             "punctuate": "true",
-            "language": "en"
+            "language": self.language,
+            # Raw PCM/mu-law has no header, so describe it
+            "encoding": encoding,
+            "sample_rate": str(sample_rate),
+            "channels": "1",
+            **extra
         }
+    
+    async def transcribe_audio(
+        self,
+        audio_data: bytes,
+        sample_rate: int = 16000,
+        encoding: str = "linear16"
+    ) -> TranscriptionResult:
+        """
+        Transcribe using Deepgram API
         
+        Args:
+            audio_data: Raw mono audio (int16 PCM, or mu-law with encoding="mulaw")
+            sample_rate: Audio sample rate
+            encoding: Deepgram encoding name of audio_data
+        """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.base_url,
-                    headers=headers,
-                    params=params,
-                    data=audio_data
-                ) as response:
-                    result = await response.json()
-                    
-                    transcript = result["results"]["channels"][0]["alternatives"][0]
+            async with self._get_session().post(
+                self.base_url,
+                headers={"Content-Type": "application/octet-stream"},
+                params=self._params(sample_rate, encoding),
+                data=audio_data
+            ) as response:
+                response.raise_for_status()
+                result = await response.json()
+            
+            transcript = result["results"]["channels"][0]["alternatives"][0]
+            duration = result.get("metadata", {}).get("duration", 0.0)
+            
+            return TranscriptionResult(
+                text=transcript["transcript"],
+                language=self.language,
+                confidence=transcript["confidence"],
+                segments=[],
+                duration=duration
+            )
+                
+        except Exception as e:
+            logger.error(f"Deepgram error: {e}")
+            raise
+    
+    async def transcribe_stream(
+        self,
+        audio_stream: AsyncGenerator[bytes, None],
+        sample_rate: int = 16000,
+        encoding: str = "linear16",
+        keepalive: float = 5.0
+    ) -> AsyncGenerator[TranscriptionResult, None]:
+        """
+        Transcribe a call over one Deepgram WebSocket
+        
+        Audio chunks are forwarded as they arrive; Deepgram's interim
+        hypotheses come back with is_final=False and finalized text with
+        is_final=True, the same contract as STTService.transcribe_stream.
+        
+        Args:
+            audio_stream: Async generator yielding raw audio chunks
+            sample_rate: Audio sample rate
+            encoding: Deepgram encoding name (linear16, mulaw)
+            keepalive: Seconds of no audio after which a KeepAlive is sent
+            
+        Yields:
+            Interim and final TranscriptionResults
+        """
+        from aiohttp import WSMsgType
+        
+        url = self.base_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+        params = self._params(sample_rate, encoding, interim_results="true")
+        
+        async with self._get_session().ws_connect(url, params=params, heartbeat=30) as ws:
+            async def _send():
+                # A silent caller must not let Deepgram close the socket
+                chunks = audio_stream.__aiter__()
+                pending = None
+                try:
+                    while True:
+                        if pending is None:
+                            pending = asyncio.ensure_future(chunks.__anext__())
+                        done, _ = await asyncio.wait({pending}, timeout=keepalive)
+                        if not done:
+                            await ws.send_str(json.dumps({"type": "KeepAlive"}))
+                            continue
+                        try:
+                            chunk = pending.result()
+                        except StopAsyncIteration:
+                            break
+                        pending = None
+                        await ws.send_bytes(chunk)
+                finally:
+                    if pending is not None and not pending.done():
+                        pending.cancel()
+                    if not ws.closed:
+                        await ws.send_str(json.dumps({"type": "CloseStream"}))
+            
+            sender = asyncio.create_task(_send())
+            
+            try:
+                async for message in ws:
+                    if message.type != WSMsgType.TEXT:
+                        break
+                    data = json.loads(message.data)
+                    if data.get("type") != "Results":
+                        continue
                     
-                    return TranscriptionResult(
+                    transcript = data["channel"]["alternatives"][0]
+                    if not transcript["transcript"]:
+                        continue
+                    start = data.get("start", 0.0)
+                    yield TranscriptionResult(
                         text=transcript["transcript"],
-                        language="en",
-                        confidence=transcript["confidence"],
-                        segments=[],
-                        duration=0.0
+                        language=self.language,
+                        confidence=transcript.get("confidence", 0.0),
+                        segments=[{
+                            "start": start,
+                            "end": start + data.get("duration", 0.0),
+                            "text": transcript["transcript"]
+                        }],
+                        duration=data.get("duration", 0.0),
+                        is_final=bool(data.get("is_final"))
                     )
+                
+                await sender  # Surface errors from the audio stream
                     
-        except Exception as e:
-            logger.error(f"Deepgram error: {e}")
-            raise
+            except Exception as e:
+                logger.error(f"Deepgram stream error: {e}")
+                raise
+            finally:
+                sender.cancel()
 
 
 # ============================================
@@ -9,13 +9,30 @@ from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
 from twilio.rest import Client
 import asyncio
 import base64
+import collections
+import io
 import json
 import logging
 from typing import Optional
 import os
+import sys
+
+# Shared TTS worker helpers (job events)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tts-engines"))
+# Shared server metrics (STT tier gauge and switch counter)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from audio_frontend import TelephonyDecoder, TelephonyEncoder, float_to_pcm16
+from model_registry import get_model_registry
+from server_metrics import get_server_metrics
 
 logger = logging.getLogger(__name__)
 
+VAD_CHUNK_BYTES = 3200  # 100ms of 16kHz int16 per VAD step
+PRE_ROLL_CHUNKS = 3     # 300ms kept ahead of detected speech (confirmed ~250ms after it starts)
+# Transcribe each utterance while the caller is still speaking (per-call decodes, not batched)
+STREAMING_STT = os.getenv("STT_STREAMING", "0") == "1"
+
 app = FastAPI(title="Voice AI Twilio Server")
 
 
@@ -34,6 +51,19 @@ class TwilioConfig:
 
 
 config = TwilioConfig()
+metrics = get_server_metrics()
+models = get_model_registry(metrics)
+
+
+@app.on_event("startup")
+async def startup():
+    """Load speech models once, before the first call connects"""
+    await models.load()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await models.close()
 
 
 @app.post("/voice/incoming")
@@ -80,20 +110,22 @@ async def handle_audio_stream(websocket: WebSocket):
     call_sid = None
     from_number = None
     stream_sid = None
+    responder = None
+    streaming_vad = None
+    live_audio = None   # Current utterance's audio feed for streaming STT (STT_STREAMING)
+    live_stt = None
     
     logger.info("WebSocket connection established")
     
     try:
         # Import services
-        from stt_service import STTService, TranscriptionConfig
-        from vad_service import VADService, StreamingVAD
         from conversation_manager import ConversationManager, ConversationContext
         import httpx
         
-        # Initialize services
-        stt = STTService(TranscriptionConfig(model_size="base"))
-        vad = VADService()
-        streaming_vad = StreamingVAD(vad)
+        # Shared models; only this call's speech state is created here
+        await models.load()
+        stt = models.stt_batcher
+        streaming_vad = models.new_streaming_vad()
         
         # Initialize conversation manager
         conversation_manager = ConversationManager(
@@ -104,8 +136,89 @@ async def handle_audio_stream(websocket: WebSocket):
         # Create conversation context
         context = None
         
-        # Buffer for audio chunks
-        audio_buffer = bytearray()
+        # Detect the caller's language on the first few seconds, then pin it
+        from stt_service import LanguageLock
+        language_lock = LanguageLock(
+            detect_seconds=float(os.getenv("STT_LANGUAGE_DETECT_SECONDS", "3")),
+            fixed=os.getenv("STT_LANGUAGE") or None
+        )
+        
+        # Caller audio: 8 kHz μ-law in, 16 kHz int16 PCM for VAD/STT
+        decoder = TelephonyDecoder(to_rate=16000)
+        audio_buffer = bytearray()      # Not yet seen by VAD
+        utterance = bytearray()         # Current speech segment
+        pre_roll = collections.deque(maxlen=PRE_ROLL_CHUNKS)  # Latest audio before speech
+        
+        def start_live_transcription(onset: bytes):
+            """Stream an utterance into STT as it is spoken (put None to end it)"""
+            chunks = asyncio.Queue()
+            chunks.put_nowait(onset)
+            
+            async def _audio():
+                while True:
+                    chunk = await chunks.get()
+                    if chunk is None:
+                        return
+                    yield chunk
+            
+            task = asyncio.create_task(
+                models.stt.transcribe_utterance_stream(_audio(), language=language_lock.language)
+            )
+            return chunks, task
+        
+        async def respond(utterance: bytes, live: Optional[asyncio.Task] = None):
+            """Transcribe one utterance and speak the reply (cancelled on barge-in / hang-up)"""
+            try:
+                if live is not None:
+                    transcription = await live
+                else:
+                    transcription = await stt.transcribe_audio(utterance, language=language_lock.language)
+                language_lock.observe(transcription.language, transcription.duration)
+                user_text = transcription.text
+            
+                logger.info(f"User said: {user_text}")
+            
+                if user_text.strip():
+                    # Generate AI response
+                    ai_response, functions = await conversation_manager.generate_response(
+                        context,
+                        user_text
+                    )
+                
+                    logger.info(f"AI response: {ai_response}")
+                
+                    # Convert response to speech using TTS API
+                    tts_url = os.getenv("TTS_API_URL", "http://localhost:5000")
+                
+                    async with httpx.AsyncClient() as client:
+                        tts_response = await client.post(
+                            f"{tts_url}/api/v1/lightning/get_speech",
+                            json={
+                                "text": ai_response,
+                                "voice_id": "en-US-lessac-medium",
+                                "engine": "piper",
+                                "sample_rate": 8000,  # Twilio uses 8kHz
+                                "output_format": "wav",
+                                "priority": "interactive"  # Caller is waiting on the line
+                            }
+                        )
+                    
+                        tts_data = tts_response.json()
+                        job_id = tts_data['job_id']
+                    
+                        # Wait for completion (push, with polling fallback)
+                        audio_url = await wait_tts_completion(client, tts_url, job_id)
+                    
+                        if audio_url:
+                            # Download audio
+                            audio_response = await client.get(audio_url)
+                            audio_data = audio_response.content
+                        
+                            # Send audio to caller
+                            await send_audio_to_caller(websocket, audio_data, stream_sid)
+            except Exception as e:
+                # A failed turn must not go unnoticed (the task result is never awaited)
+                logger.error(f"Reply failed for call {call_sid}: {e}", exc_info=True)
         
         async for message in websocket.iter_text():
             data = json.loads(message)
@@ -129,69 +242,49 @@ async def handle_audio_stream(websocket: WebSocket):
                 # Received audio chunk from caller
                 payload = data['media']['payload']
                 
-                # Decode audio (mulaw base64)
-                audio_chunk = base64.b64decode(payload)
-                audio_buffer.extend(audio_chunk)
+                # Decode audio (mulaw base64) and resample to 16 kHz
+                audio_chunk = decoder.process(base64.b64decode(payload))
+                audio_buffer.extend(float_to_pcm16(audio_chunk).tobytes())
                 
                 # Check VAD every 100ms worth of audio
-                if len(audio_buffer) >= 1600:  # 100ms at 8kHz
-                    chunk = bytes(audio_buffer[:1600])
-                    audio_buffer = audio_buffer[1600:]
+                while len(audio_buffer) >= VAD_CHUNK_BYTES:
+                    chunk = bytes(audio_buffer[:VAD_CHUNK_BYTES])
+                    del audio_buffer[:VAD_CHUNK_BYTES]
                     
                     # Process with VAD
-                    vad_result = streaming_vad.process_chunk(chunk, chunk_duration_ms=100)
+                    vad_result = await streaming_vad.process_chunk_async(chunk)
+                    if vad_result['is_speaking'] or vad_result['speech_ended']:
+                        if not utterance:
+                            # Speech onset precedes its confirmation: start with the pre-roll
+                            utterance.extend(b"".join(pre_roll))
+                            pre_roll.clear()
+                            if STREAMING_STT:
+                                live_audio, live_stt = start_live_transcription(bytes(utterance))
+                        utterance.extend(chunk)
+                        if live_audio is not None:
+                            live_audio.put_nowait(chunk)
+                    else:
+                        pre_roll.append(chunk)
+                    
+                    # Caller talking over the assistant: drop the pending turn
+                    if vad_result['speech_started'] and responder is not None and not responder.done():
+                        logger.info("Barge-in, cancelling pending turn")
+                        responder.cancel()
                     
                     if vad_result['speech_ended']:
                         # Speech segment ended, transcribe it
                         logger.info("Speech ended, transcribing...")
                         
-                        # Transcribe accumulated audio
-                        if len(audio_buffer) > 0:
-                            transcription = await stt.transcribe_audio(bytes(audio_buffer))
-                            user_text = transcription.text
-                            
-                            logger.info(f"User said: {user_text}")
-                            
-                            if user_text.strip():
-                                # Generate AI response
-                                ai_response, functions = await conversation_manager.generate_response(
-                                    context,
-                                    user_text
-                                )
-                                
-                                logger.info(f"AI response: {ai_response}")
-                                
-                                # Convert response to speech using TTS API
-                                tts_url = os.getenv("TTS_API_URL", "http://localhost:5000")
-                                
-                                async with httpx.AsyncClient() as client:
-                                    tts_response = await client.post(
-                                        f"{tts_url}/api/v1/lightning/get_speech",
-                                        json={
-                                            "text": ai_response,
-                                            "voice_id": "en-US-lessac-medium",
-                                            "engine": "piper",
-                                            "sample_rate": 8000,  # Twilio uses 8kHz
-                                            "output_format": "wav"
-                                        }
-                                    )
-                                    
-                                    tts_data = tts_response.json()
-                                    job_id = tts_data['job_id']
-                                    
-                                    # Poll for completion
-                                    audio_url = await poll_tts_completion(client, tts_url, job_id)
-                                    
-                                    if audio_url:
-                                        # Download audio
-                                        audio_response = await client.get(audio_url)
-                                        audio_data = audio_response.content
-                                        
-                                        # Send audio to caller
-                                        await send_audio_to_caller(websocket, audio_data, stream_sid)
+                        # Transcribe accumulated audio without blocking this loop
+                        if len(utterance) > 0:
+                            if live_audio is not None:
+                                # Most of it is decoded already; only the tail is left
+                                live_audio.put_nowait(None)
+                            responder = asyncio.create_task(respond(bytes(utterance), live_stt))
+                            live_audio = live_stt = None
                             
                             # Clear buffer
-                            audio_buffer.clear()
+                            utterance.clear()
             
             elif event == 'stop':
                 # Stream stopped
@@ -202,10 +295,65 @@ async def handle_audio_stream(websocket: WebSocket):
         logger.error(f"WebSocket error: {e}", exc_info=True)
     
     finally:
+        # Hang-up: stop any transcription or reply still in progress
+        if responder is not None and not responder.done():
+            responder.cancel()
+        if live_stt is not None and not live_stt.done():
+            live_stt.cancel()
+        if streaming_vad is not None:
+            streaming_vad.close()
         await websocket.close()
         logger.info("WebSocket connection closed")
 
 
+_tts_redis = None
+
+
+async def get_tts_redis():
+    """Shared Redis connection used to receive TTS job events"""
+    global _tts_redis
+    if _tts_redis is None:
+        redis_url = os.getenv("TTS_REDIS_URL") or os.getenv("REDIS_URL")
+        if not redis_url:
+            return None
+        import redis.asyncio as aioredis
+        _tts_redis = aioredis.from_url(redis_url, decode_responses=True)
+    return _tts_redis
+
+
+async def wait_tts_completion(client, tts_url: str, job_id: str, timeout: int = 30) -> Optional[str]:
+    """
+    Wait for a TTS job to finish
+
+    Uses the worker's job events when Redis is reachable so we wake up as
+    soon as the audio is ready; falls back to polling the API otherwise.
+    """
+    try:
+        redis = await get_tts_redis()
+    except ImportError:
+        redis = None
+    
+    if redis is None:
+        return await poll_tts_completion(client, tts_url, job_id, timeout)
+    
+    try:
+        from job_events import wait_for_job
+        job = await wait_for_job(redis, job_id, timeout=timeout)
+    except Exception as e:
+        logger.warning(f"TTS job events unavailable ({e}), polling instead")
+        return await poll_tts_completion(client, tts_url, job_id, timeout)
+    
+    if job is None:
+        logger.error(f"TTS job timeout: {job_id}")
+        return None
+    
+    if job['status'] == 'failed':
+        logger.error(f"TTS job failed: {job.get('error')}")
+        return None
+    
+    return f"{tts_url}/output/{job['outputFilename']}"
+
+
 async def poll_tts_completion(client, tts_url: str, job_id: str, timeout: int = 30) -> Optional[str]:
     """Poll TTS API for job completion"""
     import time
@@ -232,18 +380,26 @@ async def poll_tts_completion(client, tts_url: str, job_id: str, timeout: int =
     return None
 
 
+def encode_for_caller(audio_data: bytes) -> bytes:
+    """Decode a WAV and convert it to 8 kHz mulaw, whatever rate the engine produced (blocking)"""
+    import soundfile as sf
+    samples, sample_rate = sf.read(io.BytesIO(audio_data), dtype="float32", always_2d=True)
+    encoder = TelephonyEncoder(from_rate=sample_rate)
+    return encoder.process(samples.mean(axis=1)) + encoder.flush()
+
+
 async def send_audio_to_caller(websocket: WebSocket, audio_data: bytes, stream_sid: str):
     """Send audio back to caller via WebSocket"""
     try:
-        # Convert audio to mulaw and base64
-        # Note: In production, you'd convert PCM to mulaw properly
-        audio_base64 = base64.b64encode(audio_data).decode('utf-8')
+        # Whole-reply decode and resample off the event loop (other calls share it)
+        loop = asyncio.get_event_loop()
+        mulaw = await loop.run_in_executor(None, encode_for_caller, audio_data)
         
         # Send in chunks (Twilio expects 20ms chunks)
-        chunk_size = 320  # 20ms at 8kHz mulaw
+        chunk_size = 160  # 20ms at 8kHz mulaw
         
-        for i in range(0, len(audio_base64), chunk_size):
-            chunk = audio_base64[i:i + chunk_size]
+        for i in range(0, len(mulaw), chunk_size):
+            chunk = base64.b64encode(mulaw[i:i + chunk_size]).decode('utf-8')
             
             message = {
                 "event": "media",
@@ -317,6 +473,21 @@ async def get_call_status(call_sid: str):
         return {"error": str(e)}
 
 
+@app.get("/voice/stt")
+async def stt_status():
+    """Active Whisper tier and batching queue"""
+    if models.stt_batcher is None:
+        return {"loaded": False}
+    return models.stt_batcher.status()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics (active STT tier and tier switches)"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -3,9 +3,12 @@ Voice Activity Detection (VAD) Service
 Detects when someone is speaking in audio stream
 """
 
+import asyncio
+import copy
 import torch
 import numpy as np
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,7 +21,8 @@ class VADService:
         self,
         threshold: float = 0.5,
         sampling_rate: int = 16000,
-        window_size: int = 512
+        window_size: int = 512,
+        backend: str = "torch"
     ):
         """
         Initialize VAD service
@@ -27,24 +31,35 @@ class VADService:
             threshold: Detection threshold (0-1)
             sampling_rate: Audio sample rate
             window_size: Size of analysis window
+            backend: "torch" (TorchScript) or "onnx" (ONNX Runtime, batchable)
         """
         self.threshold = threshold
         self.sampling_rate = sampling_rate
         self.window_size = window_size
+        self.backend = backend
         self.model = None
+        self.session = None
         self._initialize_model()
     
     def _initialize_model(self):
         """Load Silero VAD model"""
         try:
-            logger.info("Loading Silero VAD model")
+            logger.info(f"Loading Silero VAD model ({self.backend})")
             self.model, utils = torch.hub.load(
                 repo_or_dir='snakers4/silero-vad',
                 model='silero_vad',
                 force_reload=False,
-                onnx=False
+                onnx=self.backend == "onnx"
             )
             
+            if self.backend == "onnx":
+                # Frames are run on the session directly with explicit state tensors
+                self.session = self.model.session
+                inputs = {i.name for i in self.session.get_inputs()}
+                # v5 models take one "state" tensor plus 64 samples of context; v4 take h and c
+                self._onnx_v5 = "state" in inputs
+                self._context_samples = (64 if self.sampling_rate == 16000 else 32) if self._onnx_v5 else 0
+            
             self.get_speech_timestamps = utils[0]
             logger.info("VAD model loaded successfully")
             
@@ -93,6 +108,105 @@ class VADService:
             logger.error(f"VAD detection error: {e}")
             return False, []
     
+    @property
+    def frame_samples(self) -> int:
+        """Samples per streaming frame (512 at 16 kHz, 256 at 8 kHz)"""
+        return 512 if self.sampling_rate == 16000 else 256
+    
+    def new_stream_state(self) -> Any:
+        """
+        Recurrent state for one audio stream
+        
+        With ONNX this is a few small arrays. The TorchScript model keeps
+        its state inside the module, so each stream gets its own copy of
+        the (~2 MB) module.
+        """
+        if self.session is not None:
+            if self._onnx_v5:
+                return {
+                    "state": np.zeros((2, 128), dtype=np.float32),
+                    "context": np.zeros(self._context_samples, dtype=np.float32)
+                }
+            return {"h": np.zeros((2, 64), dtype=np.float32), "c": np.zeros((2, 64), dtype=np.float32)}
+        
+        model = copy.deepcopy(self.model)
+        model.reset_states()
+        return model
+    
+    def frame_probability(self, frame: np.ndarray, state: Any) -> Tuple[float, Any]:
+        """
+        Speech probability of one frame, advancing the stream's state
+        
+        Args:
+            frame: frame_samples float32 samples
+            state: From new_stream_state() or the previous call
+            
+        Returns:
+            (probability, new state)
+        """
+        if self.session is not None:
+            probabilities, states = self.batch_probabilities([frame], [state])
+            return probabilities[0], states[0]
+        
+        with torch.no_grad():
+            probability = state(torch.from_numpy(frame), self.sampling_rate).item()
+        return probability, state
+    
+    def batch_probabilities(self, frames: List[np.ndarray], states: List[Any]) -> Tuple[List[float], List[Any]]:
+        """
+        One model step for many streams at once (ONNX backend)
+        
+        Frames and per-stream states are stacked along the batch axis, so
+        N streams cost one inference instead of N.
+        
+        Returns:
+            (probabilities, new states), in input order
+        """
+        if self.session is None:
+            results = [self.frame_probability(frame, state) for frame, state in zip(frames, states)]
+            return [p for p, _ in results], [st for _, st in results]
+        
+        sr = np.array(self.sampling_rate, dtype=np.int64)
+        x = np.stack(frames).astype(np.float32, copy=False)
+        
+        if self._onnx_v5:
+            x = np.concatenate([np.stack([st["context"] for st in states]), x], axis=1)
+            output, state = self.session.run(None, {
+                "input": x,
+                "state": np.stack([st["state"] for st in states], axis=1),
+                "sr": sr
+            })
+            new_states = [
+                {"state": state[:, i], "context": x[i, -self._context_samples:]}
+                for i in range(len(states))
+            ]
+        else:
+            output, h, c = self.session.run(None, {
+                "input": x,
+                "sr": sr,
+                "h": np.stack([st["h"] for st in states], axis=1),
+                "c": np.stack([st["c"] for st in states], axis=1)
+            })
+            new_states = [{"h": h[:, i], "c": c[:, i]} for i in range(len(states))]
+        
+        return output[:, 0].tolist(), new_states
+    
+    def speech_timestamps(self, audio_array: np.ndarray) -> List[dict]:
+        """
+        Speech sample ranges of float32 audio (no int16 round trip)
+        
+        Returns:
+            [{'start': sample, 'end': sample}, ...]
+        """
+        return self.get_speech_timestamps(
+            torch.from_numpy(np.ascontiguousarray(audio_array, dtype=np.float32)),
+            self.model,
+            threshold=self.threshold,
+            sampling_rate=self.sampling_rate,
+            min_speech_duration_ms=250,
+            min_silence_duration_ms=100
+        )
+    
     def is_speaking(self, audio_chunk: bytes) -> bool:
         """
         Quick check if audio chunk contains speech
@@ -184,16 +298,93 @@ class StreamingVAD:
     """
     Streaming VAD for real-time detection
     Maintains state across chunks
+    
+    Audio is cut into fixed frames (512 samples, 32 ms at 16 kHz) that
+    go through the Silero model one at a time with this stream's
+    recurrent state carried over, so each frame costs one small model
+    step regardless of how audio is chunked. Speech starts once the
+    probability stays above threshold for min_speech_ms and ends once it
+    stays below neg_threshold for max_silence_ms; in between the state
+    holds (hysteresis), so brief dips inside words don't split speech.
     """
     
-    def __init__(self, vad_service: VADService):
+    def __init__(
+        self,
+        vad_service: VADService,
+        threshold: Optional[float] = None,
+        neg_threshold: Optional[float] = None
+    ):
         self.vad = vad_service
+        self.threshold = threshold or vad_service.threshold
+        self.neg_threshold = neg_threshold if neg_threshold is not None else max(self.threshold - 0.15, 0.01)
+        self.max_silence_ms = 500  # End speech after 500ms silence
+        self.min_speech_ms = 250   # Minimum speech duration
+        self.frame_samples = vad_service.frame_samples
+        self.frame_ms = self.frame_samples * 1000 / vad_service.sampling_rate
+        self.reset()
+    
+    def reset(self):
+        """Forget this stream's model state and speech tracking"""
+        self.state = self.vad.new_stream_state()
+        self.pending = np.zeros(0, dtype=np.float32)
         self.is_speaking = False
-        self.speech_started_at = None
+        self.candidate_ms = 0.0    # Consecutive above-threshold audio while not speaking
         self.silence_duration = 0
         self.speech_duration = 0
-        self.max_silence_ms = 500  # End speech after 500ms silence
-        self.min_speech_ms = 250   # Minimum speech duration
+        self.probability = 0.0
+    
+    def process_frame(self, frame: np.ndarray) -> Tuple[bool, bool]:
+        """
+        Run one frame through the model and update state
+        
+        Returns:
+            (speech_started, speech_ended)
+        """
+        self.probability, self.state = self.vad.frame_probability(frame, self.state)
+        return self.observe(self.probability)
+    
+    def observe(self, probability: float) -> Tuple[bool, bool]:
+        """Update speech tracking with one frame's speech probability"""
+        self.probability = probability
+        
+        if not self.is_speaking:
+            if probability >= self.threshold:
+                self.candidate_ms += self.frame_ms
+                if self.candidate_ms >= self.min_speech_ms:
+                    # Speech just started
+                    self.is_speaking = True
+                    self.speech_duration = self.candidate_ms
+                    self.silence_duration = 0
+                    self.candidate_ms = 0.0
+                    logger.debug("Speech started")
+                    return True, False
+            else:
+                self.candidate_ms = 0.0
+            return False, False
+        
+        self.speech_duration += self.frame_ms
+        if probability >= self.neg_threshold:
+            # Reset silence counter
+            self.silence_duration = 0
+            return False, False
+        
+        self.silence_duration += self.frame_ms
+        if self.silence_duration < self.max_silence_ms:
+            return False, False
+        
+        logger.debug(f"Speech ended (duration: {self.speech_duration}ms)")
+        self.is_speaking = False
+        self.silence_duration = 0
+        self.speech_duration = 0
+        return False, True
+    
+    def frames(self, samples: np.ndarray) -> List[np.ndarray]:
+        """Whole frames of the buffered audio plus samples (remainder is kept)"""
+        self.pending = np.concatenate([self.pending, samples])
+        count = len(self.pending) // self.frame_samples
+        frames = list(self.pending[:count * self.frame_samples].reshape(count, self.frame_samples))
+        self.pending = self.pending[count * self.frame_samples:]
+        return frames
     
     def process_chunk(
         self,
@@ -204,62 +395,152 @@ class StreamingVAD:
         Process audio chunk and update state
         
         Args:
-            audio_chunk: Audio chunk bytes
-            chunk_duration_ms: Duration of chunk in milliseconds
+            audio_chunk: 16-bit PCM bytes at the service's sampling rate (any length)
+            chunk_duration_ms: Unused; durations come from the sample count
             
         Returns:
             {
                 'has_speech': bool,
                 'speech_started': bool,
                 'speech_ended': bool,
-                'speech_duration': float
+                'speech_duration': float,
+                'is_speaking': bool,
+                'probability': float
             }
         """
-        has_speech = self.vad.is_speaking(audio_chunk)
-        
-        speech_started = False
-        speech_ended = False
-        
-        if has_speech:
-            if not self.is_speaking:
-                # Speech just started
-                self.is_speaking = True
-                self.speech_started_at = 0
-                self.speech_duration = 0
-                speech_started = True
-                logger.debug("Speech started")
-            
-            # Reset silence counter
-            self.silence_duration = 0
-            self.speech_duration += chunk_duration_ms
-            
-        else:
-            if self.is_speaking:
-                # In speech but current chunk is silent
-                self.silence_duration += chunk_duration_ms
-                
-                # Check if silence threshold exceeded
-                if self.silence_duration >= self.max_silence_ms:
-                    # Check if speech was long enough
-                    if self.speech_duration >= self.min_speech_ms:
-                        speech_ended = True
-                        logger.debug(f"Speech ended (duration: {self.speech_duration}ms)")
-                    
-                    # Reset state
-                    self.is_speaking = False
-                    self.speech_started_at = None
-                    self.silence_duration = 0
-                    self.speech_duration = 0
+        samples = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
+        frames = self.frames(samples)
+        return self._result([self.process_frame(frame) + (self.probability,) for frame in frames])
+    
+    async def process_chunk_async(self, audio_chunk: bytes) -> dict:
+        """process_chunk for callers that may be given a BatchedStreamingVAD"""
+        return self.process_chunk(audio_chunk)
+    
+    def close(self):
+        """Release the stream (nothing to do without a batcher)"""
+    
+    def _result(self, steps: List[Tuple[bool, bool, float]]) -> dict:
+        """Chunk summary of per-frame (started, ended, probability) steps"""
+        has_speech = any(probability >= self.threshold for _, _, probability in steps)
+        speech_started = any(started for started, _, _ in steps)
+        speech_ended = any(ended for _, ended, _ in steps)
         
         return {
             'has_speech': has_speech,
             'speech_started': speech_started,
             'speech_ended': speech_ended,
             'speech_duration': self.speech_duration / 1000.0,  # Convert to seconds
-            'is_speaking': self.is_speaking
+            'is_speaking': self.is_speaking,
+            'probability': self.probability
         }
 
 
+class BatchedStreamingVAD(StreamingVAD):
+    """StreamingVAD whose model steps run in a BatchedVAD's shared batches"""
+    
+    def __init__(self, batcher: "BatchedVAD", **kwargs):
+        self.batcher = batcher
+        super().__init__(batcher.vad, **kwargs)
+        self.queue: List[Tuple[np.ndarray, asyncio.Future]] = []
+    
+    async def process_chunk_async(self, audio_chunk: bytes) -> dict:
+        """
+        Queue the chunk's frames for the next batched steps and apply the
+        results in order
+        """
+        samples = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
+        loop = asyncio.get_event_loop()
+        futures = []
+        for frame in self.frames(samples):
+            future = loop.create_future()
+            self.queue.append((frame, future))
+            futures.append(future)
+        if futures:
+            self.batcher.wake()
+        
+        steps = []
+        for future in futures:
+            probability = await future
+            steps.append(self.observe(probability) + (probability,))
+        return self._result(steps)
+    
+    def close(self):
+        self.batcher.streams.discard(self)
+        for _, future in self.queue:
+            future.cancel()
+        self.queue.clear()
+
+
+class BatchedVAD:
+    """
+    Multi-stream VAD on one shared model (ONNX backend)
+    
+    Every open stream queues 32 ms frames; each step takes the oldest
+    frame of every stream that has one, stacks them with the streams'
+    state tensors and runs a single inference. With hundreds of calls a
+    step every 32 ms replaces hundreds of single-frame model calls.
+    Speech tracking (hysteresis) stays per stream.
+    """
+    
+    def __init__(self, vad_service: VADService, executor: Optional[ThreadPoolExecutor] = None):
+        self.vad = vad_service
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="vad-batch")
+        self.streams = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.stats = {"steps": 0, "frames": 0, "max_batch": 0}
+    
+    def open_stream(self, **kwargs) -> BatchedStreamingVAD:
+        """Per-call speech tracking (close() it when the call ends)"""
+        stream = BatchedStreamingVAD(self, **kwargs)
+        self.streams.add(stream)
+        return stream
+    
+    def wake(self):
+        if self._worker is None or self._worker.done():
+            self._wake = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+        self._wake.set()
+    
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+    
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            
+            while True:
+                batch = [stream for stream in self.streams if stream.queue]
+                if not batch:
+                    break
+                heads = [stream.queue.pop(0) for stream in batch]
+                
+                try:
+                    probabilities, states = await loop.run_in_executor(
+                        self.executor, self.vad.batch_probabilities,
+                        [frame for frame, _ in heads], [stream.state for stream in batch]
+                    )
+                except Exception as e:
+                    logger.error(f"Batched VAD error: {e}")
+                    for _, future in heads:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                self.stats["steps"] += 1
+                self.stats["frames"] += len(batch)
+                self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+                
+                for stream, (_, future), probability, state in zip(batch, heads, probabilities, states):
+                    stream.state = state
+                    if not future.done():
+                        future.set_result(probability)
+
+
 # ============================================
 # Example Usage
 # ============================================
@@ -307,6 +588,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
     logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
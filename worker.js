@@ -151,8 +151,10 @@ async function startWorker() {
 
   while (true) {
     try {
-      // Block until a job is available (BRPOP with 5 second timeout)
-      const result = await redis.brpop('tts:jobs', 5);
+      // Block until a job is available (BRPOP with 5 second timeout).
+      // Lanes are listed in priority order; the Python worker
+      // (tts-engines/tts_worker.py) adds weighted polling and redelivery.
+      const result = await redis.brpop('tts:jobs:interactive', 'tts:jobs', 'tts:jobs:bulk', 5);
       
       if (result) {
         const [, jobData] = result;